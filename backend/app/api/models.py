@@ -2,7 +2,7 @@
 Pydantic models for API requests and responses
 """
 
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field
 
 
@@ -14,22 +14,81 @@ class HealthResponse(BaseModel):
     docs: str
 
 
+class ReadinessResponse(BaseModel):
+    """Readiness check response"""
+    status: str = Field(..., description="warming/ready/failed")
+    components: Dict[str, str]
+    warm_up_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
 class UploadResponse(BaseModel):
     """Document upload response"""
     session_id: str
+    job_id: str
+    document_id: str
     filename: str
     status: str
-    text_length: int
-    num_chunks: int
-    num_images_processed: int
+    text_length: int = 0
+    num_chunks: int = 0
+    num_images_processed: int = 0
     message: str
 
 
+class UploadInitRequest(BaseModel):
+    """Start a resumable upload"""
+    filename: str = Field(..., min_length=1, description="Name of the file")
+    size: int = Field(..., gt=0, description="Total size in bytes")
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Add to this session instead of creating one"
+    )
+
+
+class UploadStatusResponse(BaseModel):
+    """Resumable upload progress"""
+    upload_id: str
+    filename: str
+    size: int
+    offset: int = Field(..., description="Bytes received; send the next chunk from here")
+    session_id: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    """Background ingestion job progress"""
+    job_id: str
+    session_id: str
+    filename: str
+    status: str = Field(..., description="queued/processing/ready/failed")
+    stage: str
+    pages_done: int
+    pages_total: int
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[UploadResponse] = None
+
+
 class QueryRequest(BaseModel):
     """Query request"""
     session_id: str = Field(..., description="Session ID from upload")
     question: str = Field(..., min_length=1, description="Question to ask")
     language: str = Field(default="en", description="Response language (en/ta)")
+    doc_ids: Optional[List[str]] = Field(
+        default=None,
+        description="Only search these documents (default: all in the session)"
+    )
+
+
+class SourceChunk(BaseModel):
+    """Retrieved chunk an answer is based on"""
+    chunk_id: str
+    doc_id: str
+    filename: str
+    page: Optional[int] = None
+    slide: Optional[int] = None
+    sheet: Optional[str] = None
+    image: Optional[int] = None
+    score: float
 
 
 class QueryResponse(BaseModel):
@@ -37,6 +96,7 @@ class QueryResponse(BaseModel):
     answer: str
     session_id: str
     question: str
+    sources: List[SourceChunk] = []
 
 
 class TTSRequest(BaseModel):
@@ -45,6 +105,15 @@ class TTSRequest(BaseModel):
     language: str = Field(default="en", description="Voice language (en/ta)")
 
 
+class DocumentInfo(BaseModel):
+    """One document in a session"""
+    document_id: str
+    filename: str
+    text_length: int
+    num_chunks: int
+    num_images: int
+
+
 class StatusResponse(BaseModel):
     """Session status response"""
     session_id: str
@@ -52,3 +121,5 @@ class StatusResponse(BaseModel):
     text_length: int
     num_images: int
     status: str
+    num_documents: int = 0
+    documents: List[DocumentInfo] = []
@@ -5,40 +5,54 @@ All API endpoints for the application
 
 import os
 import sys
+import json
 import uuid
 import shutil
+import asyncio
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Header
+from fastapi.responses import StreamingResponse, FileResponse
 
 from app.config import settings
 from app.api.models import (
     UploadResponse, QueryRequest, QueryResponse,
-    TTSRequest, StatusResponse
+    TTSRequest, StatusResponse, JobResponse,
+    UploadInitRequest, UploadStatusResponse
 )
-from app.services.document_processor import DocumentProcessor
-from app.services.image_processor import ImageProcessor
-from app.services.rag_engine import RAGEngine
-from app.services.voice_handler import VoiceHandler
+from app.services.ingestion_cache import IngestionCache
+from app.services.answer_cache import get_answer_cache
+from app.services.query_cache import get_query_embedding_cache, get_retrieval_cache
+from app.services.llm_gateway import get_llm_gateway
+from app.services.single_flight import get_single_flight, single_flight_stats
+from app.services.job_queue import JobQueue, IngestionJob, is_abandoned
+from app.services.upload_store import (
+    get_upload_store, save_upload_file, UploadTooLargeError, UploadOffsetError
+)
+from app.services.session_manager import SessionManager
+from app.services.session_store import get_session_store
 
 
 # Create router
 router = APIRouter(prefix="/api/v1", tags=["API"])
 
 # Initialize services (lazy loading)
+# Services built on heavy libraries (document parsers, OCR, TTS,
+# langchain/chromadb) are also imported lazily, so the server starts and
+# answers health checks without loading them
 _doc_processor = None
 _img_processor = None
 _voice_handler = None
-
-# Session storage (in-memory)
-sessions = {}
+_ingestion_cache = None
+_job_queue = None
+_session_manager = None
 
 
 def get_doc_processor():
     global _doc_processor
     if _doc_processor is None:
+        from app.services.document_processor import DocumentProcessor
         _doc_processor = DocumentProcessor()
     return _doc_processor
 
@@ -46,6 +60,7 @@ def get_doc_processor():
 def get_img_processor():
     global _img_processor
     if _img_processor is None:
+        from app.services.image_processor import ImageProcessor
         _img_processor = ImageProcessor()
     return _img_processor
 
@@ -53,11 +68,59 @@ def get_img_processor():
 def get_voice_handler():
     global _voice_handler
     if _voice_handler is None:
+        from app.services.voice_handler import VoiceHandler
         _voice_handler = VoiceHandler()
     return _voice_handler
 
 
-def get_temp_dir(session_id: str) -> str:
+def get_ingestion_cache():
+    global _ingestion_cache
+    if _ingestion_cache is None:
+        _ingestion_cache = IngestionCache(
+            settings.ingestion_cache_dir,
+            settings.ingestion_cache_max_bytes
+        )
+    return _ingestion_cache
+
+
+def get_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            max_workers=settings.ingestion_workers,
+            on_update=lambda record: get_session_store().save_job(
+                record["job_id"], record
+            ),
+            heartbeat_seconds=settings.job_heartbeat_seconds
+        )
+    return _job_queue
+
+
+def get_job_record(job_id: str) -> Optional[dict]:
+    """
+    Job progress from this worker's queue, or from the shared store
+    A job whose worker died (restart, OOM) is reported as failed
+    """
+    job = get_job_queue().get(job_id)
+    if job is not None:
+        return job.to_dict()
+    record = get_session_store().load_job(job_id)
+    if record is not None and is_abandoned(record, settings.job_stale_seconds):
+        record = {
+            **record,
+            "status": "failed",
+            "stage": "failed",
+            "error": "Processing was interrupted. Please upload the document again."
+        }
+    return record
+
+
+def _is_processing(session_id: str) -> bool:
+    record = get_job_record(session_id)
+    return record is not None and record["status"] in ("queued", "processing")
+
+
+def get_temp_dir(session_id: str, create: bool = True) -> str:
     """Get platform-specific temp directory"""
     if sys.platform == 'win32':
         temp_base = os.path.join(os.environ.get('TEMP', 'C:\\Temp'), 'volcanorag')
@@ -65,108 +128,425 @@ def get_temp_dir(session_id: str) -> str:
         temp_base = "/tmp/volcanorag"
     
     temp_dir = os.path.join(temp_base, session_id)
-    os.makedirs(temp_dir, exist_ok=True)
+    if create:
+        os.makedirs(temp_dir, exist_ok=True)
     return temp_dir
 
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_document(file: UploadFile = File(...)):
+def _document_totals(documents: dict) -> dict:
+    """Session-level fields derived from its documents"""
+    return {
+        "filename": ", ".join(doc["filename"] for doc in documents.values()),
+        "text_length": sum(doc["text_length"] for doc in documents.values()),
+        "num_images": sum(doc["num_images"] for doc in documents.values())
+    }
+
+
+def _update_session_record(
+    session_id: str,
+    temp_dir: str,
+    update,
+    create: bool = False
+) -> Optional[dict]:
+    """
+    Apply update(documents) to a session's store record, atomically
+    Bumps its version so other workers reload their copy of the index
+    Returns None if the session no longer exists (unless create)
     """
-    Upload and process a document
+    def apply(record: Optional[dict]) -> Optional[dict]:
+        if record is None:
+            if not create:
+                return None
+            record = {"temp_dir": temp_dir, "documents": {}, "version": 0}
+        update(record["documents"])
+        record.update(_document_totals(record["documents"]))
+        record["version"] = record.get("version", 0) + 1
+        return record
     
-    - Validates file type and size
-    - Extracts text and images
-    - Runs OCR and Vision AI
-    - Creates vector embeddings
-    - Returns session ID for queries
+    return get_session_store().update_session(session_id, apply)
+
+
+def _adopt_session_record(session_id: str, session: dict, record: dict):
     """
-    try:
-        # Read file content
-        content = await file.read()
-        
-        # Validate file size
-        if len(content) > settings.max_file_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large (max {settings.max_file_size // (1024*1024)}MB)"
-            )
-        
-        # Validate file type
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in settings.allowed_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type: {file_ext}"
-            )
-        
-        # Create session
-        session_id = str(uuid.uuid4())
-        temp_dir = get_temp_dir(session_id)
-        
-        # Save file
-        file_path = os.path.join(temp_dir, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        print(f"📄 Processing: {file.filename}")
-        
-        # Process document
+    Apply this worker's own update of a session record to its live copy
+    If another worker changed the session in between, the live index is
+    missing that change; drop it so the next request reloads it
+    """
+    if record.get("version") != session.get("version", 0) + 1:
+        get_session_manager().remove(session_id)
+        return
+    session.update(record)
+    get_session_manager().resize(session_id)
+
+
+def _load_session(session_id: str) -> Optional[dict]:
+    """Reattach to a session's persisted index (after eviction or restart)"""
+    from app.services.rag_engine import RAGEngine
+    
+    rag_engine = RAGEngine.load(session_id)
+    if rag_engine is None:
+        return None
+    
+    store = get_session_store()
+    record = store.load_session(session_id)
+    if record is None:
+        job = store.load_job(session_id)
+        if job is not None and job["status"] != "ready":
+            # Left behind by an ingestion that failed (or hasn't finished)
+            return None
+    if record is None or "documents" not in record:
+        # Index predates the session store or multi-document sessions;
+        # migrate its metadata
+        metadata = rag_engine.metadata
+        if record is None:
+            record = {
+                "temp_dir": get_temp_dir(session_id, create=False),
+                "text_length": metadata.get("text_length", 0),
+                "num_images": metadata.get("num_images", 0)
+            }
+        record["documents"] = {
+            doc_id: {
+                "filename": info["filename"],
+                "text_length": record["text_length"],
+                "num_chunks": info["num_chunks"],
+                "num_images": record["num_images"]
+            }
+            for doc_id, info in rag_engine.documents.items()
+        }
+        record.update(_document_totals(record["documents"]))
+        record["version"] = 1
+        store.save_session(session_id, record)
+    
+    print(f"♻️  Session reattached: {session_id}")
+    return {"rag_engine": rag_engine, **record}
+
+
+def get_session_manager():
+    global _session_manager
+    if _session_manager is None:
+        # Evicted sessions keep their files: ingestion removes each
+        # document's files itself once it is indexed
+        _session_manager = SessionManager(
+            max_sessions=settings.max_sessions,
+            max_bytes=settings.max_session_bytes,
+            idle_ttl_seconds=settings.session_idle_ttl_seconds,
+            loader=_load_session
+        )
+    return _session_manager
+
+
+def get_session(session_id: str) -> Optional[dict]:
+    """
+    Get a session, reattaching to its persisted index if needed
+    (e.g. after eviction, a restart, or when created by another worker)
+    Reattaching reads the whole index; call via asyncio.to_thread from
+    request handlers
+    """
+    manager = get_session_manager()
+    if session_id in manager:
+        record = get_session_store().load_session(session_id)
+        if record is None:
+            # Deleted by another worker
+            manager.remove(session_id)
+            return None
+        session = manager.get(session_id)
+        if session is not None and session.get("version") != record.get("version"):
+            # Documents added or removed by another worker
+            manager.remove(session_id)
+    return manager.get(session_id)
+
+
+def require_session(session_id: str) -> dict:
+    """Get a queryable session or raise 409 (still processing) / 404"""
+    if _is_processing(session_id):
+        raise HTTPException(
+            status_code=409,
+            detail="Document is still being processed."
+        )
+    
+    session = get_session(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found. Please upload a document first."
+        )
+    return session
+
+
+def _index_document(
+    job: IngestionJob,
+    rag_engine,
+    doc_id: str,
+    filename: str,
+    file_path: str,
+    content_hash: str
+) -> tuple:
+    """
+    Extract, OCR, describe and embed one document into rag_engine
+    (or reuse a cached ingestion of the same bytes)
+    Returns (add_document result, text_length, num_images)
+    """
+    # Reuse a previous ingestion of the same bytes if available
+    cache = get_ingestion_cache()
+    cache_key = cache.make_key(content_hash)
+    cached = cache.get(cache_key)
+    
+    if cached is not None:
+        print(f"⚡ Ingestion cache hit: {filename}")
+        job.set_stage("indexing", pages_total=len(cached["chunks"]))
+        text_length = cached["text_length"]
+        num_images = cached["num_images"]
+        indexed = rag_engine.add_document(
+            doc_id,
+            filename,
+            zip(cached["chunks"], cached["sources"]),
+            content_hash=cache_key,
+            embeddings=cached["embeddings"],
+            on_progress=job.advance
+        )
+    else:
+        print(f"📄 Processing: {filename}")
         doc_processor = get_doc_processor()
-        extracted_text, images = doc_processor.process_document(file_path)
+        text_length = 0
+        images = []
+        image_errors = 0
+        extraction_errors = 0
         
-        # Process images
-        ocr_text = ""
-        vision_descriptions = []
-        
-        if images:
-            print(f"🖼️  Processing {len(images)} images...")
-            img_processor = get_img_processor()
+        def segments():
+            """
+            Document text as it is extracted, then OCR and vision text
+            Images are set aside until the text is done, then processed
+            in batches; their text keeps the page/slide they came from
+            """
+            nonlocal text_length, image_errors, extraction_errors
+            
+            job.set_stage("extracting")
+            for text, source in doc_processor.iter_segments(file_path):
+                if "error" in source:
+                    extraction_errors += 1
+                elif "image_path" in source:
+                    images.append(source)
+                else:
+                    text_length += len(text)
+                    yield text, source
             
-            for i, img_path in enumerate(images):
-                # OCR
-                ocr_result = img_processor.extract_text_ocr(img_path)
-                if ocr_result:
-                    ocr_text += f"\n\n--- Image {i+1} OCR ---\n{ocr_result}"
+            if images:
+                print(f"🖼️  Processing {len(images)} images...")
+                img_processor = get_img_processor()
+                image_paths = [image["image_path"] for image in images]
+                
+                job.set_stage("ocr", pages_total=len(images))
+                ocr_results = img_processor.extract_text_ocr_batch(
+                    image_paths, on_progress=job.advance
+                )
+                image_errors += ocr_results.count(None)
+                for i, (image, ocr_result) in enumerate(zip(images, ocr_results)):
+                    if ocr_result:
+                        text = f"--- Image {i+1} OCR ---\n{ocr_result}"
+                        text_length += len(text)
+                        yield text, {**image, "image": i + 1}
                 
-                # Vision AI
-                vision_result = img_processor.analyze_image_vision(img_path)
-                if vision_result:
-                    vision_descriptions.append(f"Image {i+1}: {vision_result}")
+                job.set_stage("vision", pages_total=len(images))
+                vision_results = img_processor.analyze_images_vision(
+                    image_paths, on_progress=job.advance
+                )
+                image_errors += vision_results.count(None)
+                for i, (image, vision_result) in enumerate(zip(images, vision_results)):
+                    if vision_result:
+                        text = f"Image {i+1}: {vision_result}"
+                        text_length += len(text)
+                        yield text, {**image, "image": i + 1}
+            
+            job.set_stage("embedding")
         
-        # Combine all text
-        combined_text = extracted_text
-        if ocr_text:
-            combined_text += "\n\n=== OCR TEXT ===\n" + ocr_text
-        if vision_descriptions:
-            combined_text += "\n\n=== VISION AI ===\n" + "\n".join(vision_descriptions)
+        def on_indexed(count: int):
+            # OCR and vision report their own progress
+            if job.stage not in ("ocr", "vision"):
+                job.advance(count)
         
-        # Create RAG engine
+        # Extraction, chunking and embedding run as one stream
         print("🔥 Creating vector store...")
-        rag_engine = RAGEngine()
-        rag_engine.create_vector_store(combined_text)
+        indexed = rag_engine.add_document(
+            doc_id,
+            filename,
+            rag_engine.iter_chunks(segments()),
+            content_hash=cache_key,
+            on_progress=on_indexed
+        )
+        num_images = len(images)
         
-        # Store session
-        sessions[session_id] = {
-            "rag_engine": rag_engine,
-            "filename": file.filename,
-            "temp_dir": temp_dir,
-            "text_length": len(combined_text),
-            "num_images": len(images) if images else 0
-        }
+        if image_errors or extraction_errors:
+            # Don't serve a degraded ingestion to later uploads of this file
+            print(f"⚠️  {extraction_errors} extraction errors, {image_errors} image "
+                  f"OCR/Vision calls failed; not caching {filename}")
+        else:
+            cache.put(
+                cache_key,
+                chunks=indexed["chunks"],
+                sources=indexed["sources"],
+                embeddings=indexed["embeddings"],
+                text_length=text_length,
+                num_images=num_images
+            )
+    
+    return indexed, text_length, num_images
+
+
+def _ingest_document(
+    job: IngestionJob,
+    session_id: str,
+    doc_id: str,
+    filename: str,
+    temp_dir: str,
+    file_path: str,
+    content_hash: str
+) -> dict:
+    """
+    Ingestion pipeline, run on the job queue's worker pool
+    Creates the session (doc_id == session_id) or adds the document to it
+    The document's files are removed once it is indexed (or has failed)
+    Returns the upload result
+    """
+    from app.services.rag_engine import RAGEngine
+    
+    try:
+        if doc_id == session_id:
+            session = None
+            rag_engine = RAGEngine(session_id)
+        else:
+            session = get_session(session_id)
+            if session is None:
+                raise ValueError("Session no longer exists")
+            rag_engine = session["rag_engine"]
         
+        indexed, text_length, num_images = _index_document(
+            job, rag_engine, doc_id, filename, file_path, content_hash
+        )
+    finally:
+        shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+    
+    # Store session
+    def add(documents: dict):
+        documents[doc_id] = {
+            "filename": filename,
+            "text_length": text_length,
+            "num_chunks": len(indexed["chunks"]),
+            "num_images": num_images
+        }
+    
+    record = _update_session_record(session_id, temp_dir, add, create=session is None)
+    if record is None:
+        # Deleted while this document was being indexed; drop what it re-created
+        rag_engine.delete()
+        raise ValueError("Session no longer exists")
+    if session is None:
+        get_session_manager().put(session_id, {"rag_engine": rag_engine, **record})
         print(f"✓ Session created: {session_id}")
+    else:
+        _adopt_session_record(session_id, session, record)
+        print(f"✓ Document added: {filename} → {session_id}")
+    
+    return {
+        "session_id": session_id,
+        "job_id": job.job_id,
+        "document_id": doc_id,
+        "filename": filename,
+        "status": "ready",
+        "text_length": text_length,
+        "num_chunks": len(indexed["chunks"]),
+        "num_images_processed": num_images,
+        "message": "Document processed successfully!"
+    }
+
+
+def _validate_filename(filename: str) -> str:
+    """Validate an upload's file type; returns its name without any path"""
+    filename = os.path.basename(filename or "")
+    file_ext = os.path.splitext(filename)[1].lower()
+    if file_ext not in settings.allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file_ext}"
+        )
+    return filename
+
+
+def _document_path(temp_dir: str, doc_id: str, filename: str) -> str:
+    doc_dir = os.path.join(temp_dir, doc_id)
+    os.makedirs(doc_dir, exist_ok=True)
+    return os.path.join(doc_dir, filename)
+
+
+async def _save_upload(file: UploadFile, temp_dir: str, doc_id: str) -> tuple:
+    """
+    Stream an uploaded file into the session temp dir
+    Validates type before reading and size while writing
+    Returns (filename, file_path, content_hash)
+    """
+    filename = _validate_filename(file.filename)
+    file_path = _document_path(temp_dir, doc_id, filename)
+    try:
+        content_hash = await save_upload_file(file, file_path)
+    except UploadTooLargeError as e:
+        shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    return filename, file_path, content_hash
+
+
+def _queue_ingestion(
+    session_id: Optional[str],
+    doc_id: str,
+    filename: str,
+    temp_dir: str,
+    file_path: str,
+    content_hash: str
+) -> dict:
+    """Queue a saved file; a new session if session_id is None"""
+    if session_id is None:
+        get_job_queue().submit(
+            doc_id, filename, _ingest_document,
+            doc_id, doc_id, filename, temp_dir, file_path, content_hash
+        )
+        print(f"📥 Queued: {filename} ({doc_id})")
+    else:
+        get_job_queue().submit(
+            doc_id, filename, _ingest_document,
+            session_id, doc_id, filename, temp_dir, file_path, content_hash,
+            session_id=session_id
+        )
+        print(f"📥 Queued: {filename} ({session_id}/{doc_id})")
+    
+    return {
+        "session_id": session_id or doc_id,
+        "job_id": doc_id,
+        "document_id": doc_id,
+        "filename": filename,
+        "status": "processing",
+        "message": "Document queued for processing"
+    }
+
+
+@router.post("/upload", response_model=UploadResponse)
+async def upload_document(file: UploadFile = File(...)):
+    """
+    Upload a document and queue it for processing
+    
+    - Validates file type and size
+    - Enqueues extraction, OCR, Vision AI and embedding
+    - Returns session ID immediately; poll /jobs/{job_id} for progress
+    """
+    session_id = str(uuid.uuid4())
+    try:
+        # Create session
+        temp_dir = get_temp_dir(session_id)
+        filename, file_path, content_hash = await _save_upload(file, temp_dir, session_id)
         
-        return {
-            "session_id": session_id,
-            "filename": file.filename,
-            "status": "ready",
-            "text_length": len(combined_text),
-            "num_chunks": len(rag_engine.texts),
-            "num_images_processed": len(images) if images else 0,
-            "message": "Document processed successfully!"
-        }
+        return _queue_ingestion(
+            None, session_id, filename, temp_dir, file_path, content_hash
+        )
         
     except HTTPException:
+        shutil.rmtree(get_temp_dir(session_id, create=False), ignore_errors=True)
         raise
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -175,6 +555,168 @@ async def upload_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/session/{session_id}/documents", response_model=UploadResponse)
+async def add_document(session_id: str, file: UploadFile = File(...)):
+    """
+    Add a document to an existing session
+    
+    - Only the new document is extracted and embedded
+    - The session stays queryable while it is processed
+    - Poll /jobs/{job_id} for progress
+    """
+    session = await asyncio.to_thread(require_session, session_id)
+    try:
+        doc_id = str(uuid.uuid4())
+        filename, file_path, content_hash = await _save_upload(
+            file, session["temp_dir"], doc_id
+        )
+        
+        return _queue_ingestion(
+            session_id, doc_id, filename, session["temp_dir"], file_path, content_hash
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/session/{session_id}/documents/{doc_id}")
+async def remove_document(session_id: str, doc_id: str):
+    """Remove one document from a session without re-indexing the rest"""
+    session = await asyncio.to_thread(require_session, session_id)
+    if not await asyncio.to_thread(session["rag_engine"].remove_document, doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    record = _update_session_record(
+        session_id, session["temp_dir"],
+        lambda documents: documents.pop(doc_id, None)
+    )
+    if record is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    _adopt_session_record(session_id, session, record)
+    get_job_queue().remove(doc_id)
+    return {"status": "deleted", "session_id": session_id, "document_id": doc_id}
+
+
+def _offset_conflict(e: UploadOffsetError) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": str(e), "offset": e.offset},
+        headers={"Upload-Offset": str(e.offset)}
+    )
+
+
+@router.post("/uploads", response_model=UploadStatusResponse)
+async def start_upload(request: UploadInitRequest):
+    """
+    Start a resumable upload
+    
+    - Validates file type and size before any bytes are sent
+    - Send the bytes in chunks with PATCH /uploads/{upload_id},
+      then POST /uploads/{upload_id}/complete
+    - With session_id the document is added to that session
+    """
+    filename = _validate_filename(request.filename)
+    if request.size > settings.max_file_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large (max {settings.max_file_size // (1024*1024)}MB)"
+        )
+    if request.session_id is not None:
+        await asyncio.to_thread(require_session, request.session_id)
+    
+    return get_upload_store().create(filename, request.size, request.session_id)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def get_upload(upload_id: str):
+    """Get a resumable upload's offset (where to resume after an interruption)"""
+    status = get_upload_store().get(upload_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return status
+
+
+@router.patch("/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def upload_chunk(upload_id: str, request: Request, upload_offset: int = Header(...)):
+    """
+    Append one chunk (the raw request body) to a resumable upload
+    
+    - Upload-Offset header must equal the bytes received so far;
+      otherwise 409 with the current offset
+    - The body is streamed to disk and rejected as soon as it goes past
+      the declared size
+    """
+    try:
+        return await get_upload_store().append(upload_id, upload_offset, request.stream())
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetError as e:
+        raise _offset_conflict(e)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadResponse)
+async def complete_upload(upload_id: str):
+    """
+    Finish a resumable upload and queue it for processing
+    
+    - Returns like /upload (or /session/{id}/documents); poll /jobs/{job_id}
+    """
+    store = get_upload_store()
+    status = store.get(upload_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    session_id = status["session_id"]
+    doc_id = str(uuid.uuid4())
+    if session_id is not None:
+        temp_dir = (await asyncio.to_thread(require_session, session_id))["temp_dir"]
+    else:
+        temp_dir = get_temp_dir(doc_id)
+    file_path = _document_path(temp_dir, doc_id, status["filename"])
+    
+    try:
+        content_hash = await store.finish(upload_id, file_path)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetError as e:
+        raise _offset_conflict(e)
+    finally:
+        if not os.path.exists(file_path):
+            # Not finished: drop the empty document (or session) dir
+            shutil.rmtree(
+                os.path.dirname(file_path) if session_id else temp_dir,
+                ignore_errors=True
+            )
+    
+    return _queue_ingestion(
+        session_id, doc_id, status["filename"], temp_dir, file_path, content_hash
+    )
+
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_upload(upload_id: str):
+    """Discard a resumable upload"""
+    store = get_upload_store()
+    if store.get(upload_id) is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    store.delete(upload_id)
+    return {"status": "deleted", "upload_id": upload_id}
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get ingestion progress for an upload"""
+    record = get_job_record(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return record
+
+
 @router.post("/query", response_model=QueryResponse)
 async def query_document(request: QueryRequest):
     """
@@ -186,24 +728,28 @@ async def query_document(request: QueryRequest):
     """
     try:
         # Validate session
-        if request.session_id not in sessions:
-            raise HTTPException(
-                status_code=404,
-                detail="Session not found. Please upload a document first."
-            )
+        session = await asyncio.to_thread(require_session, request.session_id)
         
-        session = sessions[request.session_id]
         rag_engine = session["rag_engine"]
         
         print(f"🔍 Query: {request.question}")
         
-        # Get answer
-        answer = rag_engine.query(request.question, language=request.language)
+        # Get answer; identical concurrent questions share one LLM call
+        doc_ids = tuple(sorted(set(request.doc_ids or [])))
+        result = await get_single_flight("query").do(
+            (request.session_id, request.question.strip(), request.language, doc_ids),
+            lambda: rag_engine.aquery(
+                request.question,
+                language=request.language,
+                doc_ids=request.doc_ids
+            )
+        )
         
         return {
-            "answer": answer,
+            "answer": result["answer"],
             "session_id": request.session_id,
-            "question": request.question
+            "question": request.question,
+            "sources": result["sources"]
         }
         
     except HTTPException:
@@ -213,21 +759,85 @@ async def query_document(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event: dict) -> str:
+    """Format an event as a Server-Sent Events message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.post("/query/stream")
+async def query_document_stream(request: QueryRequest):
+    """
+    Query a processed document, streaming the answer as Server-Sent Events
+    
+    - `context` event first, with the retrieved chunks
+    - `token` events as the LLM generates
+    - `done` event with time-to-first-token and total latency
+    """
+    session = await asyncio.to_thread(require_session, request.session_id)
+    rag_engine = session["rag_engine"]
+    print(f"🔍 Stream query: {request.question}")
+    
+    # Identical concurrent questions share one generation, keyed like /query;
+    # each subscriber gets every event from the start, and generation stops
+    # once every client has gone
+    doc_ids = tuple(sorted(set(request.doc_ids or [])))
+    events = get_single_flight("query_stream").stream(
+        (request.session_id, request.question.strip(), request.language, doc_ids),
+        lambda: rag_engine.query_stream(
+            request.question,
+            language=request.language,
+            doc_ids=request.doc_ids
+        ),
+        cancel_abandoned=True
+    )
+    
+    async def event_stream():
+        try:
+            async for event in events:
+                yield _sse(event)
+        except Exception as e:
+            print(f"❌ Stream Error: {str(e)}")
+            yield _sse({"type": "error", "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/tts")
 async def text_to_speech(request: TTSRequest):
     """
     Convert text to speech
     
     - Supports English and Tanglish
-    - Returns audio stream
+    - Streams audio as it is synthesized
+    - Repeat requests are served from the on-disk TTS cache
     """
     try:
         voice_handler = get_voice_handler()
-        audio_stream = await voice_handler.text_to_speech(
-            request.text,
-            request.language
+        
+        cached_path = voice_handler.cached_audio_path(request.text, request.language)
+        if cached_path is not None:
+            print("⚡ TTS cache hit")
+            return FileResponse(cached_path, media_type="audio/mpeg")
+        
+        # Identical concurrent requests (e.g. several tabs) share one synthesis
+        audio = get_single_flight("tts").stream(
+            (request.text, request.language),
+            lambda: voice_handler.stream_speech(request.text, request.language)
         )
-        return StreamingResponse(audio_stream, media_type="audio/mpeg")
+        
+        # Wait for the first chunk so synthesis errors still return a 500
+        first_chunk = await audio.__anext__()
+        
+        async def audio_stream():
+            yield first_chunk
+            async for chunk in audio:
+                yield chunk
+        
+        return StreamingResponse(audio_stream(), media_type="audio/mpeg")
     except Exception as e:
         print(f"❌ TTS Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -236,30 +846,67 @@ async def text_to_speech(request: TTSRequest):
 @router.get("/status/{session_id}", response_model=StatusResponse)
 async def get_status(session_id: str):
     """Get session status"""
-    if session_id not in sessions:
+    job = get_job_record(session_id)
+    if job is not None and job["status"] in ("queued", "processing"):
+        return {
+            "session_id": session_id,
+            "filename": job["filename"],
+            "text_length": 0,
+            "num_images": 0,
+            "status": job["status"]
+        }
+    
+    # Answer from the shared record without loading the index
+    session = get_session_store().load_session(session_id)
+    if session is None:
+        session = await asyncio.to_thread(get_session, session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = sessions[session_id]
+    documents = session.get("documents", {})
     return {
         "session_id": session_id,
         "filename": session["filename"],
         "text_length": session["text_length"],
         "num_images": session["num_images"],
-        "status": "active"
+        "status": "active",
+        "num_documents": len(documents),
+        "documents": [
+            {"document_id": doc_id, **info}
+            for doc_id, info in documents.items()
+        ]
+    }
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Cache and performance counters"""
+    return {
+        "answer_cache": get_answer_cache().stats(),
+        "query_embedding_cache": get_query_embedding_cache().stats(),
+        "retrieval_cache": get_retrieval_cache().stats(),
+        "sessions": get_session_manager().stats(),
+        "llm": get_llm_gateway().stats(),
+        "coalescing": single_flight_stats()
     }
 
 
 @router.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete session and cleanup"""
-    if session_id in sessions:
-        session = sessions[session_id]
+    session = await asyncio.to_thread(get_session, session_id)
+    if session is not None:
+        # Drop persisted index
+        session["rag_engine"].delete()
         
         # Cleanup temp directory
         if os.path.exists(session["temp_dir"]):
             shutil.rmtree(session["temp_dir"])
         
-        del sessions[session_id]
+        get_session_manager().remove(session_id)
+        get_session_store().delete_session(session_id)
+        for doc_id in list(session.get("documents", {})) + [session_id]:
+            get_job_queue().remove(doc_id)
         return {"status": "deleted", "session_id": session_id}
     
     raise HTTPException(status_code=404, detail="Session not found")
@@ -18,20 +18,100 @@ class Settings(BaseSettings):
     groq_api_key: str = Field(..., env="GROQ_API_KEY")
     port: int = Field(default=8000, env="PORT")
     host: str = Field(default="0.0.0.0", env="HOST")
+    workers: int = Field(default=1, env="WORKERS")
     
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     
     # File Upload
     max_file_size: int = 20 * 1024 * 1024  # 20MB
+    upload_chunk_size: int = 1024 * 1024  # Read/write block for streamed uploads
+    upload_dir: str = Field(
+        default=str(Path(__file__).parent.parent / "data" / "uploads"),
+        env="UPLOAD_DIR"
+    )  # Resumable uploads in progress
+    upload_ttl_seconds: int = 24 * 60 * 60  # Unfinished resumable uploads kept this long
+    ingestion_workers: int = 2  # Concurrent background ingestion jobs
+    job_heartbeat_seconds: int = 30  # Unfinished jobs re-publish their record this often
+    job_stale_seconds: int = 300  # Unfinished job records not updated for this long have failed
     allowed_extensions: list = ['.pdf', '.docx', '.xlsx', '.pptx', '.txt', '.jpg', '.jpeg', '.png']
     
     # RAG Configuration
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    chunking_window_chars: int = 32 * 1024  # Text buffered while chunking a document stream
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     llm_model: str = "llama-3.3-70b-versatile"
     vision_model: str = "llama-3.2-90b-vision-preview"
+    embedding_batch_size: int = 64
+    
+    # Hybrid Retrieval (BM25 + vector, fused with reciprocal rank fusion)
+    hybrid_search: bool = True
+    hybrid_candidates: int = 20  # Candidates taken from each ranker
+    rrf_k: int = 60
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    
+    # LLM Gateway (chat calls; vision calls use the vision_* settings below)
+    llm_concurrency: int = 16  # Max in-flight chat completions
+    llm_timeout: float = 30.0  # Seconds per attempt (or between streamed tokens)
+    llm_max_retries: int = 3  # Retries on 429, 5xx and connection errors
+    llm_retry_base_delay: float = 0.5  # Seconds, doubled per retry
+    
+    # Answer Cache
+    answer_cache_max_entries: int = 1000
+    answer_cache_ttl_seconds: int = 3600
+    answer_cache_similarity: float = 0.95  # Cosine similarity for a paraphrase hit
+    query_embedding_cache_size: int = 2048  # Cached question embeddings
+    retrieval_cache_size: int = 2048  # Cached search results
+    
+    # Image Processing
+    ocr_workers: int = os.cpu_count() or 1  # Parallel Tesseract processes
+    pdf_raster_dpi: int = 200
+    pdf_min_text_chars: int = 100  # Pages with less text are rasterized for OCR
+    pdf_min_image_size: int = 100  # Skip embedded images smaller than this (px)
+    vision_concurrency: int = 4  # Max in-flight Vision API calls
+    vision_max_retries: int = 5  # Retries on 429, 5xx and connection errors
+    vision_retry_base_delay: float = 1.0  # Seconds, doubled per retry
+    vision_timeout: float = 60.0  # Seconds per Vision API call
+    
+    # Vector Store
+    vector_store_path: str = Field(
+        default=str(Path(__file__).parent.parent / "data" / "chroma"),
+        env="VECTOR_STORE_PATH"
+    )
+    vector_store_memory_limit_bytes: int = 512 * 1024 * 1024  # Loaded indexes
+    vector_store_backend: str = Field(default="auto", env="VECTOR_STORE_BACKEND")  # auto/numpy/chroma
+    numpy_store_max_chunks: int = 5000  # auto: brute force up to here, then Chroma/HNSW
+    vector_store_quantize: bool = False  # int8 vectors in the NumPy backend
+    chroma_host: Optional[str] = Field(default=None, env="CHROMA_HOST")  # Chroma server shared by all workers
+    chroma_port: int = Field(default=8001, env="CHROMA_PORT")
+    
+    # Sessions
+    max_sessions: int = 100  # Live sessions kept in memory
+    max_session_bytes: int = 512 * 1024 * 1024
+    session_idle_ttl_seconds: int = 30 * 60
+    session_backend: str = Field(default="sqlite", env="SESSION_BACKEND")  # sqlite/memory
+    session_db_path: str = Field(
+        default=str(Path(__file__).parent.parent / "data" / "sessions.db"),
+        env="SESSION_DB_PATH"
+    )
+    
+    # TTS (segments synthesized concurrently; cache keyed by voice + text hash)
+    tts_segment_chars: int = 400  # Max characters per synthesis call
+    tts_concurrency: int = 3  # Segments synthesized at once per request
+    tts_cache_dir: str = Field(
+        default=str(Path(__file__).parent.parent / "data" / "tts_cache"),
+        env="TTS_CACHE_DIR"
+    )
+    tts_cache_max_bytes: int = 256 * 1024 * 1024  # 256MB
+    
+    # Ingestion Cache (keyed by file content hash)
+    ingestion_cache_dir: str = Field(
+        default=str(Path(__file__).parent.parent / "data" / "ingestion_cache"),
+        env="INGESTION_CACHE_DIR"
+    )
+    ingestion_cache_max_bytes: int = 1024 * 1024 * 1024  # 1GB
     
     @validator('groq_api_key')
     def validate_api_key(cls, v):
@@ -11,11 +11,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import uvicorn
 
 from app.config import settings
 from app.api.routes import router
-from app.api.models import HealthResponse
+from app.api.models import HealthResponse, ReadinessResponse
+from app.services.llm_gateway import get_llm_gateway
+from app.services.warmup import get_warm_up
 
 
 # Create FastAPI app
@@ -51,6 +54,18 @@ async def root():
     }
 
 
+@app.get("/ready", response_model=ReadinessResponse, tags=["Health"])
+async def ready():
+    """
+    Readiness check endpoint
+    
+    503 while the embedding model is still loading (or failed to load),
+    200 once it is warm
+    """
+    status = get_warm_up().status()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
@@ -60,6 +75,12 @@ async def startup_event():
     print(f"✓ API Key configured: {settings.groq_api_key[:20]}...")
     print(f"✓ Server: http://{settings.host}:{settings.port}")
     print(f"✓ Docs: http://{settings.host}:{settings.port}/docs")
+    # Load models in the background so the server answers right away
+    get_warm_up().start()
+    print("✓ Warming up models in the background (see /ready)")
+    if settings.workers > 1 and not settings.chroma_host:
+        print("⚠️  WORKERS > 1 without CHROMA_HOST: start with `python -m app.main` "
+              "or point CHROMA_HOST at a Chroma server")
     print("="*60 + "\n")
 
 
@@ -67,13 +88,25 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     print("\n🌋 VolcanoRAG API shutting down...")
+    get_llm_gateway().close()
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=True,
-        log_level=settings.log_level.lower()
-    )
+    chroma_server = None
+    if settings.workers > 1 and not settings.chroma_host:
+        # Workers share one Chroma server instead of each opening the store
+        from app.services.vector_store import start_chroma_server
+        chroma_server = start_chroma_server()
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            # Sessions live in the shared store, so any worker can serve any session
+            workers=settings.workers,
+            reload=settings.workers <= 1,
+            log_level=settings.log_level.lower()
+        )
+    finally:
+        if chroma_server is not None:
+            chroma_server.terminate()
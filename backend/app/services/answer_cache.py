@@ -0,0 +1,146 @@
+"""
+Answer Cache Service
+Semantic cache of LLM answers for repeated questions
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, List
+
+import numpy as np
+
+from app.config import settings
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?.!。 ")
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of answers scoped by (document set, language, doc filter)
+
+    Exact (normalized) question matches are served without embedding or
+    calling the LLM. Otherwise the question embedding is compared with
+    cached questions for the same scope and the best match is returned
+    if its cosine similarity reaches the threshold.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity_threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _expired(self, entry: dict) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def get_exact(self, scope: tuple, question: str) -> Optional[dict]:
+        """Look up a normalized exact match"""
+        key = (scope, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry["answer"]
+
+    def get_similar(self, scope: tuple, embedding: List[float]) -> Optional[dict]:
+        """
+        Look up the most similar cached question in this scope
+        Counts a miss when nothing reaches the threshold
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            keys = []
+            vectors = []
+            for key, entry in list(self._entries.items()):
+                if key[0] != scope:
+                    continue
+                if self._expired(entry):
+                    del self._entries[key]
+                    continue
+                keys.append(key)
+                vectors.append(entry["embedding"])
+
+            if vectors:
+                scores = np.stack(vectors) @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.semantic_hits += 1
+                    return self._entries[keys[best]]["answer"]
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        scope: tuple,
+        question: str,
+        embedding: List[float],
+        answer: dict
+    ):
+        """Cache an answer payload, evicting the least recently used if full"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        key = (scope, normalize_question(question))
+        with self._lock:
+            self._entries[key] = {
+                "answer": answer,
+                "embedding": vector,
+                "created_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters"""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get the process-wide answer cache"""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = AnswerCache(
+                    max_entries=settings.answer_cache_max_entries,
+                    ttl_seconds=settings.answer_cache_ttl_seconds,
+                    similarity_threshold=settings.answer_cache_similarity
+                )
+    return _answer_cache
@@ -3,151 +3,351 @@ Document Processor Service
 Extracts text and images from various document formats
 """
 
+import io
 import os
-from typing import Tuple, List
-from PyPDF2 import PdfReader
-from docx import Document
-from openpyxl import load_workbook
-from pptx import Presentation
-from PIL import Image
-from pdf2image import convert_from_path
+import hashlib
+from typing import Tuple, List, Iterable, Iterator, Optional
+
+from app.config import settings
+
+
+def _error(message: str) -> Tuple[str, dict]:
+    """Segment recording that part of the document could not be extracted"""
+    print(message)
+    return "", {"error": message}
 
 
 class DocumentProcessor:
-    """Process various document formats"""
+    """
+    Process various document formats
+    
+    Extraction is a stream of (text, source) segments: a PDF page, a
+    slide, a block of spreadsheet rows, a run of paragraphs, or an image
+    still to be OCR'd and described. Nothing is accumulated, so callers
+    can chunk and embed as segments arrive. Source keys: "page",
+    "slide", "sheet" (provenance), "image_path" (an image rather than
+    text), "chunked" (text is already one chunk) and "error" (part of
+    the document was lost, e.g. a page failed to rasterize).
+    
+    Each format's parsing library is imported the first time a file of
+    that format is processed, keeping it out of server startup.
+    """
     
     def __init__(self):
-        self.processors = {
-            '.pdf': self._process_pdf,
-            '.docx': self._process_docx,
-            '.xlsx': self._process_xlsx,
-            '.pptx': self._process_pptx,
-            '.txt': self._process_txt,
-            '.jpg': self._process_image,
-            '.jpeg': self._process_image,
-            '.png': self._process_image
+        self.segmenters = {
+            '.pdf': self._iter_pdf,
+            '.docx': self._iter_docx,
+            '.xlsx': self._iter_xlsx,
+            '.pptx': self._iter_pptx,
+            '.txt': self._iter_txt,
+            '.jpg': self._iter_image,
+            '.jpeg': self._iter_image,
+            '.png': self._iter_image
         }
     
-    def process_document(self, file_path: str) -> Tuple[str, List[str]]:
+    def iter_segments(self, file_path: str) -> Iterator[Tuple[str, dict]]:
         """
-        Process document and extract text and images
-        Returns: (text, list_of_image_paths)
+        Stream a document as (text, source) segments
+        Image segments have empty text and the image's path in source;
+        error segments have empty text and what failed in source["error"]
         """
         ext = os.path.splitext(file_path)[1].lower()
         
-        if ext not in self.processors:
+        if ext not in self.segmenters:
             raise ValueError(f"Unsupported format: {ext}")
         
-        return self.processors[ext](file_path)
+        return self.segmenters[ext](file_path)
     
-    def _process_pdf(self, file_path: str) -> Tuple[str, List[str]]:
-        """Extract from PDF"""
-        text = ""
+    def process_document(self, file_path: str) -> Tuple[str, List[str]]:
+        """
+        Process document and extract text and images
+        Returns: (text, list_of_image_paths)
+        """
+        texts = []
         images = []
+        for text, source in self.iter_segments(file_path):
+            if "error" in source:
+                continue
+            if "image_path" in source:
+                images.append(source["image_path"])
+            else:
+                texts.append(text)
+        return "".join(texts).strip(), images
+    
+    def _iter_pdf(self, file_path: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Extract from PDF, one segment per page
+        
+        Pages with a usable text layer keep their extracted text and only
+        contribute their embedded images. Pages whose text layer is empty
+        or sparse (scans, image-only slides) are rasterized for OCR.
+        """
+        from PyPDF2 import PdfReader
         
         try:
-            # Extract text
             reader = PdfReader(file_path)
-            for page in reader.pages:
-                text += page.extract_text() + "\n\n"
-            
-            # Convert pages to images for OCR
             temp_dir = os.path.dirname(file_path)
-            page_images = convert_from_path(file_path, dpi=200)
+            seen_images = set()
+            raster_pages = []
+            embedded_images = 0
+            
+            for page_number, page in enumerate(reader.pages, 1):
+                page_text = page.extract_text() or ""
+                if page_text.strip():
+                    yield page_text + "\n\n", {"page": page_number}
+                
+                if len(page_text.strip()) < settings.pdf_min_text_chars:
+                    raster_pages.append(page_number)
+                else:
+                    for img_path in self._extract_pdf_page_images(
+                        page, page_number, temp_dir, seen_images
+                    ):
+                        if img_path is None:
+                            yield _error(f"PDF image error on page {page_number}")
+                            continue
+                        embedded_images += 1
+                        yield "", {"page": page_number, "image_path": img_path}
+            
+            # Rasterize only the pages that need OCR
+            for page_number, img_path in self.iter_pdf_pages(file_path, raster_pages):
+                if img_path is None:
+                    yield _error(f"PDF raster error on page {page_number}")
+                else:
+                    yield "", {"page": page_number, "image_path": img_path}
+            
+            print(f"   PDF triage: {len(reader.pages)} pages, "
+                  f"{len(raster_pages)} rasterized, "
+                  f"{embedded_images} embedded images")
+        except Exception as e:
+            yield _error(f"PDF Error: {e}")
+    
+    def iter_pdf_pages(
+        self,
+        file_path: str,
+        page_numbers: Iterable[int]
+    ) -> Iterator[Tuple[int, Optional[str]]]:
+        """
+        Rasterize PDF pages one at a time, yielding (page_number, PNG path)
+        The path is None for a page that could not be rasterized
+        
+        poppler writes each page straight to disk, so no page is decoded
+        into memory here and peak memory does not grow with page count.
+        """
+        from pdf2image import convert_from_path
+        
+        temp_dir = os.path.dirname(file_path)
+        
+        for page_number in page_numbers:
+            output_file = f"page_{page_number}"
+            try:
+                convert_from_path(
+                    file_path,
+                    dpi=settings.pdf_raster_dpi,
+                    first_page=page_number,
+                    last_page=page_number,
+                    output_folder=temp_dir,
+                    output_file=output_file,
+                    single_file=True,
+                    fmt="png",
+                    paths_only=True
+                )
+            except Exception as e:
+                print(f"PDF raster error on page {page_number}: {e}")
+                yield page_number, None
+                continue
             
-            for i, img in enumerate(page_images):
-                img_path = os.path.join(temp_dir, f"page_{i+1}.png")
-                img.save(img_path, "PNG")
-                images.append(img_path)
+            img_path = os.path.join(temp_dir, f"{output_file}.png")
+            yield page_number, img_path if os.path.exists(img_path) else None
+    
+    def _extract_pdf_page_images(
+        self,
+        page,
+        page_number: int,
+        temp_dir: str,
+        seen: set
+    ) -> List[Optional[str]]:
+        """
+        Save a page's embedded images
+        Skips small images (icons, bullets) and repeats (logos on every page)
+        None stands for images that could not be read
+        """
+        from PIL import Image
+        
+        paths = []
+        
+        try:
+            page_images = page.images
         except Exception as e:
-            print(f"PDF Error: {e}")
+            print(f"PDF image error on page {page_number}: {e}")
+            return [None]
+        
+        for i, page_image in enumerate(page_images, 1):
+            digest = hashlib.sha1(page_image.data).hexdigest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            
+            try:
+                with Image.open(io.BytesIO(page_image.data)) as img:
+                    if min(img.size) < settings.pdf_min_image_size:
+                        continue
+                    img_path = os.path.join(
+                        temp_dir, f"page_{page_number}_img_{i}.png"
+                    )
+                    img.save(img_path, "PNG")
+                paths.append(img_path)
+            except Exception:
+                paths.append(None)
         
-        return text.strip(), images
+        return paths
     
-    def _process_docx(self, file_path: str) -> Tuple[str, List[str]]:
-        """Extract from DOCX"""
-        text = ""
-        images = []
+    def _iter_docx(self, file_path: str) -> Iterator[Tuple[str, dict]]:
+        """Extract from DOCX, one segment per paragraph"""
+        from docx import Document
         
         try:
             doc = Document(file_path)
             
             # Extract text
             for para in doc.paragraphs:
-                text += para.text + "\n"
+                yield para.text + "\n", {}
             
             # Extract images
             temp_dir = os.path.dirname(file_path)
             for i, rel in enumerate(doc.part.rels.values()):
                 if "image" in rel.target_ref:
-                    img_data = rel.target_part.blob
                     img_path = os.path.join(temp_dir, f"img_{i+1}.png")
                     with open(img_path, "wb") as f:
-                        f.write(img_data)
-                    images.append(img_path)
+                        f.write(rel.target_part.blob)
+                    yield "", {"image_path": img_path}
         except Exception as e:
-            print(f"DOCX Error: {e}")
-        
-        return text.strip(), images
+            yield _error(f"DOCX Error: {e}")
+    
+    def _iter_xlsx(self, file_path: str) -> Iterator[Tuple[str, dict]]:
+        """Extract from Excel as ready-made row-aware chunks"""
+        for chunk, info in self.iter_xlsx_chunks(file_path):
+            if "error" in info:
+                yield chunk, info
+            else:
+                yield chunk, {"sheet": info["sheet"], "chunked": True}
     
-    def _process_xlsx(self, file_path: str) -> Tuple[str, List[str]]:
-        """Extract from Excel"""
-        text = ""
+    def iter_xlsx_chunks(self, file_path: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Stream an Excel workbook as row-aware chunks
+        
+        The workbook is opened read-only, so rows are parsed one at a time
+        and memory stays flat however large the sheet. Whole rows are
+        packed into chunks of up to chunk_size characters (a row is never
+        split), each headed by its sheet and row range and repeating the
+        sheet's header row, so every chunk reads as a self-contained table.
+        Yields (chunk_text, {"sheet", "first_row", "last_row"}), or an
+        error segment if the workbook could not be read to the end.
+        """
+        from openpyxl import load_workbook
         
         try:
-            wb = load_workbook(file_path, data_only=True)
-            
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                text += f"\n\n=== {sheet_name} ===\n\n"
-                
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = "\t".join([str(c) if c else "" for c in row])
-                    if row_text.strip():
-                        text += row_text + "\n"
+            wb = load_workbook(file_path, read_only=True, data_only=True)
         except Exception as e:
-            print(f"XLSX Error: {e}")
+            yield _error(f"XLSX Error: {e}")
+            return
         
-        return text.strip(), []
+        try:
+            for sheet in wb.worksheets:
+                # Don't trust the stored dimensions; read to the last row
+                sheet.reset_dimensions()
+                yield from self._iter_sheet_chunks(sheet)
+        except Exception as e:
+            yield _error(f"XLSX Error: {e}")
+        finally:
+            wb.close()
     
-    def _process_pptx(self, file_path: str) -> Tuple[str, List[str]]:
-        """Extract from PowerPoint"""
-        text = ""
-        images = []
+    def _iter_sheet_chunks(self, sheet) -> Iterator[Tuple[str, dict]]:
+        header = None
+        rows = []
+        size = 0
+        first_row = last_row = 0
+        
+        def make_chunk() -> Tuple[str, dict]:
+            title = f"=== {sheet.title} (rows {first_row}-{last_row}) ==="
+            return "\n".join([title, header, *rows]), {
+                "sheet": sheet.title,
+                "first_row": first_row,
+                "last_row": last_row
+            }
+        
+        for row_number, row in enumerate(sheet.iter_rows(values_only=True), 1):
+            row_text = "\t".join(
+                "" if cell is None else str(cell) for cell in row
+            ).rstrip()
+            if not row_text.strip():
+                continue
+            if header is None:
+                header = row_text
+                continue
+            
+            if rows and size + len(row_text) + 1 > settings.chunk_size:
+                yield make_chunk()
+                rows = []
+            if not rows:
+                first_row = row_number
+                size = len(sheet.title) + len(header) + 24
+            rows.append(row_text)
+            size += len(row_text) + 1
+            last_row = row_number
+        
+        if rows:
+            yield make_chunk()
+        elif header is not None:
+            # Header-only sheet
+            yield f"=== {sheet.title} ===\n{header}", {
+                "sheet": sheet.title,
+                "first_row": 1,
+                "last_row": 1
+            }
+    
+    def _iter_pptx(self, file_path: str) -> Iterator[Tuple[str, dict]]:
+        """Extract from PowerPoint, one segment per slide"""
+        from pptx import Presentation
         
         try:
             prs = Presentation(file_path)
             temp_dir = os.path.dirname(file_path)
             
             for i, slide in enumerate(prs.slides, 1):
-                text += f"\n\n=== Slide {i} ===\n\n"
+                texts = [f"=== Slide {i} ===\n\n"]
+                images = []
                 
-                for shape in slide.shapes:
+                for j, shape in enumerate(slide.shapes, 1):
                     if hasattr(shape, "text"):
-                        text += shape.text + "\n"
+                        texts.append(shape.text + "\n")
                     
                     if shape.shape_type == 13:  # Picture
                         try:
-                            img_path = os.path.join(temp_dir, f"slide_{i}.png")
+                            img_path = os.path.join(temp_dir, f"slide_{i}_img_{j}.png")
                             with open(img_path, "wb") as f:
                                 f.write(shape.image.blob)
                             images.append(img_path)
-                        except:
-                            pass
+                        except Exception:
+                            images.append(None)
+                
+                yield "".join(texts), {"slide": i}
+                for img_path in images:
+                    if img_path is None:
+                        yield _error(f"PPTX image error on slide {i}")
+                    else:
+                        yield "", {"slide": i, "image_path": img_path}
         except Exception as e:
-            print(f"PPTX Error: {e}")
-        
-        return text.strip(), images
+            yield _error(f"PPTX Error: {e}")
     
-    def _process_txt(self, file_path: str) -> Tuple[str, List[str]]:
-        """Extract from text file"""
+    def _iter_txt(self, file_path: str) -> Iterator[Tuple[str, dict]]:
+        """Extract from text file, in fixed-size blocks"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read().strip(), []
+                for block in iter(lambda: f.read(64 * 1024), ""):
+                    yield block, {}
         except Exception as e:
-            print(f"TXT Error: {e}")
-            return "", []
+            yield _error(f"TXT Error: {e}")
     
-    def _process_image(self, file_path: str) -> Tuple[str, List[str]]:
+    def _iter_image(self, file_path: str) -> Iterator[Tuple[str, dict]]:
         """Process image file"""
-        return "", [file_path]
+        yield "", {"image_path": file_path}
@@ -0,0 +1,84 @@
+"""
+Embedding Service
+Process-wide shared embedding model
+"""
+
+import threading
+from typing import List, TYPE_CHECKING
+
+from app.config import settings
+from app.services.query_cache import get_query_embedding_cache
+
+if TYPE_CHECKING:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+
+class EmbeddingService:
+    """Single embedding model shared by every session"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._dimension = None
+        self._load_lock = threading.Lock()
+        # HF fast tokenizers are not safe to call from several threads at once
+        self._encode_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def dimension(self) -> int:
+        """Embedding vector length"""
+        if self._dimension is None:
+            self._dimension = len(self.embed_query("dimension"))
+        return self._dimension
+
+    def _get_model(self) -> "HuggingFaceEmbeddings":
+        """Load the model once (double-checked locking)"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from langchain_community.embeddings import HuggingFaceEmbeddings
+                    print(f"🧠 Loading embedding model: {self.model_name}")
+                    self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def warm_up(self):
+        """Load weights and run one forward pass so the first upload is fast"""
+        self.embed_query("warm up")
+        print(f"✓ Embedding model ready: {self.model_name}")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single text (served from the query embedding cache if seen)"""
+        cache = get_query_embedding_cache()
+        embedding = cache.get_embedding(text)
+        if embedding is not None:
+            return embedding
+
+        model = self._get_model()
+        with self._encode_lock:
+            embedding = model.embed_query(text)
+        cache.put_embedding(text, embedding)
+        return embedding
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts in one forward pass"""
+        model = self._get_model()
+        with self._encode_lock:
+            return model.embed_documents(texts)
+
+
+_embedding_service = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get the process-wide embedding service"""
+    global _embedding_service
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService(settings.embedding_model)
+    return _embedding_service
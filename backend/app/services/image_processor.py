@@ -5,68 +5,160 @@ OCR and Vision AI for image understanding
 
 import os
 import base64
-from groq import Groq
-import pytesseract
-from PIL import Image
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Callable
 
 from app.config import settings
+from app.services.llm_gateway import get_llm_gateway
+
+
+def _ocr_image(image_path: str) -> Optional[str]:
+    """
+    Run Tesseract on one image
+    Returns None if OCR failed
+    """
+    import pytesseract
+    from PIL import Image
+    
+    try:
+        with Image.open(image_path) as img:
+            text = pytesseract.image_to_string(img)
+        return text.strip()
+    except Exception as e:
+        print(f"OCR Error: {e}")
+        return None
 
 
 class ImageProcessor:
     """Process images with OCR and Vision AI"""
     
     def __init__(self):
-        self.groq_client = Groq(api_key=settings.groq_api_key)
+        self.llm = get_llm_gateway()
+        self._ocr_pool = None
+        self._ocr_pool_lock = threading.Lock()
+    
+    def _get_ocr_pool(self) -> ThreadPoolExecutor:
+        # pytesseract runs each image in its own tesseract process, so
+        # threads give the parallelism without forking this process
+        if self._ocr_pool is None:
+            with self._ocr_pool_lock:
+                if self._ocr_pool is None:
+                    self._ocr_pool = ThreadPoolExecutor(
+                        max_workers=max(1, settings.ocr_workers),
+                        thread_name_prefix="ocr"
+                    )
+        return self._ocr_pool
     
     def extract_text_ocr(self, image_path: str) -> str:
         """Extract text using Tesseract OCR"""
-        try:
-            img = Image.open(image_path)
-            text = pytesseract.image_to_string(img)
-            return text.strip()
-        except Exception as e:
-            print(f"OCR Error: {e}")
-            return ""
+        return _ocr_image(image_path) or ""
+    
+    def extract_text_ocr_batch(
+        self,
+        image_paths: List[str],
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        OCR many images in parallel (ocr_workers tesseract processes)
+        Results are returned in the same order as image_paths,
+        None where OCR failed
+        """
+        if len(image_paths) <= 1 or settings.ocr_workers <= 1:
+            results = []
+            for image_path in image_paths:
+                results.append(_ocr_image(image_path))
+                if on_progress:
+                    on_progress(1)
+            return results
+        
+        pool = self._get_ocr_pool()
+        futures = {
+            pool.submit(_ocr_image, image_path): i
+            for i, image_path in enumerate(image_paths)
+        }
+        results = [None] * len(image_paths)
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                print(f"OCR Error: {e}")
+            if on_progress:
+                on_progress(1)
+        return results
+    
+    def _vision_messages(self, image_path: str) -> list:
+        """Build the Vision API chat messages for an image"""
+        # Encode to base64
+        with open(image_path, "rb") as f:
+            image_data = base64.b64encode(f.read()).decode('utf-8')
+        
+        # Get MIME type
+        ext = os.path.splitext(image_path)[1].lower()
+        mime_types = {
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.png': 'image/png'
+        }
+        mime_type = mime_types.get(ext, 'image/jpeg')
+        
+        return [{
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": "Describe this image. If it has charts, graphs, or tables, explain the data. If it has text, transcribe it."
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:{mime_type};base64,{image_data}"
+                    }
+                }
+            ]
+        }]
     
     def analyze_image_vision(self, image_path: str) -> str:
         """Analyze image with Groq Vision AI"""
         try:
-            # Encode to base64
-            with open(image_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
-            
-            # Get MIME type
-            ext = os.path.splitext(image_path)[1].lower()
-            mime_types = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png'
-            }
-            mime_type = mime_types.get(ext, 'image/jpeg')
-            
-            # Call Vision API
-            response = self.groq_client.chat.completions.create(
+            return self.llm.complete_sync(
+                self._vision_messages(image_path),
                 model=settings.vision_model,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "Describe this image. If it has charts, graphs, or tables, explain the data. If it has text, transcribe it."
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{mime_type};base64,{image_data}"
-                            }
-                        }
-                    ]
-                }],
+                lane="vision",
                 max_tokens=1000,
                 temperature=0.7
             )
-            
-            return response.choices[0].message.content
         except Exception as e:
             print(f"Vision AI Error: {e}")
             return ""
+    
+    def analyze_images_vision(
+        self,
+        image_paths: List[str],
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        Analyze many images concurrently (bounded by vision_concurrency)
+        Blocking; call from a worker thread. Results keep input order,
+        None where the image could not be analyzed
+        Each image is read and base64-encoded only when its call starts,
+        so at most vision_concurrency payloads are in memory
+        """
+        results = self.llm.complete_many(
+            [functools.partial(self._vision_messages, path) for path in image_paths],
+            model=settings.vision_model,
+            lane="vision",
+            on_progress=on_progress,
+            max_tokens=1000,
+            temperature=0.7
+        )
+        
+        descriptions = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Vision AI Error: {result}")
+                descriptions.append(None)
+            else:
+                descriptions.append(result)
+        return descriptions
@@ -0,0 +1,128 @@
+"""
+Ingestion Cache Service
+Content-addressed on-disk cache of processed documents
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from typing import Optional, List
+
+import numpy as np
+
+from app.config import settings
+
+
+class IngestionCache:
+    """
+    Cache of chunks (with their sources) and vectors keyed by file content
+
+    Each entry is a directory holding meta.json and vectors.npy. Entries
+    are evicted least-recently-used first once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash: str) -> str:
+        """Combine the file's SHA-256 with the settings that shape its output"""
+        fingerprint = json.dumps({
+            # Bump when extraction or chunking changes for the same settings
+            "version": 4,
+            "content": content_hash,
+            "chunk_size": settings.chunk_size,
+            "chunk_overlap": settings.chunk_overlap,
+            "pdf_min_text_chars": settings.pdf_min_text_chars,
+            "pdf_min_image_size": settings.pdf_min_image_size,
+            "pdf_raster_dpi": settings.pdf_raster_dpi,
+            "embedding_model": settings.embedding_model,
+            "vision_model": settings.vision_model
+        }, sort_keys=True)
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Load a cached entry
+        Returns dict with chunks, sources, embeddings (float32 array),
+        text_length, num_images or None
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, "meta.json")
+
+        with self._lock:
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                vectors = np.load(os.path.join(entry_dir, "vectors.npy"))
+                # Mark as recently used
+                os.utime(entry_dir)
+            except (OSError, ValueError):
+                return None
+
+        entry["embeddings"] = vectors
+        return entry
+
+    def put(
+        self,
+        key: str,
+        chunks: List[str],
+        sources: List[dict],
+        embeddings: np.ndarray,
+        text_length: int,
+        num_images: int
+    ):
+        """Store an entry and evict old ones if over budget"""
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        try:
+            os.makedirs(tmp_dir, exist_ok=True)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "chunks": chunks,
+                    "sources": sources,
+                    "text_length": text_length,
+                    "num_images": num_images
+                }, f)
+            np.save(
+                os.path.join(tmp_dir, "vectors.npy"),
+                np.asarray(embeddings, dtype=np.float32)
+            )
+
+            with self._lock:
+                if os.path.exists(entry_dir):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+                self._evict()
+        except OSError as e:
+            print(f"Ingestion cache write error: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _evict(self):
+        """Delete least-recently-used entries until under max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if ".tmp-" in name or not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(path), size, path))
+            total += size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -0,0 +1,238 @@
+"""
+Job Queue Service
+Background ingestion jobs with progress tracking
+"""
+
+import os
+import sys
+import time
+import uuid
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+_owner_tokens = {}
+
+
+def _owner() -> dict:
+    """
+    Identifies this process in job records, so other workers can tell when
+    the worker running a job has gone (the token tells pid reuse apart)
+    """
+    pid = os.getpid()
+    return {
+        "owner_host": socket.gethostname(),
+        "owner_pid": pid,
+        "owner_token": _owner_tokens.setdefault(pid, uuid.uuid4().hex)
+    }
+
+
+def _process_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        return True  # os.kill would terminate it; rely on the timeout
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def is_abandoned(record: dict, stale_seconds: float) -> bool:
+    """
+    Whether an unfinished job record was left behind by a worker that is
+    gone (a restart or crash) or has not published it for stale_seconds
+    """
+    if record.get("status") not in ("queued", "processing"):
+        return False
+    if time.time() - record.get("updated_at", 0) > stale_seconds:
+        return True
+    owner = _owner()
+    if record.get("owner_host") != owner["owner_host"]:
+        return False
+    if record.get("owner_pid") == owner["owner_pid"]:
+        # Ours only if written by this process, not an earlier one with the
+        # same pid; live jobs of this process are read from its queue
+        return record.get("owner_token") != owner["owner_token"]
+    return not _process_alive(record.get("owner_pid", 0))
+
+
+class IngestionJob:
+    """Progress of one document ingestion"""
+
+    def __init__(
+        self,
+        job_id: str,
+        filename: str,
+        on_update: Optional[Callable[[dict], None]] = None,
+        session_id: Optional[str] = None
+    ):
+        self.job_id = job_id
+        self.session_id = session_id or job_id
+        self.filename = filename
+        self.status = "queued"
+        self.stage = "queued"
+        self.pages_done = 0
+        self.pages_total = 0
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self._stage_started_at = self.created_at
+        self._lock = threading.Lock()
+        self._on_update = on_update
+        self._last_update = 0.0
+
+    def publish(self, force: bool = False):
+        """Publish progress (throttled unless forced)"""
+        if self._on_update is None:
+            return
+        now = time.time()
+        if not force and now - self._last_update < 0.5:
+            return
+        self._last_update = now
+        try:
+            self._on_update(self.to_dict())
+        except Exception as e:
+            print(f"Job update error: {e}")
+
+    def set_stage(self, stage: str, pages_total: int = 0):
+        """Enter a new stage and reset its page counter"""
+        with self._lock:
+            self.stage = stage
+            self.pages_done = 0
+            self.pages_total = pages_total
+            self._stage_started_at = time.time()
+        print(f"   ⏳ [{self.job_id[:8]}] {stage}")
+        self.publish(force=True)
+
+    def advance(self, pages: int = 1):
+        """Mark pages of the current stage as done"""
+        with self._lock:
+            self.pages_done += pages
+        self.publish()
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated time left in the current stage"""
+        with self._lock:
+            if not self.pages_total or not self.pages_done:
+                return None
+            elapsed = time.time() - self._stage_started_at
+            remaining = self.pages_total - self.pages_done
+            return round(elapsed / self.pages_done * max(remaining, 0), 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "eta_seconds": self.eta_seconds,
+            "error": self.error,
+            "result": self.result,
+            "updated_at": time.time(),
+            **_owner()
+        }
+
+
+class JobQueue:
+    """Run ingestion jobs on a bounded worker pool"""
+
+    def __init__(
+        self,
+        max_workers: int,
+        retention_seconds: int = 3600,
+        on_update: Optional[Callable[[dict], None]] = None,
+        heartbeat_seconds: Optional[float] = None
+    ):
+        """
+        on_update receives job.to_dict() whenever a job makes progress, and
+        every heartbeat_seconds while it is unfinished (so other workers can
+        tell a slow job from an abandoned one)
+        """
+        self.retention_seconds = retention_seconds
+        self._on_update = on_update
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ingest"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        if on_update is not None and heartbeat_seconds:
+            threading.Thread(
+                target=self._heartbeat,
+                args=(heartbeat_seconds,),
+                name="job-heartbeat",
+                daemon=True
+            ).start()
+
+    def submit(
+        self,
+        job_id: str,
+        filename: str,
+        fn: Callable,
+        *args,
+        session_id: Optional[str] = None
+    ) -> IngestionJob:
+        """
+        Enqueue fn(job, *args)
+        Its return value becomes job.result
+        """
+        job = IngestionJob(
+            job_id, filename, on_update=self._on_update, session_id=session_id
+        )
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        job.publish(force=True)
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def remove(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _heartbeat(self, interval: float):
+        while not self._stopped.wait(interval):
+            with self._lock:
+                unfinished = [
+                    job for job in self._jobs.values()
+                    if job.status in ("queued", "processing")
+                ]
+            for job in unfinished:
+                job.publish(force=True)
+
+    def _prune(self):
+        """Forget finished jobs older than retention_seconds"""
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.status in ("ready", "failed") and job.created_at < cutoff:
+                del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob, fn: Callable, args: tuple):
+        job.status = "processing"
+        try:
+            job.result = fn(job, *args)
+            job.status = "ready"
+            job.set_stage("ready")
+        except Exception as e:
+            print(f"❌ Job {job.job_id} failed: {str(e)}")
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "failed"
+            job.set_stage("failed")
+
+    def shutdown(self):
+        self._stopped.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
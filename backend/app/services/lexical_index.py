@@ -0,0 +1,201 @@
+"""
+Lexical Index Service
+In-memory BM25 inverted index for exact-term retrieval
+"""
+
+import re
+import math
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+_WORD_RE = re.compile(r"[0-9a-z]+")
+_COMPOUND_RE = re.compile(r"(?<![0-9a-z])[0-9a-z]+(?:[-_./:][0-9a-z]+)+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens
+    Identifiers such as "XK-42" or "v1.2.3" are kept whole and also
+    split into their parts, so both forms match.
+    """
+    text = text.lower()
+    return _WORD_RE.findall(text) + _COMPOUND_RE.findall(text)
+
+
+class BM25Index:
+    """
+    BM25 over a session's chunks
+
+    Each term maps to numpy arrays of (chunk row, term frequency), so a
+    query only touches the postings of its own terms: scoring is a few
+    vectorized gathers and adds plus one argpartition, independent of
+    vocabulary size. Documents can be added and removed incrementally,
+    concurrently with searches.
+    """
+
+    def __init__(self, k1: Optional[float] = None, b: Optional[float] = None):
+        self.k1 = settings.bm25_k1 if k1 is None else k1
+        self.b = settings.bm25_b if b is None else b
+        self._postings = {}
+        self._chunk_ids = []
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._doc_rows = np.zeros(0, dtype=np.int32)
+        self._doc_index = {}
+        # Never reused, so a removed document's row can't alias a new one
+        self._next_doc_row = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._chunk_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the postings"""
+        postings = sum(rows.nbytes + tfs.nbytes for rows, tfs in self._postings.values())
+        return postings + self._lengths.nbytes + self._doc_rows.nbytes
+
+    def add_document(self, doc_id: str, chunk_ids: List[str], texts: List[str]):
+        """Index one document's chunks"""
+        if not chunk_ids:
+            return
+        # Build (term, row, tf) triples outside the lock, vectorized;
+        # rows are relative to this document
+        tokens = [tokenize(text) for text in texts]
+        lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+        flat = [token for chunk_tokens in tokens for token in chunk_tokens]
+        if flat:
+            terms = list(dict.fromkeys(flat))
+            term_index = {term: i for i, term in enumerate(terms)}
+            term_ids = np.fromiter(
+                map(term_index.__getitem__, flat), dtype=np.int64, count=len(flat)
+            )
+            rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+            # Sorting by term then row groups each term's postings together
+            pairs, tfs = np.unique(term_ids * len(texts) + rows, return_counts=True)
+            pair_terms, pair_rows = np.divmod(pairs, len(texts))
+            bounds = np.flatnonzero(np.diff(pair_terms)) + 1
+            starts = np.concatenate([[0], bounds])
+            ends = np.concatenate([bounds, [len(pairs)]])
+            new_postings = [
+                (terms[pair_terms[start]], pair_rows[start:end], tfs[start:end])
+                for start, end in zip(starts, ends)
+            ]
+        else:
+            new_postings = []
+
+        with self._lock:
+            self._add_postings(doc_id, chunk_ids, lengths, new_postings)
+
+    def _add_postings(
+        self,
+        doc_id: str,
+        chunk_ids: List[str],
+        lengths: np.ndarray,
+        new_postings: List[Tuple[str, np.ndarray, np.ndarray]]
+    ):
+        doc_row = self._doc_index.get(doc_id)
+        if doc_row is None:
+            doc_row = self._doc_index[doc_id] = self._next_doc_row
+            self._next_doc_row += 1
+        first_row = len(self._chunk_ids)
+        for term, rows, tfs in new_postings:
+            rows = rows.astype(np.int32) + first_row
+            tfs = tfs.astype(np.float32)
+            if term in self._postings:
+                old_rows, old_tfs = self._postings[term]
+                rows = np.concatenate([old_rows, rows])
+                tfs = np.concatenate([old_tfs, tfs])
+            self._postings[term] = (rows, tfs)
+
+        self._chunk_ids.extend(chunk_ids)
+        self._lengths = np.concatenate([self._lengths, lengths.astype(np.float32)])
+        self._doc_rows = np.concatenate([
+            self._doc_rows,
+            np.full(len(chunk_ids), doc_row, dtype=np.int32)
+        ])
+
+    def remove_document(self, doc_id: str):
+        """Drop one document's chunks and renumber the rest"""
+        with self._lock:
+            self._remove_postings(doc_id)
+
+    def _remove_postings(self, doc_id: str):
+        doc_row = self._doc_index.pop(doc_id, None)
+        if doc_row is None:
+            return
+        keep = self._doc_rows != doc_row
+        new_row = np.cumsum(keep, dtype=np.int32) - 1
+
+        for term, (rows, tfs) in list(self._postings.items()):
+            alive = keep[rows]
+            if not alive.any():
+                del self._postings[term]
+            elif not alive.all():
+                self._postings[term] = (new_row[rows[alive]], tfs[alive])
+            else:
+                self._postings[term] = (new_row[rows], tfs)
+
+        self._chunk_ids = [
+            chunk_id for chunk_id, alive in zip(self._chunk_ids, keep) if alive
+        ]
+        self._lengths = self._lengths[keep]
+        self._doc_rows = self._doc_rows[keep]
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        doc_ids: Optional[List[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-k chunks by BM25 score, optionally limited to some documents
+        Returns (chunk_id, score) pairs, best first; chunks that share no
+        term with the query are never returned
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            return self._search(terms, k, doc_ids)
+
+    def _search(self, terms: set, k: int, doc_ids: Optional[List[str]]):
+        n = len(self._chunk_ids)
+        terms = [term for term in terms if term in self._postings]
+        if not n or not terms or k <= 0:
+            return []
+
+        avg_length = float(self._lengths.mean()) or 1.0
+        scores = np.zeros(n, dtype=np.float32)
+        for term in terms:
+            rows, tfs = self._postings[term]
+            df = len(rows)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[rows] / avg_length)
+            # rows are unique within a term, so fancy-index add is safe
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        if doc_ids is not None:
+            allowed = [self._doc_index[d] for d in doc_ids if d in self._doc_index]
+            scores[~np.isin(self._doc_rows, allowed)] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            top = np.argpartition(scores[candidates], -k)[-k:]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._chunk_ids[row], float(scores[row])) for row in order]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank)
+    Returns (id, score) pairs, best first
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
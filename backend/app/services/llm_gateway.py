@@ -0,0 +1,377 @@
+"""
+LLM Gateway Service
+Shared async Groq client with pooling, deadlines, retries and concurrency limits
+"""
+
+import queue
+import random
+import asyncio
+import threading
+import contextlib
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union
+
+from app.config import settings
+
+
+class LLMLane:
+    """Concurrency limit and retry policy for one kind of call"""
+
+    def __init__(self, concurrency: int, timeout: float, max_retries: int, retry_base_delay: float):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.semaphore = None  # created on the gateway loop
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+
+
+class LLMGateway:
+    """
+    Process-wide entry point for every Groq call
+
+    Owns one AsyncGroq client (pooled keep-alive connections) on a
+    background event loop, so the same pool serves request handlers on
+    uvicorn's loop (await complete(), astream()) and worker threads
+    (complete_sync(), complete_many(), stream()). Each attempt has a
+    deadline; 429s, 5xx and connection errors are retried with jittered
+    exponential backoff (honouring Retry-After); each lane caps its
+    in-flight calls, streams included until they finish.
+    """
+
+    def __init__(self):
+        self.lanes = {
+            "chat": LLMLane(
+                settings.llm_concurrency,
+                settings.llm_timeout,
+                settings.llm_max_retries,
+                settings.llm_retry_base_delay
+            ),
+            "vision": LLMLane(
+                settings.vision_concurrency,
+                settings.vision_timeout,
+                settings.vision_max_retries,
+                settings.vision_retry_base_delay
+            )
+        }
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever,
+                        name="llm-gateway",
+                        daemon=True
+                    ).start()
+                    asyncio.run_coroutine_threadsafe(self._start(), loop).result()
+                    self._loop = loop
+        return self._loop
+
+    async def _start(self):
+        """Create the client and semaphores on the gateway loop"""
+        # Imported here, on first use, to keep them out of server startup
+        import httpx
+        from groq import AsyncGroq
+        
+        for lane in self.lanes.values():
+            lane.semaphore = asyncio.Semaphore(lane.concurrency)
+        max_connections = sum(lane.concurrency for lane in self.lanes.values())
+        self._client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            max_retries=0,  # retried here, with our own backoff and deadlines
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                ),
+                # Backstop only; per-attempt deadlines are applied in _call
+                timeout=httpx.Timeout(
+                    max(lane.timeout for lane in self.lanes.values())
+                )
+            )
+        )
+
+    def _submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        from groq import APIConnectionError, APIStatusError, RateLimitError
+        if isinstance(error, (RateLimitError, APIConnectionError, asyncio.TimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code >= 500
+
+    @staticmethod
+    def _retry_delay(lane: LLMLane, error: Exception, attempt: int) -> float:
+        from groq import APIStatusError
+        delay = lane.retry_base_delay * (2 ** attempt)
+        if isinstance(error, APIStatusError):
+            try:
+                delay = float(error.response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        return delay + random.uniform(0, delay * 0.1)
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, lane: LLMLane):
+        """Hold one of the lane's concurrency slots"""
+        async with lane.semaphore:
+            lane.calls += 1
+            lane.in_flight += 1
+            try:
+                yield
+            finally:
+                lane.in_flight -= 1
+
+    async def _call(
+        self,
+        lane_name: str,
+        open_call: Callable,
+        slot: Optional[contextlib.AsyncExitStack] = None
+    ):
+        """
+        Run open_call() under the lane's limit, deadline and retry policy
+        (on the gateway loop)
+        With slot given, the lane slot of the successful attempt is kept
+        until slot is closed (e.g. once a stream is consumed)
+        """
+        lane = self.lanes[lane_name]
+        for attempt in range(lane.max_retries + 1):
+            try:
+                async with contextlib.AsyncExitStack() as attempt_slot:
+                    await attempt_slot.enter_async_context(self._slot(lane))
+                    result = await asyncio.wait_for(open_call(), lane.timeout)
+                    if slot is not None:
+                        slot.push_async_exit(attempt_slot.pop_all())
+                    return result
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == lane.max_retries:
+                    lane.failures += 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise TimeoutError(
+                            f"LLM call timed out after {lane.timeout}s"
+                        ) from e
+                    raise
+                lane.retries += 1
+                await asyncio.sleep(self._retry_delay(lane, e, attempt))
+
+    async def _complete(
+        self,
+        lane: str,
+        messages: Union[list, Callable[[], list]],
+        model: str,
+        **params
+    ) -> str:
+        async def open_call():
+            # Built only once the lane has a slot free (e.g. base64 images),
+            # so at most `concurrency` payloads are held at a time
+            request = await asyncio.to_thread(messages) if callable(messages) else messages
+            return await self._client.chat.completions.create(
+                model=model, messages=request, **params
+            )
+        
+        response = await self._call(lane, open_call)
+        return response.choices[0].message.content
+
+    async def complete(
+        self,
+        messages: list,
+        model: str,
+        lane: str = "chat",
+        **params
+    ) -> str:
+        """Chat completion text; awaitable from any event loop"""
+        return await asyncio.wrap_future(
+            self._submit(self._complete(lane, messages, model, **params))
+        )
+
+    def complete_sync(
+        self,
+        messages: list,
+        model: str,
+        lane: str = "chat",
+        **params
+    ) -> str:
+        """Chat completion text; blocking, call from a worker thread"""
+        return self._submit(self._complete(lane, messages, model, **params)).result()
+
+    def complete_many(
+        self,
+        requests: List[Union[list, Callable[[], list]]],
+        model: str,
+        lane: str = "chat",
+        on_progress: Optional[Callable[[int], None]] = None,
+        **params
+    ) -> List[Union[str, Exception]]:
+        """
+        Run many completions concurrently (bounded by the lane's limit)
+        A request may be a callable that builds its messages; it is called
+        in a thread once the request gets a slot, for each attempt.
+        Blocking; results keep input order, failures are returned as
+        their exception
+        """
+        async def run_one(messages: Union[list, Callable[[], list]]) -> Union[str, Exception]:
+            try:
+                return await self._complete(lane, messages, model, **params)
+            except Exception as e:
+                return e
+            finally:
+                if on_progress:
+                    on_progress(1)
+
+        async def run_all() -> List[Union[str, Exception]]:
+            return await asyncio.gather(*(run_one(m) for m in requests))
+
+        if not requests:
+            return []
+        return self._submit(run_all()).result()
+
+    async def _stream(self, lane: str, messages: list, model: str, **params) -> AsyncIterator[str]:
+        """
+        Yield text deltas (on the gateway loop)
+        Opening the stream is retried; once tokens flow each one must
+        arrive within the lane's deadline. The lane slot is held until
+        the stream is consumed or closed.
+        """
+        timeout = self.lanes[lane].timeout
+        async with contextlib.AsyncExitStack() as slot:
+            stream = await self._call(
+                lane,
+                lambda: self._client.chat.completions.create(
+                    model=model, messages=messages, stream=True, **params
+                ),
+                slot=slot
+            )
+            # Closes the response (cancelling the upstream request) before
+            # the slot is released
+            slot.push_async_callback(stream.close)
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def astream(
+        self,
+        messages: list,
+        model: str,
+        lane: str = "chat",
+        **params
+    ) -> AsyncIterator[str]:
+        """
+        Chat completion as text deltas; async iterator for any event loop
+        Closing the iterator early cancels the upstream request
+        """
+        loop = asyncio.get_running_loop()
+        tokens = asyncio.Queue()
+        done = object()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(tokens.put_nowait, item)
+            except RuntimeError:
+                pass  # the caller's loop is already closed
+
+        async def pump():
+            try:
+                async for token in self._stream(lane, messages, model, **params):
+                    put(token)
+                put(done)
+            except BaseException as e:
+                put(e)
+                raise
+
+        future = self._submit(pump())
+        try:
+            while True:
+                item = await tokens.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stream(
+        self,
+        messages: list,
+        model: str,
+        lane: str = "chat",
+        **params
+    ) -> Iterator[str]:
+        """
+        Chat completion as text deltas; blocking iterator for worker threads
+        Closing the iterator early cancels the upstream request
+        """
+        tokens = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for token in self._stream(lane, messages, model, **params):
+                    tokens.put(token)
+                tokens.put(done)
+            except BaseException as e:
+                tokens.put(e)
+                raise
+
+        future = self._submit(pump())
+        try:
+            while True:
+                item = tokens.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "calls": lane.calls,
+                "retries": lane.retries,
+                "failures": lane.failures,
+                "in_flight": lane.in_flight
+            }
+            for name, lane in self.lanes.items()
+        }
+
+    def close(self):
+        """Close pooled connections and stop the gateway loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result(timeout=5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_llm_gateway = None
+_llm_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway"""
+    global _llm_gateway
+    if _llm_gateway is None:
+        with _llm_gateway_lock:
+            if _llm_gateway is None:
+                _llm_gateway = LLMGateway()
+    return _llm_gateway
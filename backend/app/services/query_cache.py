@@ -0,0 +1,149 @@
+"""
+Query Cache Service
+Bounded in-process caches for question embeddings and retrieval results
+"""
+
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+class LRUCache:
+    """Thread-safe LRU cache with hit/miss counters and a size estimate"""
+
+    def __init__(self, max_entries: int, sizeof: Callable[[Hashable, Any], int]):
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizeof(key, self._entries.pop(key))
+            self._entries[key] = value
+            self._bytes += self._sizeof(key, value)
+            while len(self._entries) > self.max_entries:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._sizeof(old_key, old_value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "approx_bytes": self._bytes
+            }
+
+
+class QueryEmbeddingCache(LRUCache):
+    """question text -> float32 embedding"""
+
+    def __init__(self, max_entries: int):
+        super().__init__(
+            max_entries,
+            sizeof=lambda key, value: sys.getsizeof(key) + value.nbytes
+        )
+
+    def get_embedding(self, text: str) -> Optional[List[float]]:
+        vector = self.get(text)
+        return None if vector is None else vector.tolist()
+
+    def put_embedding(self, text: str, embedding: List[float]):
+        self.put(text, np.asarray(embedding, dtype=np.float32))
+
+
+class RetrievalCache(LRUCache):
+    """
+    (collection, generation, embedding, k, doc filter) -> (chunk ids, distances)
+
+    Each collection has a generation counter. Rebuilding a collection bumps
+    it, so stale results can never be served and simply age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int):
+        super().__init__(
+            max_entries,
+            sizeof=lambda key, value: (
+                sys.getsizeof(key)
+                + sum(sys.getsizeof(chunk_id) for chunk_id in value[0])
+                + 8 * len(value[1])
+            )
+        )
+        self._generations = {}
+        self._generation_lock = threading.Lock()
+
+    def invalidate(self, collection_name: str):
+        """Forget every result for a collection (call when it is rebuilt)"""
+        with self._generation_lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+
+    def make_key(
+        self,
+        collection_name: str,
+        embedding: List[float],
+        k: int,
+        doc_ids: Optional[List[str]] = None
+    ) -> tuple:
+        digest = hashlib.blake2b(
+            np.asarray(embedding, dtype=np.float32).tobytes(),
+            digest_size=16
+        ).digest()
+        with self._generation_lock:
+            generation = self._generations.get(collection_name, 0)
+        return (collection_name, generation, digest, k, tuple(doc_ids or ()))
+
+    def get_results(self, key: tuple) -> Optional[Tuple[List[str], List[float]]]:
+        return self.get(key)
+
+    def put_results(self, key: tuple, ids: List[str], distances: List[float]):
+        self.put(key, (list(ids), list(distances)))
+
+
+_query_embedding_cache = None
+_retrieval_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get the process-wide question embedding cache"""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        with _cache_lock:
+            if _query_embedding_cache is None:
+                _query_embedding_cache = QueryEmbeddingCache(
+                    settings.query_embedding_cache_size
+                )
+    return _query_embedding_cache
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get the process-wide retrieval result cache"""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        with _cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = RetrievalCache(settings.retrieval_cache_size)
+    return _retrieval_cache
@@ -3,77 +3,531 @@ RAG Engine Service
 Vector store and LLM query engine
 """
 
-from groq import Groq
+import re
+import time
+import asyncio
+import hashlib
+import itertools
+import threading
+from typing import Optional, List, AsyncIterator, Callable, Iterable, Iterator, Tuple, Union
+
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-import chromadb
-from chromadb.config import Settings
+from langchain_text_splitters.character import _split_text_with_regex
 
 from app.config import settings
+from app.services.embedding_service import get_embedding_service
+from app.services.answer_cache import get_answer_cache
+from app.services.llm_gateway import get_llm_gateway
+from app.services.query_cache import get_retrieval_cache
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.services.vector_store import (
+    VectorStore, create_vector_store, open_vector_store,
+    should_promote, promote_to_chroma
+)
+
+
+# Where in its document a chunk came from (kept in chunk metadata)
+SOURCE_FIELDS = ("page", "slide", "sheet", "image")
 
 
 class RAGEngine:
     """RAG engine with vector database and LLM"""
     
-    def __init__(self):
-        self.groq_client = Groq(api_key=settings.groq_api_key)
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.embedding_model
-        )
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.collection_name = f"session_{session_id}"
+        self.llm = get_llm_gateway()
+        self.embeddings = get_embedding_service()
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap,
             length_function=len
         )
-        self.collection = None
-        self.texts = []
-    
-    def create_vector_store(self, text: str):
-        """Create vector store from text"""
-        # Split text
-        self.texts = self.text_splitter.split_text(text)
-        
-        # Create ChromaDB client
-        client = chromadb.Client(Settings(
-            anonymized_telemetry=False,
-            allow_reset=True
-        ))
-        
-        # Create collection
-        collection_name = "documents"
-        try:
-            client.delete_collection(collection_name)
-        except:
-            pass
+        self.store: Optional[VectorStore] = None
+        # chunk_id -> text, and chunk_id -> {"doc_id", "filename", *SOURCE_FIELDS}
+        self.chunks = {}
+        self.chunk_sources = {}
+        # doc_id -> {"filename", "content_hash", "num_chunks"}
+        self.documents = {}
+        # Lexical index kept in step with the vector store (hybrid search)
+        self.lexical_index = BM25Index()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, session_id: str) -> Optional["RAGEngine"]:
+        """
+        Reattach to a session's persisted vector store
+        Returns None if the session has no index
+        """
+        engine = cls(session_id)
+        engine.store = open_vector_store(engine.collection_name)
+        if engine.store is None:
+            return None
         
-        self.collection = client.create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Indexes built before multi-document sessions carry their
+        # filename on the collection rather than on each chunk
+        legacy = engine.metadata
+        stored = engine.store.get_all()
+        for chunk_id, text, chunk_meta in zip(
+            stored["ids"], stored["documents"], stored["metadatas"]
+        ):
+            chunk_meta = chunk_meta or {}
+            engine._register_chunk(
+                chunk_id,
+                text,
+                doc_id=chunk_meta.get("doc_id", session_id),
+                filename=chunk_meta.get("filename", legacy.get("filename", "")),
+                content_hash=chunk_meta.get("content_hash", legacy.get("content_hash", "")),
+                source=chunk_meta
+            )
         
-        # Add documents
-        for i, chunk in enumerate(self.texts):
-            embedding = self.embeddings.embed_query(chunk)
-            self.collection.add(
-                ids=[f"chunk_{i}"],
-                embeddings=[embedding],
-                documents=[chunk]
+        for doc_id in engine.documents:
+            chunk_ids = [
+                chunk_id for chunk_id, source in engine.chunk_sources.items()
+                if source["doc_id"] == doc_id
+            ]
+            engine.lexical_index.add_document(
+                doc_id, chunk_ids, [engine.chunks[chunk_id] for chunk_id in chunk_ids]
             )
         
-        print(f"✓ Vector store: {len(self.texts)} chunks")
+        get_retrieval_cache().invalidate(engine.collection_name)
+        return engine
+    
+    @property
+    def metadata(self) -> dict:
+        """Session metadata stored alongside the collection (legacy indexes)"""
+        if self.store is None:
+            return {}
+        return self.store.metadata
+    
+    @property
+    def texts(self) -> List[str]:
+        """All chunk texts in the session"""
+        return list(self.chunks.values())
+    
+    def memory_bytes(self) -> int:
+        """Approximate memory held by this session (chunk texts and vectors)"""
+        text_bytes = sum(len(text) for text in self.texts)
+        vector_bytes = self.store.nbytes if self.store is not None else 0
+        return text_bytes + vector_bytes + self.lexical_index.nbytes
     
-    def query(self, question: str, language: str = "en", k: int = 5) -> str:
-        """Query vector store and generate answer"""
+    @property
+    def document_key(self) -> str:
+        """Hash of the session's current document set (content hashes)"""
+        keys = sorted(
+            info["content_hash"] or doc_id
+            for doc_id, info in self.documents.items()
+        )
+        if not keys:
+            return self.session_id
+        return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()
+    
+    def _register_chunk(
+        self,
+        chunk_id: str,
+        text: str,
+        doc_id: str,
+        filename: str,
+        content_hash: str = "",
+        source: Optional[dict] = None
+    ):
+        source = source or {}
+        self.chunks[chunk_id] = text
+        self.chunk_sources[chunk_id] = {
+            "doc_id": doc_id,
+            "filename": filename,
+            **{field: source.get(field) for field in SOURCE_FIELDS}
+        }
+        info = self.documents.setdefault(doc_id, {
+            "filename": filename,
+            "content_hash": content_hash,
+            "num_chunks": 0
+        })
+        info["num_chunks"] += 1
+    
+    def _get_store(self, new_chunks: int = 0) -> VectorStore:
+        """
+        Open or create this session's store, moving a NumPy store to
+        Chroma first if new_chunks would take it past the size threshold
+        """
+        if self.store is None:
+            self.store = create_vector_store(self.collection_name)
+        if should_promote(self.store, new_chunks):
+            self.store = promote_to_chroma(self.store)
+        return self.store
+    
+    def create_vector_store(
+        self,
+        text: str,
+        doc_id: Optional[str] = None,
+        filename: str = "",
+        content_hash: str = ""
+    ) -> np.ndarray:
+        """
+        Create vector store from a single document's text,
+        replacing anything already indexed in this session
+        Returns the chunk embeddings
+        """
+        self.delete()
+        return self.add_document(
+            doc_id or self.session_id,
+            filename,
+            self.text_splitter.split_text(text),
+            content_hash=content_hash
+        )["embeddings"]
+    
+    def iter_chunks(self, segments: Iterable[Tuple[str, dict]]) -> Iterator[Tuple[str, dict]]:
+        """
+        Split a stream of (text, source) segments into (chunk, source)
         
-        # Search
-        question_embedding = self.embeddings.embed_query(question)
-        results = self.collection.query(
-            query_embeddings=[question_embedding],
-            n_results=min(k, len(self.texts))
+        Consecutive segments with the same source (e.g. one page, or a
+        run of paragraphs) are split together, and a chunk never spans two
+        sources. About chunking_window_chars are buffered: when the buffer
+        fills, the chunks that are final are emitted and the rest carried
+        over (see _split_window), so memory stays bounded whatever the
+        document size, and a source's chunks match split_text of its whole
+        text.
+        Segments marked "chunked" pass through as they are.
+        """
+        window = max(settings.chunking_window_chars, 4 * settings.chunk_size)
+        buffer = []
+        size = 0
+        current = None
+        
+        def flush() -> Iterator[Tuple[str, dict]]:
+            for chunk in self.text_splitter.split_text("".join(buffer)):
+                yield chunk, current
+        
+        for text, source in segments:
+            chunked = source.get("chunked", False)
+            source = {field: source[field] for field in SOURCE_FIELDS if field in source}
+            # Whitespace within a source is kept, as split_text would see it
+            if not text.strip() and (chunked or not buffer or source != current):
+                continue
+            if chunked:
+                yield from flush()
+                buffer, size = [], 0
+                yield text, source
+                continue
+            if buffer and source != current:
+                yield from flush()
+                buffer, size = [], 0
+            current = source
+            buffer.append(text)
+            size += len(text)
+            
+            if size >= window:
+                chunks, tail = self._split_window("".join(buffer))
+                for chunk in chunks:
+                    yield chunk, current
+                buffer, size = [tail], len(tail)
+        
+        yield from flush()
+    
+    def _split_window(self, text: str) -> Tuple[List[str], str]:
+        """
+        Split a full chunking window, as far as the text seen so far allows
+        Returns the chunks that are final and the raw tail to carry over
+        
+        Works on the splitter's own top-level pieces: complete pieces are
+        merged (or recursively split) exactly as split_text would, and the
+        pieces of the chunk still being merged are carried over with the
+        last, possibly unfinished, piece. Re-merging those from a fresh
+        start reproduces the merge state, so the next window continues
+        where split_text would.
+        """
+        # Mirrors RecursiveCharacterTextSplitter._split_text, so it uses the
+        # splitter's internals; langchain-text-splitters is pinned for this
+        splitter = self.text_splitter
+        separators = splitter._separators
+        # The separator split_text would pick for this text
+        level = next(
+            i for i, s in enumerate(separators)
+            if s == "" or s in text or i == len(separators) - 1
         )
+        separator = separators[level]
+        pieces = []
+        if separator:
+            pieces = _split_text_with_regex(
+                text, re.escape(separator), splitter._keep_separator
+            )
+        if len(pieces) < 2:
+            # No piece boundary in the window (e.g. one huge paragraph):
+            # cut before the last chunk, which is then split again
+            chunks = splitter.split_text(text)
+            if not chunks:
+                return [], ""
+            return chunks[:-1], text[text.rfind(chunks[-1]):]
+        
+        last_piece = pieces.pop()
+        merge_separator = "" if splitter._keep_separator else separator
+        chunks = []
+        merging = []
+        for piece in pieces:
+            if len(piece) < splitter._chunk_size:
+                merging.append(piece)
+                continue
+            if merging:
+                chunks.extend(splitter._merge_splits(merging, merge_separator))
+                merging = []
+            if level + 1 < len(separators):
+                chunks.extend(splitter._split_text(piece, separators[level + 1:]))
+            else:
+                chunks.append(piece)
+        
+        carried = []
+        if merging:
+            merged = splitter._merge_splits(merging, merge_separator)
+            chunks.extend(merged)
+            # Find the pieces the last chunk was joined from, and carry them
+            # instead; they add up to at most chunk_size, so look that far back
+            found = None
+            start = len(merging)
+            length = 0
+            while merged and start and length + len(merging[start - 1]) <= splitter._chunk_size:
+                start -= 1
+                length += len(merging[start]) + len(merge_separator)
+                if merge_separator.join(merging[start:]).strip() == merged[-1]:
+                    found = start
+            if found is not None:
+                chunks.pop()
+                carried = merging[found:]
+        return chunks, merge_separator.join(carried + [last_piece])
+    
+    def add_document(
+        self,
+        doc_id: str,
+        filename: str,
+        chunks: Iterable[Union[str, Tuple[str, dict]]],
+        content_hash: str = "",
+        embeddings: Optional[np.ndarray] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        Append one document's chunks to this session's vector store
+        
+        chunks may be a lazy stream of texts or (text, source) pairs: it is
+        consumed one embedding batch at a time, outside the engine lock,
+        so extraction, embedding and indexing overlap. Chunks are not
+        embedded at all if embeddings are supplied (e.g. from the
+        ingestion cache).
+        on_progress is called with the size of each indexed batch
+        If the stream fails, what was indexed of the document is removed
+        again (the whole store, if it was the session's only document)
+        Returns {"chunks", "sources", "embeddings"} for what was indexed
+        """
+        with self._lock:
+            if doc_id in self.documents:
+                self._remove_document_locked(doc_id)
+        
+        start = time.perf_counter()
+        batch_size = max(1, settings.embedding_batch_size)
+        all_chunks = []
+        all_sources = []
+        all_embeddings = []
+        chunks = iter(chunks)
+        offset = 0
+        store = None
+        
+        try:
+            while True:
+                batch = list(itertools.islice(chunks, batch_size))
+                if not batch:
+                    break
+                texts = [chunk if isinstance(chunk, str) else chunk[0] for chunk in batch]
+                sources = [{} if isinstance(chunk, str) else chunk[1] for chunk in batch]
+                if embeddings is not None:
+                    batch_embeddings = np.asarray(
+                        embeddings[offset:offset + len(batch)], dtype=np.float32
+                    )
+                else:
+                    batch_embeddings = np.asarray(
+                        self.embeddings.embed_documents(texts), dtype=np.float32
+                    )
+                ids = [f"{doc_id}_{i}" for i in range(offset, offset + len(batch))]
+                
+                with self._lock:
+                    store = self._get_store(new_chunks=len(batch))
+                    store.add(
+                        ids,
+                        batch_embeddings.tolist(),
+                        texts,
+                        [
+                            {
+                                "doc_id": doc_id,
+                                "filename": filename,
+                                "content_hash": content_hash,
+                                "chunk": i,
+                                # Chroma metadata can't hold None
+                                **{
+                                    field: source[field] for field in SOURCE_FIELDS
+                                    if source.get(field) is not None
+                                }
+                            }
+                            for i, source in zip(range(offset, offset + len(batch)), sources)
+                        ]
+                    )
+                    for chunk_id, text, source in zip(ids, texts, sources):
+                        self._register_chunk(chunk_id, text, doc_id, filename, content_hash, source)
+                    self.lexical_index.add_document(doc_id, ids, texts)
+                    get_retrieval_cache().invalidate(self.collection_name)
+                
+                all_chunks.extend(texts)
+                all_sources.extend(sources)
+                all_embeddings.append(batch_embeddings)
+                offset += len(batch)
+                if on_progress:
+                    on_progress(len(batch))
+        except Exception:
+            # Don't leave a partly indexed document searchable or persisted
+            with self._lock:
+                if set(self.documents) <= {doc_id}:
+                    self.delete()
+                elif doc_id in self.documents:
+                    self._remove_document_locked(doc_id)
+                    get_retrieval_cache().invalidate(self.collection_name)
+            raise
+        
+        with self._lock:
+            store = self._get_store()
+            store.persist()
+        elapsed = time.perf_counter() - start
+        
+        rate = offset / elapsed if elapsed > 0 else 0.0
+        print(f"✓ Vector store: +{offset} chunks from {filename} "
+              f"({rate:.1f} chunks/sec, {len(self.chunks)} total, {store.backend})")
+        return {
+            "chunks": all_chunks,
+            "sources": all_sources,
+            "embeddings": (
+                np.concatenate(all_embeddings) if all_embeddings
+                else np.zeros((0, 0), dtype=np.float32)
+            )
+        }
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """Remove one document's chunks; returns False if it is not indexed"""
+        with self._lock:
+            if doc_id not in self.documents:
+                return False
+            self._remove_document_locked(doc_id)
+            get_retrieval_cache().invalidate(self.collection_name)
+        print(f"✓ Vector store: removed document {doc_id}")
+        return True
+    
+    def _remove_document_locked(self, doc_id: str):
+        store = self._get_store()
+        store.delete_document(doc_id)
+        store.persist()
+        self.lexical_index.remove_document(doc_id)
+        for chunk_id in [
+            chunk_id for chunk_id, source in self.chunk_sources.items()
+            if source["doc_id"] == doc_id
+        ]:
+            del self.chunks[chunk_id]
+            del self.chunk_sources[chunk_id]
+        del self.documents[doc_id]
+    
+    def delete(self):
+        """Drop this session's vector store"""
+        store = self.store or open_vector_store(self.collection_name)
+        if store is not None:
+            store.drop()
+        self.store = None
+        self.chunks = {}
+        self.chunk_sources = {}
+        self.documents = {}
+        self.lexical_index = BM25Index()
+        get_retrieval_cache().invalidate(self.collection_name)
+    
+    def retrieve(
+        self,
+        question: str,
+        k: int = 5,
+        question_embedding: Optional[List[float]] = None,
+        doc_ids: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Search this session's chunks, optionally limited to some documents
+        
+        With hybrid search on, the top candidates of the vector and BM25
+        rankers are fused with reciprocal rank fusion, so exact terms such
+        as identifiers and cell values are found even when their
+        embeddings are not close to the question's.
+        Returns ids, documents (chunk texts), scores and sources
+        """
+        if question_embedding is None:
+            question_embedding = self.embeddings.embed_query(question)
+        if doc_ids:
+            doc_ids = sorted(set(doc_ids))
+        
+        if not settings.hybrid_search:
+            ids, distances = self._vector_search(question_embedding, k, doc_ids)
+            ranked = [
+                (chunk_id, 1 - distance) for chunk_id, distance in zip(ids, distances)
+            ]
+        else:
+            n_candidates = max(k, settings.hybrid_candidates)
+            vector_ids, _ = self._vector_search(question_embedding, n_candidates, doc_ids)
+            lexical_ids = [
+                chunk_id for chunk_id, _ in
+                self.lexical_index.search(question, n_candidates, doc_ids)
+            ]
+            ranked = reciprocal_rank_fusion(
+                [vector_ids, lexical_ids], settings.rrf_k
+            )[:k]
+        
+        # Skip chunks of a document removed while the query was running
+        chunks = self.chunks
+        ranked = [(chunk_id, score) for chunk_id, score in ranked if chunk_id in chunks]
+        
+        return {
+            "ids": [chunk_id for chunk_id, _ in ranked],
+            "documents": [chunks[chunk_id] for chunk_id, _ in ranked],
+            "scores": [score for _, score in ranked],
+            "sources": [self._source(chunk_id, round(score, 4)) for chunk_id, score in ranked]
+        }
+    
+    def _source(self, chunk_id: str, score: float) -> dict:
+        return {
+            "chunk_id": chunk_id,
+            **self.chunk_sources[chunk_id],
+            "score": score,
+            "preview": self.chunks[chunk_id][:200]
+        }
+    
+    def _vector_search(
+        self,
+        question_embedding: List[float],
+        k: int,
+        doc_ids: Optional[List[str]]
+    ) -> Tuple[List[str], List[float]]:
+        """Nearest chunks by cosine distance; returns (ids, distances)"""
+        candidates = len(self.chunks)
+        if doc_ids:
+            candidates = sum(
+                self.documents[doc_id]["num_chunks"]
+                for doc_id in doc_ids if doc_id in self.documents
+            )
+        n_results = min(k, candidates)
+        if n_results <= 0 or self.store is None:
+            return [], []
         
-        context = "\n\n".join(results['documents'][0])
+        cache = get_retrieval_cache()
+        cache_key = cache.make_key(
+            self.collection_name, question_embedding, n_results, doc_ids
+        )
+        cached = cache.get_results(cache_key)
+        if cached is not None:
+            return cached
         
+        ids, distances = self.store.query(question_embedding, n_results, doc_ids)
+        cache.put_results(cache_key, ids, distances)
+        return ids, distances
+    
+    def _build_messages(self, question: str, context: str, language: str) -> list:
+        """Build the chat messages for the LLM"""
         # System prompt
         if language == "ta":
             system = "You are helpful. Answer in Tanglish (Tamil + English mix)."
@@ -87,15 +541,223 @@ Question: {question}
 
 Answer based on context. If not found, say so politely."""
         
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _format_context(self, results: dict) -> str:
+        """Join retrieved chunks, labelled with their source file"""
+        if len(self.documents) <= 1:
+            return "\n\n".join(results['documents'])
+        return "\n\n".join(
+            f"[{source['filename']}]\n{text}"
+            for source, text in zip(results['sources'], results['documents'])
+        )
+    
+    def _answer_scope(self, language: str, doc_ids: Optional[List[str]]) -> tuple:
+        return (self.document_key, language, tuple(sorted(set(doc_ids or []))))
+    
+    def _document_ref(self, doc_id: str) -> str:
+        """A document by content, as in document_key"""
+        info = self.documents.get(doc_id)
+        return (info and info["content_hash"]) or doc_id
+    
+    def _to_cached(self, result: dict) -> Optional[dict]:
+        """
+        Answer cache payload: the answer, and its sources as positions in
+        their documents by content rather than this session's ids, since
+        the cache is shared by every session holding the same files
+        Returns None if a source can't be expressed that way
+        """
+        sources = []
+        for source in result["sources"]:
+            prefix = f"{source['doc_id']}_"
+            if not source["chunk_id"].startswith(prefix):
+                return None  # legacy chunk id
+            sources.append({
+                "document": self._document_ref(source["doc_id"]),
+                "chunk": source["chunk_id"][len(prefix):],
+                "score": source["score"]
+            })
+        return {"answer": result["answer"], "sources": sources}
+    
+    def _from_cached(self, cached: dict) -> Optional[dict]:
+        """A cached answer with its sources mapped onto this session's chunks"""
+        doc_ids = {self._document_ref(doc_id): doc_id for doc_id in list(self.documents)}
+        sources = []
+        for source in cached["sources"]:
+            chunk_id = f"{doc_ids.get(source['document'])}_{source['chunk']}"
+            if chunk_id not in self.chunks:
+                return None
+            sources.append(self._source(chunk_id, source["score"]))
+        return {"answer": cached["answer"], "sources": sources}
+    
+    def _cached_answer(
+        self,
+        question: str,
+        scope: tuple
+    ) -> Tuple[Optional[dict], Optional[List[float]]]:
+        """
+        Look up the answer cache
+        Returns (cached {"answer", "sources"} or None, question embedding or None)
+        Exact matches return before the question is embedded
+        """
+        cache = get_answer_cache()
+        
+        cached = cache.get_exact(scope, question)
+        if cached is not None:
+            answer = self._from_cached(cached)
+            if answer is not None:
+                return answer, None
+        
+        question_embedding = self.embeddings.embed_query(question)
+        cached = cache.get_similar(scope, question_embedding)
+        if cached is not None:
+            cached = self._from_cached(cached)
+        return cached, question_embedding
+    
+    def _prepare_query(
+        self,
+        question: str,
+        language: str,
+        k: int,
+        doc_ids: Optional[List[str]]
+    ) -> dict:
+        """
+        Everything before generation: answer cache lookup, then retrieval
+        Returns {"scope", "cached", "embedding", "results", "messages"}
+        """
+        scope = self._answer_scope(language, doc_ids)
+        
+        # Cache
+        cached, question_embedding = self._cached_answer(question, scope)
+        if cached is not None:
+            print("⚡ Answer cache hit")
+            return {"scope": scope, "cached": cached}
+        
+        # Search
+        results = self.retrieve(question, k, question_embedding, doc_ids)
+        context = self._format_context(results)
+        return {
+            "scope": scope,
+            "cached": None,
+            "embedding": question_embedding,
+            "results": results,
+            "messages": self._build_messages(question, context, language)
+        }
+    
+    def _finish_query(self, question: str, prepared: dict, answer: str) -> dict:
+        result = {"answer": answer, "sources": prepared["results"]["sources"]}
+        cached = self._to_cached(result)
+        if cached is not None:
+            get_answer_cache().put(prepared["scope"], question, prepared["embedding"], cached)
+        return result
+    
+    def query(
+        self,
+        question: str,
+        language: str = "en",
+        k: int = 5,
+        doc_ids: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Query vector store and generate answer (blocking)
+        Returns {"answer": str, "sources": [...]}
+        """
+        prepared = self._prepare_query(question, language, k, doc_ids)
+        if prepared["cached"] is not None:
+            return prepared["cached"]
+        
         # Generate
-        response = self.groq_client.chat.completions.create(
+        answer = self.llm.complete_sync(
+            prepared["messages"],
             model=settings.llm_model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt}
-            ],
             max_tokens=1000,
             temperature=0.7
         )
+        return self._finish_query(question, prepared, answer)
+    
+    async def aquery(
+        self,
+        question: str,
+        language: str = "en",
+        k: int = 5,
+        doc_ids: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Async query: embedding and search run in a worker thread, and the
+        event loop is free while the LLM generates
+        Returns {"answer": str, "sources": [...]}
+        """
+        prepared = await asyncio.to_thread(
+            self._prepare_query, question, language, k, doc_ids
+        )
+        if prepared["cached"] is not None:
+            return prepared["cached"]
+        
+        # Generate
+        answer = await self.llm.complete(
+            prepared["messages"],
+            model=settings.llm_model,
+            max_tokens=1000,
+            temperature=0.7
+        )
+        return self._finish_query(question, prepared, answer)
+    
+    async def query_stream(
+        self,
+        question: str,
+        language: str = "en",
+        k: int = 5,
+        doc_ids: Optional[List[str]] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Query vector store and stream the answer
+        Embedding and search run in a worker thread, tokens are awaited
+        
+        Yields events:
+            {"type": "context", "sources": [...], "retrieval_ms": float}
+            {"type": "token", "content": str}   (one per LLM delta)
+            {"type": "done", "ttft_ms": float, "total_ms": float, "cached": bool}
+        """
+        start = time.perf_counter()
+        prepared = await asyncio.to_thread(
+            self._prepare_query, question, language, k, doc_ids
+        )
+        
+        cached = prepared["cached"]
+        if cached is not None:
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+            yield {"type": "context", "sources": cached["sources"], "retrieval_ms": elapsed_ms}
+            yield {"type": "token", "content": cached["answer"]}
+            yield {"type": "done", "ttft_ms": elapsed_ms, "total_ms": elapsed_ms, "cached": True}
+            return
+        
+        yield {
+            "type": "context",
+            "sources": prepared["results"]["sources"],
+            "retrieval_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+        
+        # Generate
+        stream = self.llm.astream(
+            prepared["messages"],
+            model=settings.llm_model,
+            max_tokens=1000,
+            temperature=0.7
+        )
+        
+        ttft_ms = None
+        tokens = []
+        async for token in stream:
+            if ttft_ms is None:
+                ttft_ms = round((time.perf_counter() - start) * 1000, 1)
+            tokens.append(token)
+            yield {"type": "token", "content": token}
+        
+        self._finish_query(question, prepared, "".join(tokens))
         
-        return response.choices[0].message.content
+        total_ms = round((time.perf_counter() - start) * 1000, 1)
+        print(f"⏱️  TTFT: {ttft_ms}ms, total: {total_ms}ms")
+        yield {"type": "done", "ttft_ms": ttft_ms, "total_ms": total_ms, "cached": False}
@@ -0,0 +1,136 @@
+"""
+Session Manager Service
+Bounded in-memory session store with idle and LRU eviction
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class SessionManager:
+    """
+    Keeps live sessions in memory within a count and byte budget
+
+    Sessions idle for longer than idle_ttl_seconds, or the least recently
+    used ones once max_sessions / max_bytes is exceeded, are evicted.
+    Their indexes stay persisted on disk, so an evicted session is
+    transparently reloaded through `loader` on its next access.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_bytes: int,
+        idle_ttl_seconds: float,
+        loader: Callable[[str], Optional[dict]],
+        on_evict: Optional[Callable[[str, dict], None]] = None
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._loader = loader
+        self._on_evict = on_evict
+        self._sessions = OrderedDict()
+        self._last_used = {}
+        self._bytes = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.reloads = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def get(self, session_id: str) -> Optional[dict]:
+        """Get a live session, reloading it from disk if it was evicted"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._touch(session_id)
+        if session is not None:
+            self._evict_idle()
+            return session
+
+        session = self._loader(session_id)
+        if session is None:
+            return None
+        with self._lock:
+            self.reloads += 1
+        self.put(session_id, session)
+        return session
+
+    def put(self, session_id: str, session: dict):
+        """Add or replace a live session"""
+        size = session["rag_engine"].memory_bytes()
+        with self._lock:
+            self._sessions[session_id] = session
+            self._bytes[session_id] = size
+            self._touch(session_id)
+        self._evict_idle()
+        self._enforce_budget()
+
+    def resize(self, session_id: str):
+        """Re-measure a live session after documents were added or removed"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return
+        size = session["rag_engine"].memory_bytes()
+        with self._lock:
+            if session_id in self._sessions:
+                self._bytes[session_id] = size
+        self._enforce_budget()
+
+    def remove(self, session_id: str) -> Optional[dict]:
+        """Drop a session from memory without calling on_evict"""
+        with self._lock:
+            self._last_used.pop(session_id, None)
+            self._bytes.pop(session_id, None)
+            return self._sessions.pop(session_id, None)
+
+    def _touch(self, session_id: str):
+        self._sessions.move_to_end(session_id)
+        self._last_used[session_id] = time.time()
+
+    def _evict(self, session_id: str):
+        session = self.remove(session_id)
+        if session is None:
+            return
+        with self._lock:
+            self.evictions += 1
+        print(f"💤 Session evicted: {session_id}")
+        if self._on_evict:
+            self._on_evict(session_id, session)
+
+    def _evict_idle(self):
+        cutoff = time.time() - self.idle_ttl_seconds
+        with self._lock:
+            idle = [
+                session_id for session_id, last_used in self._last_used.items()
+                if last_used < cutoff
+            ]
+        for session_id in idle:
+            self._evict(session_id)
+
+    def _enforce_budget(self):
+        while True:
+            with self._lock:
+                over = (
+                    len(self._sessions) > self.max_sessions
+                    or sum(self._bytes.values()) > self.max_bytes
+                )
+                if not over or len(self._sessions) <= 1:
+                    return
+                oldest = next(iter(self._sessions))
+            self._evict(oldest)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "live_sessions": len(self._sessions),
+                "approx_bytes": sum(self._bytes.values()),
+                "evictions": self.evictions,
+                "reloads": self.reloads
+            }
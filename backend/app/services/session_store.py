@@ -0,0 +1,194 @@
+"""
+Session Store Service
+Pluggable backend for session records and ingestion job state
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from app.config import settings
+
+
+class SessionStore(ABC):
+    """
+    Interface for session and job records shared by all API workers
+
+    A session record holds what /status needs without loading the index
+    (filename, status, text_length, num_images, temp_dir). A job record is
+    IngestionJob.to_dict(). The vector index itself lives in the
+    vector store (see vector_store.py), which every worker can reattach to.
+    """
+
+    @abstractmethod
+    def save_session(self, session_id: str, record: dict):
+        ...
+
+    @abstractmethod
+    def load_session(self, session_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def update_session(
+        self,
+        session_id: str,
+        update: Callable[[Optional[dict]], Optional[dict]]
+    ) -> Optional[dict]:
+        """
+        Atomically replace a session record with update(current record)
+        update gets None if there is no record, and returns the new record
+        or None to leave the store unchanged. Returns the new record.
+        """
+
+    @abstractmethod
+    def delete_session(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def save_job(self, job_id: str, record: dict):
+        ...
+
+    @abstractmethod
+    def load_job(self, job_id: str) -> Optional[dict]:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store (single worker only)"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def save_session(self, session_id: str, record: dict):
+        with self._lock:
+            self._sessions[session_id] = dict(record)
+
+    def load_session(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            record = self._sessions.get(session_id)
+            return dict(record) if record is not None else None
+
+    def update_session(self, session_id, update):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            record = update(dict(record) if record is not None else None)
+            if record is not None:
+                self._sessions[session_id] = dict(record)
+            return record
+
+    def delete_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._jobs.pop(session_id, None)
+
+    def save_job(self, job_id: str, record: dict):
+        with self._lock:
+            self._jobs[job_id] = dict(record)
+
+    def load_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record is not None else None
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store shared by every worker on the host
+
+    Uses WAL mode so readers in other workers never block the writer,
+    and one connection per thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _save(self, table: str, key: str, record: dict):
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} (id, record, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(record), time.time())
+            )
+
+    def _load(self, table: str, key: str) -> Optional[dict]:
+        row = self._connect().execute(
+            f"SELECT record FROM {table} WHERE id = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_session(self, session_id: str, record: dict):
+        self._save("sessions", session_id, record)
+
+    def load_session(self, session_id: str) -> Optional[dict]:
+        return self._load("sessions", session_id)
+
+    def update_session(self, session_id, update):
+        conn = self._connect()
+        with conn:
+            # Take the write lock before reading, so no other worker can
+            # change or delete the record in between
+            conn.execute("BEGIN IMMEDIATE")
+            record = update(self._load("sessions", session_id))
+            if record is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (id, record, updated_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(record), time.time())
+                )
+        return record
+
+    def delete_session(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (session_id,))
+
+    def save_job(self, job_id: str, record: dict):
+        self._save("jobs", job_id, record)
+
+    def load_job(self, job_id: str) -> Optional[dict]:
+        return self._load("jobs", job_id)
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Get the configured session store (settings.session_backend)"""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                if settings.session_backend == "memory":
+                    _session_store = InMemorySessionStore()
+                elif settings.session_backend == "sqlite":
+                    _session_store = SQLiteSessionStore(settings.session_db_path)
+                else:
+                    raise ValueError(
+                        f"Unknown session backend: {settings.session_backend}"
+                    )
+    return _session_store
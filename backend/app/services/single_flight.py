@@ -0,0 +1,161 @@
+"""
+Single Flight Service
+Coalesce concurrent identical requests into one upstream call
+"""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+
+class _Broadcast:
+    """Items of one shared stream, replayable by late subscribers"""
+
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.condition = asyncio.Condition()
+        self.task = None
+        self.subscribers = 0
+
+    async def publish(self, item: Any):
+        async with self.condition:
+            self.items.append(item)
+            self.condition.notify_all()
+
+    async def close(self, error: Exception = None):
+        async with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        position = 0
+        while True:
+            async with self.condition:
+                await self.condition.wait_for(
+                    lambda: len(self.items) > position or self.done
+                )
+                batch = self.items[position:]
+                done = self.done
+            for item in batch:
+                yield item
+            position += len(batch)
+            if done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers with the same key
+
+    The first caller starts the call as its own task; callers arriving
+    while it runs await the same task and get the same result (or
+    exception). Nothing is cached once it completes. A caller being
+    cancelled (e.g. client disconnect) does not cancel the shared call.
+    stream() does the same for async generators: every subscriber gets
+    every item from the start, as the single upstream stream produces it.
+    The upstream stream runs to the end even if every subscriber leaves
+    (e.g. to fill a cache), unless it is opened with cancel_abandoned.
+    Keys are tracked per event loop, i.e. per API worker.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._streams = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def stream(
+        self,
+        key: Hashable,
+        fn: Callable[[], AsyncIterator[Any]],
+        cancel_abandoned: bool = False
+    ) -> AsyncIterator[Any]:
+        """
+        Subscribe to the shared stream for key, starting it if needed
+        With cancel_abandoned, the upstream stream is cancelled as soon as
+        its last subscriber leaves (e.g. every client disconnected)
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.calls += 1
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._produce(key, broadcast, fn))
+        else:
+            self.coalesced += 1
+        broadcast.subscribers += 1
+        try:
+            async for item in broadcast.subscribe():
+                yield item
+        finally:
+            broadcast.subscribers -= 1
+            if cancel_abandoned and not broadcast.subscribers and not broadcast.task.done():
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                broadcast.task.cancel()
+
+    async def _produce(
+        self,
+        key: Hashable,
+        broadcast: _Broadcast,
+        fn: Callable[[], AsyncIterator[Any]]
+    ):
+        error = None
+        try:
+            async for item in fn():
+                await broadcast.publish(item)
+        except Exception as e:
+            error = e
+        finally:
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+            await broadcast.close(error)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def stats(self) -> dict:
+        requests = self.calls + self.coalesced
+        return {
+            "upstream_calls": self.calls,
+            "calls_saved": self.coalesced,
+            "in_flight": len(self._in_flight) + len(self._streams),
+            "saved_rate": round(self.coalesced / requests, 4) if requests else 0.0
+        }
+
+
+_single_flights = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get the process-wide coalescer for one kind of request"""
+    with _single_flights_lock:
+        if name not in _single_flights:
+            _single_flights[name] = SingleFlight()
+        return _single_flights[name]
+
+
+def single_flight_stats() -> dict:
+    with _single_flights_lock:
+        return {name: flight.stats() for name, flight in _single_flights.items()}
@@ -0,0 +1,89 @@
+"""
+TTS Cache Service
+Content-addressed on-disk cache of synthesized speech
+"""
+
+import os
+import uuid
+import hashlib
+import threading
+from typing import Optional
+
+
+class TTSCache:
+    """
+    MP3 files keyed by SHA-256 of (voice, text)
+
+    Audio is written to a temp file while it streams and only renamed into
+    place once synthesis completes, so a cached file is always whole.
+    Files are evicted least-recently-used first once the cache exceeds
+    max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, voice: str) -> str:
+        return hashlib.sha256(f"{voice}\n{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a cached file, or None"""
+        path = self._path(key)
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def temp_path(self, key: str) -> str:
+        """Where to write a file before commit()"""
+        return f"{self._path(key)}.tmp-{uuid.uuid4().hex}"
+
+    def commit(self, key: str, temp_path: str):
+        """Move a fully written file into the cache and evict if over budget"""
+        try:
+            with self._lock:
+                os.replace(temp_path, self._path(key))
+                self._evict()
+        except OSError as e:
+            print(f"TTS cache write error: {e}")
+            self.discard(temp_path)
+
+    @staticmethod
+    def discard(temp_path: str):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Delete least-recently-used files until under max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
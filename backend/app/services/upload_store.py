@@ -0,0 +1,270 @@
+"""
+Upload Store Service
+Streaming upload writes and resumable chunked uploads
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+import threading
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from app.config import settings
+
+
+class UploadTooLargeError(ValueError):
+    """More bytes were sent than the upload allows"""
+
+    def __init__(self, max_bytes: int, message: Optional[str] = None):
+        super().__init__(message or f"File too large (max {max_bytes // (1024*1024)}MB)")
+        self.max_bytes = max_bytes
+
+
+class UploadOffsetError(ValueError):
+    """A chunk was sent for the wrong position in the upload"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+async def iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+    """Read a multipart upload in blocks instead of all at once"""
+    while True:
+        chunk = await file.read(settings.upload_chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def write_stream(
+    chunks: AsyncIterator[bytes],
+    file_path: str,
+    max_bytes: int,
+    hasher=None,
+    append: bool = False
+) -> int:
+    """
+    Write chunks to a file as they arrive, off the event loop
+    Stops with UploadTooLargeError as soon as max_bytes is exceeded
+    (nothing past the limit is written); each chunk is fed to hasher
+    once written. Returns the number of bytes written.
+    """
+    written = 0
+    f = await asyncio.to_thread(open, file_path, "ab" if append else "wb")
+    try:
+        async for chunk in chunks:
+            if written + len(chunk) > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            await asyncio.to_thread(f.write, chunk)
+            written += len(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+    finally:
+        await asyncio.to_thread(f.close)
+    return written
+
+
+async def save_upload_file(file: UploadFile, file_path: str) -> str:
+    """
+    Stream a multipart upload to disk, enforcing max_file_size
+    Returns the SHA-256 of its content; the file is removed on failure
+    """
+    hasher = hashlib.sha256()
+    try:
+        await write_stream(
+            iter_upload_file(file), file_path, settings.max_file_size, hasher
+        )
+    except BaseException:
+        _remove(file_path)
+        raise
+    return hasher.hexdigest()
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(settings.upload_chunk_size), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class UploadStore:
+    """
+    Resumable uploads, one directory each (meta.json + data.part)
+
+    The client declares the file's name and size up front, then sends the
+    bytes in any number of chunks, each tagged with the offset it starts
+    at. The current offset is simply the size of data.part on disk, so an
+    interrupted upload resumes from wherever its last chunk stopped, in
+    any worker. The content hash is kept running in memory while chunks
+    arrive in order, and recomputed from disk only if it was lost.
+    Uploads left unfinished for upload_ttl_seconds are deleted.
+    """
+
+    def __init__(self, upload_dir: str):
+        self.upload_dir = upload_dir
+        self._hashers = {}  # upload_id -> (hashed bytes, sha256)
+        self._locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+    def _dir(self, upload_id: str) -> str:
+        # upload_ids are generated here; reject anything path-like
+        if os.path.basename(upload_id) != upload_id or upload_id in ("", ".", ".."):
+            raise KeyError(upload_id)
+        return os.path.join(self.upload_dir, upload_id)
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self._dir(upload_id), "data.part")
+
+    def _upload_lock(self, upload_id: str) -> asyncio.Lock:
+        with self._lock:
+            if upload_id not in self._locks:
+                self._locks[upload_id] = asyncio.Lock()
+            return self._locks[upload_id]
+
+    def _forget(self, upload_id: str):
+        with self._lock:
+            self._hashers.pop(upload_id, None)
+            self._locks.pop(upload_id, None)
+
+    def create(self, filename: str, size: int, session_id: Optional[str] = None) -> dict:
+        """Start an upload; returns its status"""
+        self.cleanup()
+        upload_id = str(uuid.uuid4())
+        upload_dir = self._dir(upload_id)
+        os.makedirs(upload_dir)
+        meta = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "size": size,
+            "session_id": session_id,
+            "created_at": time.time()
+        }
+        with open(os.path.join(upload_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        open(self._part_path(upload_id), "wb").close()
+        with self._lock:
+            self._hashers[upload_id] = (0, hashlib.sha256())
+        return {**meta, "offset": 0}
+
+    def get(self, upload_id: str) -> Optional[dict]:
+        """Upload status (meta plus current offset) or None"""
+        try:
+            upload_dir = self._dir(upload_id)
+            with open(os.path.join(upload_dir, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            offset = os.path.getsize(self._part_path(upload_id))
+        except (KeyError, OSError, ValueError):
+            return None
+        return {**meta, "offset": offset}
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        """
+        Write one chunk of the upload starting at offset
+        Raises KeyError (unknown upload), UploadOffsetError (offset is not
+        the current end) or UploadTooLargeError (past the declared size)
+        """
+        async with self._upload_lock(upload_id):
+            status = self.get(upload_id)
+            if status is None:
+                raise KeyError(upload_id)
+            if offset != status["offset"]:
+                raise UploadOffsetError(status["offset"])
+
+            with self._lock:
+                hashed, hasher = self._hashers.pop(upload_id, (None, None))
+            if hashed != offset:
+                hasher = None  # out of step (e.g. another worker); rehash later
+
+            part_path = self._part_path(upload_id)
+            try:
+                await write_stream(
+                    chunks, part_path, status["size"] - offset, hasher, append=True
+                )
+            except UploadTooLargeError:
+                # Keep only the bytes before this chunk
+                await asyncio.to_thread(os.truncate, part_path, offset)
+                raise UploadTooLargeError(
+                    status["size"],
+                    f"Upload is larger than its declared size ({status['size']} bytes)"
+                )
+            # Interrupted chunks leave the hasher unsure; finish() rehashes
+            status = self.get(upload_id) or status
+            if hasher is not None:
+                with self._lock:
+                    self._hashers[upload_id] = (status["offset"], hasher)
+            return status
+
+    async def finish(self, upload_id: str, file_path: str) -> str:
+        """
+        Move a complete upload to file_path; returns its SHA-256
+        Raises KeyError (unknown upload) or UploadOffsetError (incomplete)
+        """
+        async with self._upload_lock(upload_id):
+            status = self.get(upload_id)
+            if status is None:
+                raise KeyError(upload_id)
+            if status["offset"] != status["size"]:
+                raise UploadOffsetError(status["offset"])
+
+            with self._lock:
+                hashed, hasher = self._hashers.get(upload_id, (None, None))
+            part_path = self._part_path(upload_id)
+            if hashed == status["size"]:
+                content_hash = hasher.hexdigest()
+            else:
+                content_hash = await asyncio.to_thread(_hash_file, part_path)
+
+            await asyncio.to_thread(shutil.move, part_path, file_path)
+        self.delete(upload_id)
+        return content_hash
+
+    def delete(self, upload_id: str):
+        try:
+            shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+        except KeyError:
+            pass
+        self._forget(upload_id)
+
+    def cleanup(self):
+        """Delete uploads older than upload_ttl_seconds"""
+        cutoff = time.time() - settings.upload_ttl_seconds
+        for upload_id in os.listdir(self.upload_dir):
+            try:
+                # Last chunk written (the directory's mtime doesn't change)
+                updated = os.path.getmtime(
+                    os.path.join(self.upload_dir, upload_id, "data.part")
+                )
+            except OSError:
+                updated = 0
+            if updated < cutoff:
+                self.delete(upload_id)
+
+
+_upload_store = None
+_upload_store_lock = threading.Lock()
+
+
+def get_upload_store() -> UploadStore:
+    """Get the process-wide resumable upload store"""
+    global _upload_store
+    if _upload_store is None:
+        with _upload_store_lock:
+            if _upload_store is None:
+                _upload_store = UploadStore(settings.upload_dir)
+    return _upload_store
@@ -0,0 +1,551 @@
+"""
+Vector Store Service
+Pluggable per-session vector indexes (NumPy brute force or ChromaDB/HNSW)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+import subprocess
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: persist is not serialized across workers
+    fcntl = None
+
+
+_chroma_client = None
+_chroma_client_lock = threading.Lock()
+
+
+def get_chroma_client():
+    """
+    Get the process-wide ChromaDB client
+    With chroma_host set, a client of that Chroma server (shared by every
+    worker); otherwise the embedded persistent store, which only one
+    process may open at a time
+    chromadb is imported here, so sessions on the NumPy backend never load it
+    """
+    global _chroma_client
+    if _chroma_client is None:
+        with _chroma_client_lock:
+            if _chroma_client is None:
+                import chromadb
+                from chromadb.config import Settings
+                
+                if settings.chroma_host:
+                    _chroma_client = chromadb.HttpClient(
+                        host=settings.chroma_host,
+                        port=settings.chroma_port,
+                        settings=Settings(anonymized_telemetry=False)
+                    )
+                    return _chroma_client
+                
+                os.makedirs(settings.vector_store_path, exist_ok=True)
+                _chroma_client = chromadb.PersistentClient(
+                    path=settings.vector_store_path,
+                    settings=Settings(
+                        anonymized_telemetry=False,
+                        allow_reset=True,
+                        # Unload least recently used indexes past the budget
+                        chroma_segment_cache_policy="LRU",
+                        chroma_memory_limit_bytes=settings.vector_store_memory_limit_bytes
+                    )
+                )
+    return _chroma_client
+
+
+def start_chroma_server(timeout: float = 60.0) -> subprocess.Popen:
+    """
+    Serve the persistent Chroma store from its own process
+
+    Chroma's embedded store keeps its HNSW index in the memory of the
+    process that opened it, so several API workers must not each open
+    it. Instead one server process owns it and the workers are clients:
+    chroma_host / chroma_port are set in this process's environment,
+    which the workers inherit. Blocks until the server answers.
+    """
+    os.makedirs(settings.vector_store_path, exist_ok=True)
+    env = {
+        **os.environ,
+        "IS_PERSISTENT": "True",
+        "PERSIST_DIRECTORY": settings.vector_store_path,
+        "ANONYMIZED_TELEMETRY": "False",
+        "CHROMA_SEGMENT_CACHE_POLICY": "LRU",
+        "CHROMA_MEMORY_LIMIT_BYTES": str(settings.vector_store_memory_limit_bytes)
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "chromadb.app:app",
+            "--host", "127.0.0.1",
+            "--port", str(settings.chroma_port),
+            "--workers", "1",
+            "--log-level", "warning"
+        ],
+        env=env
+    )
+
+    heartbeat = f"http://127.0.0.1:{settings.chroma_port}/api/v1/heartbeat"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(heartbeat, timeout=1).close()
+            break
+        except OSError:
+            if process.poll() is not None or time.time() > deadline:
+                process.terminate()
+                raise RuntimeError("Chroma server failed to start")
+            time.sleep(0.2)
+
+    os.environ["CHROMA_HOST"] = settings.chroma_host = "127.0.0.1"
+    os.environ["CHROMA_PORT"] = str(settings.chroma_port)
+    print(f"✓ Chroma server: http://127.0.0.1:{settings.chroma_port}")
+    return process
+
+
+class VectorStore(ABC):
+    """
+    Interface for one session's chunk vectors
+
+    Vectors are compared by cosine distance. Every chunk carries metadata
+    with at least its doc_id, which queries can filter on. Changes are
+    durable once persist() returns, so any worker can reopen the store.
+    """
+
+    backend = ""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @property
+    def metadata(self) -> dict:
+        """Store-level metadata (only set on legacy Chroma indexes)"""
+        return {}
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Approximate memory held by the vectors"""
+
+    @abstractmethod
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ):
+        ...
+
+    @abstractmethod
+    def delete_document(self, doc_id: str):
+        ...
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: List[float],
+        k: int,
+        doc_ids: Optional[List[str]] = None
+    ) -> Tuple[List[str], List[float]]:
+        """Nearest chunks; returns (ids, cosine distances), nearest first"""
+
+    @abstractmethod
+    def get_all(self, include_embeddings: bool = False) -> dict:
+        """All chunks as {"ids", "documents", "metadatas"[, "embeddings"]}"""
+
+    def persist(self):
+        pass
+
+    @abstractmethod
+    def drop(self):
+        ...
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB collection with an HNSW index (large sessions)"""
+
+    backend = "chroma"
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @classmethod
+    def create(cls, name: str) -> "ChromaVectorStore":
+        return cls(get_chroma_client().get_or_create_collection(
+            name=name,
+            metadata={"hnsw:space": "cosine"}
+        ))
+
+    @classmethod
+    def open(cls, name: str) -> Optional["ChromaVectorStore"]:
+        try:
+            return cls(get_chroma_client().get_collection(name))
+        except Exception:
+            return None
+
+    def __len__(self) -> int:
+        return self.collection.count()
+
+    @property
+    def metadata(self) -> dict:
+        metadata = dict(self.collection.metadata or {})
+        metadata.pop("hnsw:space", None)
+        return metadata
+
+    @property
+    def nbytes(self) -> int:
+        # Chroma keeps float32 vectors plus the HNSW graph (~M links each)
+        return len(self) * _embedding_dimension() * 4 * 2
+
+    def add(self, ids, embeddings, texts, metadatas):
+        # Chroma caps the size of a single add
+        batch_size = 5000
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.collection.add(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end]
+            )
+
+    def delete_document(self, doc_id: str):
+        self.collection.delete(where={"doc_id": doc_id})
+
+    def query(self, embedding, k, doc_ids=None):
+        results = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where={"doc_id": {"$in": doc_ids}} if doc_ids else None,
+            include=["distances"]
+        )
+        return results['ids'][0], results['distances'][0]
+
+    def get_all(self, include_embeddings: bool = False) -> dict:
+        include = ["documents", "metadatas"]
+        if include_embeddings:
+            include.append("embeddings")
+        return self.collection.get(include=include)
+
+    def drop(self):
+        try:
+            get_chroma_client().delete_collection(self.collection.name)
+        except Exception:
+            pass
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Brute-force index over a contiguous matrix (small sessions)
+
+    Rows are L2-normalized, so a query is one matrix-vector product plus
+    an argpartition. With quantize=True rows are held only as int8 codes
+    with a per-row scale (about 4x less memory, slightly approximate
+    scores). Chunks and vectors are persisted as versioned directories
+    under the vector store path (see persist); several workers may write
+    the same store, each persisting only the documents it changed.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, name: str, quantize: bool = False):
+        self.name = name
+        self.quantize = quantize
+        self.path = os.path.join(settings.vector_store_path, "numpy", name)
+        self._ids = []
+        self._texts = []
+        self._metadatas = []
+        self._doc_ids = np.zeros(0, dtype=object)
+        self._vectors = None
+        self._codes = None
+        self._scales = None
+        # doc_id -> changes since the last persist (see persist)
+        self._changed = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, name: str, quantize: bool = False) -> Optional["NumpyVectorStore"]:
+        store = cls(name, quantize)
+        stored = store._read_current()
+        if stored is None:
+            return None
+        chunks, vectors = stored
+        store.add(chunks["ids"], vectors, chunks["documents"], chunks["metadatas"])
+        store._changed.clear()
+        return store
+
+    def _read_current(self) -> Optional[Tuple[dict, np.ndarray]]:
+        """Chunks and vectors of the live version on disk"""
+        # A writer may prune the version we were pointed at while we read it;
+        # the pointer then names a newer one, so look again
+        for _ in range(3):
+            version_dir = self._current_dir()
+            if version_dir is None:
+                return None
+            try:
+                with open(os.path.join(version_dir, "chunks.json"), "r", encoding="utf-8") as f:
+                    chunks = json.load(f)
+                vectors = np.load(os.path.join(version_dir, "vectors.npy"))
+                return chunks, vectors
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def _current_dir(self) -> Optional[str]:
+        """Directory of the version CURRENT points at (or the legacy flat layout)"""
+        try:
+            with open(os.path.join(self.path, "CURRENT"), "r", encoding="utf-8") as f:
+                return os.path.join(self.path, f.read().strip())
+        except FileNotFoundError:
+            if os.path.exists(os.path.join(self.path, "chunks.json")):
+                return self.path
+            return None
+        except OSError:
+            return None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        if self.quantize:
+            if self._codes is None:
+                return 0
+            return self._codes.nbytes + self._scales.nbytes
+        return 0 if self._vectors is None else self._vectors.nbytes
+
+    def _matrix(self) -> Optional[np.ndarray]:
+        """Normalized float32 rows (dequantized if quantized)"""
+        if self.quantize:
+            if self._codes is None:
+                return None
+            return self._codes.astype(np.float32) * self._scales[:, None]
+        return self._vectors
+
+    def add(self, ids, embeddings, texts, metadatas):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if not len(vectors):
+            return
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        doc_ids = np.array([meta.get("doc_id") for meta in metadatas], dtype=object)
+        with self._lock:
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(metadatas)
+            self._doc_ids = np.concatenate([self._doc_ids, doc_ids])
+            for doc_id in set(doc_ids):
+                self._changed[doc_id] = self._changed.get(doc_id, 0) + 1
+            if self.quantize:
+                # Symmetric per-row int8 quantization
+                scales = np.abs(vectors).max(axis=1) / 127
+                scales[scales == 0] = 1
+                codes = np.round(vectors / scales[:, None]).astype(np.int8)
+                self._codes = _append_rows(self._codes, codes)
+                self._scales = _append_rows(self._scales, scales.astype(np.float32))
+            else:
+                self._vectors = _append_rows(self._vectors, vectors)
+
+    def delete_document(self, doc_id: str):
+        with self._lock:
+            self._changed[doc_id] = self._changed.get(doc_id, 0) + 1
+            keep = self._doc_ids != doc_id
+            self._ids = [chunk_id for chunk_id, alive in zip(self._ids, keep) if alive]
+            self._texts = [text for text, alive in zip(self._texts, keep) if alive]
+            self._metadatas = [meta for meta, alive in zip(self._metadatas, keep) if alive]
+            self._doc_ids = self._doc_ids[keep]
+            if self.quantize:
+                if self._codes is not None:
+                    self._codes = self._codes[keep]
+                    self._scales = self._scales[keep]
+            elif self._vectors is not None:
+                self._vectors = self._vectors[keep]
+
+    def query(self, embedding, k, doc_ids=None):
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            if not len(self._ids):
+                return [], []
+            if self.quantize:
+                scores = (self._codes @ query) * self._scales
+            else:
+                scores = self._vectors @ query
+            if doc_ids:
+                rows = np.flatnonzero(np.isin(self._doc_ids, doc_ids))
+                scores = scores[rows]
+            else:
+                rows = None
+            ids = self._ids
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return [], []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        if rows is not None:
+            hits = rows[top]
+        else:
+            hits = top
+        return [ids[row] for row in hits], (1 - scores[top]).tolist()
+
+    def get_all(self, include_embeddings: bool = False) -> dict:
+        with self._lock:
+            result = {
+                "ids": list(self._ids),
+                "documents": list(self._texts),
+                "metadatas": list(self._metadatas)
+            }
+            if include_embeddings:
+                matrix = self._matrix()
+                result["embeddings"] = matrix.tolist() if matrix is not None else []
+        return result
+
+    def persist(self):
+        """
+        Write chunks and vectors as a new version, then swap the pointer
+        Each version lives in its own directory and CURRENT names the live
+        one; CURRENT is replaced with a single rename, so readers in other
+        workers always find a complete store. The previous version is kept
+        for readers still loading it, older ones are removed.
+
+        Other workers may have written the store since this one loaded it,
+        so under an exclusive file lock the live version is re-read and only
+        the documents added or deleted here replace their rows in it.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, "LOCK"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Released when the file is closed
+            self._persist_locked()
+
+    def _persist_locked(self):
+        stored = self._read_current()
+        with self._lock:
+            changed = dict(self._changed)
+            ours = [
+                row for row, doc_id in enumerate(self._doc_ids)
+                if stored is None or doc_id in changed
+            ]
+            chunks = {
+                "ids": [self._ids[row] for row in ours],
+                "documents": [self._texts[row] for row in ours],
+                "metadatas": [self._metadatas[row] for row in ours]
+            }
+            matrix = self._matrix()
+            vectors = matrix[ours] if matrix is not None else None
+        if vectors is None:
+            if stored is not None:
+                dimension = stored[1].shape[1]
+            else:
+                dimension = _embedding_dimension()
+            vectors = np.zeros((0, dimension), dtype=np.float32)
+        if stored is not None:
+            # Theirs first: every document another worker wrote and we didn't touch
+            live_chunks, live_vectors = stored
+            theirs = [
+                row for row, meta in enumerate(live_chunks["metadatas"])
+                if (meta or {}).get("doc_id") not in changed
+            ]
+            for key in chunks:
+                chunks[key] = [live_chunks[key][row] for row in theirs] + chunks[key]
+            if len(theirs):
+                vectors = np.concatenate([live_vectors[theirs].astype(np.float32), vectors])
+
+        token = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+        version = f"v-{token}"
+        tmp_dir = os.path.join(self.path, f"tmp-{token}")
+        os.makedirs(tmp_dir, exist_ok=True)
+        with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(chunks, f)
+        np.save(os.path.join(tmp_dir, "vectors.npy"), vectors)
+        os.replace(tmp_dir, os.path.join(self.path, version))
+
+        previous = self._current_dir()
+        pointer = os.path.join(self.path, f"CURRENT.tmp-{token}")
+        with open(pointer, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(self.path, "CURRENT"))
+
+        keep = {version, os.path.basename(previous or "")}
+        for entry in os.listdir(self.path):
+            if entry.startswith("v-") and entry not in keep:
+                shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+        if previous == self.path:
+            # Written by the flat layout before versioning
+            for legacy in ("chunks.json", "vectors.npy"):
+                try:
+                    os.remove(os.path.join(self.path, legacy))
+                except OSError:
+                    pass
+
+        with self._lock:
+            # Changes made while we wrote stay pending for the next persist
+            for doc_id, count in changed.items():
+                if self._changed.get(doc_id) == count:
+                    del self._changed[doc_id]
+
+    def drop(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _append_rows(array: Optional[np.ndarray], rows: np.ndarray) -> np.ndarray:
+    return rows if array is None else np.concatenate([array, rows])
+
+
+def _embedding_dimension() -> int:
+    from app.services.embedding_service import get_embedding_service
+    return get_embedding_service().dimension
+
+
+def create_vector_store(name: str) -> VectorStore:
+    """New empty store for a session (settings.vector_store_backend)"""
+    if settings.vector_store_backend == "chroma":
+        return ChromaVectorStore.create(name)
+    if settings.vector_store_backend in ("auto", "numpy"):
+        return NumpyVectorStore(name, quantize=settings.vector_store_quantize)
+    raise ValueError(f"Unknown vector store backend: {settings.vector_store_backend}")
+
+
+def open_vector_store(name: str) -> Optional[VectorStore]:
+    """Reopen a session's persisted store, whichever backend it uses"""
+    return (
+        NumpyVectorStore.open(name, quantize=settings.vector_store_quantize)
+        or ChromaVectorStore.open(name)
+    )
+
+
+def should_promote(store: VectorStore, new_chunks: int) -> bool:
+    """Whether an auto-selected NumPy store has outgrown brute force"""
+    return (
+        settings.vector_store_backend == "auto"
+        and isinstance(store, NumpyVectorStore)
+        and len(store) + new_chunks > settings.numpy_store_max_chunks
+    )
+
+
+def promote_to_chroma(store: NumpyVectorStore) -> ChromaVectorStore:
+    """Move a NumPy store's chunks into a new Chroma collection"""
+    chroma = ChromaVectorStore.create(store.name)
+    stored = store.get_all(include_embeddings=True)
+    chroma.add(stored["ids"], stored["embeddings"], stored["documents"], stored["metadatas"])
+    store.drop()
+    print(f"✓ Vector store: {store.name} promoted to Chroma ({len(chroma)} chunks)")
+    return chroma
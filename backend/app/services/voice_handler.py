@@ -3,9 +3,64 @@ Voice Handler Service
 Text-to-speech conversion with detailed error handling
 """
 
-import edge_tts
 import io
+import re
 import asyncio
+from typing import AsyncIterator, List, Optional
+
+from app.config import settings
+from app.services.tts_cache import TTSCache
+
+
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?\u2026])\s+|\s*\n\s*")
+_CLAUSE_BREAK_RE = re.compile(r"[,;:]\s+")
+
+
+def _wrap(sentence: str, max_chars: int) -> List[str]:
+    """Split an over-long sentence at its last clause break or space"""
+    pieces = []
+    while len(sentence) > max_chars:
+        head = sentence[:max_chars + 1]
+        clause_breaks = list(_CLAUSE_BREAK_RE.finditer(head))
+        if clause_breaks:
+            cut = clause_breaks[-1].end()
+        else:
+            cut = head.rfind(" ")
+            if cut <= 0:
+                cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def split_segments(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into synthesis segments at sentence boundaries
+    
+    The first segment is just the first sentence so audio starts quickly;
+    later sentences are packed together up to max_chars.
+    """
+    sentences = []
+    for sentence in _SENTENCE_BREAK_RE.split(text):
+        sentence = sentence.strip()
+        if sentence:
+            sentences.extend(_wrap(sentence, max_chars))
+    
+    if not sentences:
+        return []
+    segments = [sentences[0]]
+    current = ""
+    for sentence in sentences[1:]:
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
 
 
 class VoiceHandler:
@@ -16,66 +71,136 @@ class VoiceHandler:
             "en": "en-US-AriaNeural",      # English - Female US voice
             "ta": "en-IN-NeerjaNeural"      # Tanglish - Female Indian English voice
         }
+        self.cache = TTSCache(settings.tts_cache_dir, settings.tts_cache_max_bytes)
     
-    async def text_to_speech(self, text: str, language: str = "en"):
+    def get_voice(self, language: str) -> str:
+        """Select voice based on language"""
+        return self.voices.get(language, self.voices["en"])
+    
+    def cached_audio_path(self, text: str, language: str = "en") -> Optional[str]:
+        """Path of previously synthesized audio for this text, or None"""
+        return self.cache.get(self.cache.make_key(text, self.get_voice(language)))
+    
+    async def _synthesize_segments(self, segments: List[str], voice: str) -> AsyncIterator[bytes]:
         """
-        Convert text to speech
+        Synthesize segments concurrently, yielding their audio in order
+        
+        Up to tts_concurrency segments are synthesized at once; the segment
+        being played is forwarded chunk by chunk, later ones are buffered
+        until their turn. MP3 frames from separate calls concatenate cleanly.
+        """
+        import edge_tts
+        
+        semaphore = asyncio.Semaphore(max(1, settings.tts_concurrency))
+        outputs = [asyncio.Queue() for _ in segments]
+        
+        async def synthesize(segment: str, output: asyncio.Queue):
+            try:
+                async with semaphore:
+                    communicate = edge_tts.Communicate(segment, voice)
+                    async for chunk in communicate.stream():
+                        if chunk["type"] == "audio" and chunk["data"]:
+                            output.put_nowait(chunk["data"])
+                output.put_nowait(None)
+            except Exception as e:
+                output.put_nowait(e)
+        
+        # Semaphore waiters are served FIFO, so earlier segments go first
+        tasks = [
+            asyncio.ensure_future(synthesize(segment, output))
+            for segment, output in zip(segments, outputs)
+        ]
+        try:
+            for output in outputs:
+                while True:
+                    item = await output.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def stream_speech(self, text: str, language: str = "en") -> AsyncIterator[bytes]:
+        """
+        Convert text to speech, yielding MP3 chunks as edge-tts produces them
+        
+        Text is split at sentence boundaries and the segments synthesized
+        concurrently, so the first audio follows the first sentence and long
+        text is never truncated. The audio is written to the TTS cache as it
+        streams and committed only once synthesis completes
         
         Args:
             text: Text to convert
             language: 'en' for English, 'ta' for Tanglish
-            
-        Returns:
-            io.BytesIO: Audio data stream
         """
+        voice = self.get_voice(language)
+        
+        print(f"🔊 TTS Request:")
+        print(f"   Language: {language}")
+        print(f"   Voice: {voice}")
+        print(f"   Text length: {len(text)} chars")
+        print(f"   Text preview: {text[:50]}...")
+        
+        key = self.cache.make_key(text, voice)
+        segments = split_segments(text, settings.tts_segment_chars)
+        print(f"   Segments: {len(segments)}")
+        temp_path = self.cache.temp_path(key)
+        chunk_count = 0
+        audio_size = 0
+        
         try:
-            # Select voice based on language
-            voice = self.voices.get(language, self.voices["en"])
-            
-            print(f"🔊 TTS Request:")
-            print(f"   Language: {language}")
-            print(f"   Voice: {voice}")
-            print(f"   Text length: {len(text)} chars")
-            print(f"   Text preview: {text[:50]}...")
-            
-            # Limit text length to prevent errors
-            if len(text) > 5000:
-                text = text[:5000] + "..."
-                print(f"   ⚠️ Text truncated to 5000 chars")
-            
-            # Create communicate object
-            communicate = edge_tts.Communicate(text, voice)
-            
-            # Stream audio data
-            audio_data = io.BytesIO()
-            chunk_count = 0
-            
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_data.write(chunk["data"])
+            with open(temp_path, "wb") as audio_file:
+                # Forward audio data as it arrives
+                async for data in self._synthesize_segments(segments, voice):
+                    audio_file.write(data)
                     chunk_count += 1
+                    audio_size += len(data)
+                    yield data
             
-            print(f"   ✓ Generated {chunk_count} audio chunks")
-            print(f"   ✓ Total audio size: {audio_data.tell()} bytes")
-            
-            # Reset stream position to beginning
-            audio_data.seek(0)
-            
-            if audio_data.tell() == 0 and chunk_count == 0:
+            if audio_size == 0:
                 print("   ✗ ERROR: No audio data generated!")
                 raise Exception("TTS failed to generate audio")
             
-            # Verify we have data
-            audio_size = len(audio_data.getvalue())
-            if audio_size == 0:
-                print("   ✗ ERROR: Audio buffer is empty!")
-                raise Exception("TTS generated empty audio")
-            
-            print(f"   ✓ TTS Success! Audio ready ({audio_size} bytes)")
-            return audio_data
-            
         except Exception as e:
+            self.cache.discard(temp_path)
             print(f"   ✗ TTS ERROR: {str(e)}")
             import traceback
             traceback.print_exc()
-            raise Exception(f"Text-to-speech failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Text-to-speech failed: {str(e)}")
+        except BaseException:
+            # Cancelled or closed early: never cache partial audio
+            self.cache.discard(temp_path)
+            raise
+        
+        self.cache.commit(key, temp_path)
+        print(f"   ✓ Generated {chunk_count} audio chunks")
+        print(f"   ✓ TTS Success! Audio cached ({audio_size} bytes)")
+    
+    async def text_to_speech(self, text: str, language: str = "en"):
+        """
+        Convert text to speech
+        
+        Args:
+            text: Text to convert
+            language: 'en' for English, 'ta' for Tanglish
+            
+        Returns:
+            io.BytesIO: Audio data stream
+        """
+        audio_data = io.BytesIO()
+        
+        cached_path = self.cached_audio_path(text, language)
+        if cached_path is not None:
+            with open(cached_path, "rb") as f:
+                audio_data.write(f.read())
+        else:
+            async for chunk in self.stream_speech(text, language):
+                audio_data.write(chunk)
+        
+        # Reset stream position to beginning
+        audio_data.seek(0)
+        return audio_data
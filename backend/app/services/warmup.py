@@ -0,0 +1,116 @@
+"""
+Warm-up Service
+Load models and heavy libraries in the background after startup
+"""
+
+import time
+import importlib
+import threading
+
+from app.config import settings
+
+
+# Imported lazily by the services that use them; preloaded here so the
+# first upload, query or TTS request doesn't pay for it
+_LIBRARIES = [
+    "langchain.text_splitter",
+    "groq",
+    "httpx",
+    "PyPDF2",
+    "docx",
+    "openpyxl",
+    "pptx",
+    "pdf2image",
+    "PIL.Image",
+    "pytesseract",
+    "edge_tts"
+]
+
+
+class WarmUp:
+    """
+    Background warm-up with per-component status
+
+    The server starts answering (and health checks pass) immediately;
+    readiness is reported once the embedding model is loaded and has run a
+    forward pass. Libraries are preloaded afterwards on a best-effort
+    basis: one failing to import does not block readiness.
+    """
+
+    def __init__(self):
+        self.components = {"embedding_model": "pending", "libraries": "pending"}
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        from app.services.embedding_service import get_embedding_service
+
+        try:
+            self.components["embedding_model"] = "loading"
+            get_embedding_service().warm_up()
+            self.components["embedding_model"] = "ready"
+            self.ready_at = time.time()
+        except Exception as e:
+            self.components["embedding_model"] = "failed"
+            self.error = str(e)
+            print(f"✗ Embedding model failed to load: {e}")
+
+        self.components["libraries"] = "loading"
+        libraries = list(_LIBRARIES)
+        if settings.vector_store_backend == "chroma":
+            libraries.append("chromadb")
+        failed = []
+        for name in libraries:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                failed.append(name)
+        if failed:
+            self.components["libraries"] = f"failed: {', '.join(failed)}"
+        else:
+            self.components["libraries"] = "ready"
+
+    @property
+    def is_ready(self) -> bool:
+        return self.components["embedding_model"] == "ready"
+
+    def status(self) -> dict:
+        if self.is_ready:
+            status = "ready"
+        elif self.components["embedding_model"] == "failed":
+            status = "failed"
+        else:
+            status = "warming"
+        return {
+            "status": status,
+            "components": dict(self.components),
+            "warm_up_seconds": (
+                round(self.ready_at - self.started_at, 2) if self.ready_at else None
+            ),
+            "error": self.error
+        }
+
+
+_warm_up = None
+_warm_up_lock = threading.Lock()
+
+
+def get_warm_up() -> WarmUp:
+    """Get the process-wide warm-up tracker"""
+    global _warm_up
+    if _warm_up is None:
+        with _warm_up_lock:
+            if _warm_up is None:
+                _warm_up = WarmUp()
+    return _warm_up
@@ -0,0 +1,105 @@
+"""
+Benchmark Helpers
+Isolated data directories, memory readings and child-process runs
+"""
+
+import os
+import sys
+import json
+import resource
+import tempfile
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_environment(fake_embeddings: bool = False) -> str:
+    """
+    Point every data directory at a fresh temp dir (call before importing app)
+    With fake_embeddings the embedding model is swapped for tests/fakes.py's,
+    which measures the pipeline without downloading the model
+    Returns the temp dir
+    """
+    data_dir = tempfile.mkdtemp(prefix="volcanorag-bench-")
+    for name, sub in (
+        ("VECTOR_STORE_PATH", "chroma"),
+        ("SESSION_DB_PATH", "sessions.db"),
+        ("INGESTION_CACHE_DIR", "ingestion_cache"),
+        ("UPLOAD_DIR", "uploads"),
+        ("TTS_CACHE_DIR", "tts_cache")
+    ):
+        os.environ[name] = os.path.join(data_dir, sub)
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")  # no LLM calls are made
+
+    if fake_embeddings:
+        sys.path.insert(0, os.path.join(BACKEND_DIR, "tests"))
+        from fakes import FakeEmbeddings
+        from app.services.embedding_service import EmbeddingService
+        EmbeddingService._get_model = lambda self: FakeEmbeddings()
+    return data_dir
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process"""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """Peak resident set size of this process (or of its largest waited-for child)"""
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    return resource.getrusage(who).ru_maxrss / 1024  # KiB on Linux
+
+
+def run_child(module: str, *args) -> dict:
+    """
+    Run one measurement in a fresh interpreter, so memory readings don't
+    carry over between runs; the child prints its result as JSON last
+    """
+    output = subprocess.run(
+        [sys.executable, "-m", module, "--child", *map(str, args)],
+        cwd=BACKEND_DIR,
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def synthetic_pdf(path: str, pages: int, dpi: int = 100):
+    """
+    Write a scan-like PDF: every page is an image of text (no text layer),
+    so ingestion rasterizes and OCRs all of them
+    Past 16 pages the page images repeat, to keep this process small
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default(size=24)
+    images = []
+    for page in range(1, min(pages, 16) + 1):
+        image = Image.new("L", (int(8.5 * dpi * 2), int(11 * dpi * 2)), 255)
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text(
+                (80, 80 + line * 48),
+                f"Page {page} line {line}: lava flows cool into basalt columns",
+                font=font,
+                fill=0
+            )
+        images.append(image)
+    images[0].save(
+        path,
+        save_all=True,
+        append_images=[images[page % len(images)] for page in range(1, pages)],
+        resolution=dpi * 2
+    )
+
+
+def print_table(headers: list, rows: list):
+    widths = [
+        max(len(str(cell)) for cell in column)
+        for column in zip(headers, *rows)
+    ]
+    for row in [headers, *rows]:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,97 @@
+"""
+Embedding Throughput Benchmark
+Batched ingestion vs the old per-chunk loop, in chunks/sec
+
+"per-chunk" embeds one chunk at a time and inserts each as its own row,
+as create_vector_store used to; the other runs go through
+RAGEngine.add_document with the given embedding_batch_size.
+
+    python -m benchmarks.embedding
+    python -m benchmarks.embedding --chunks 500 --backend chroma --fake-embeddings
+"""
+
+import sys
+import time
+import uuid
+import random
+import argparse
+
+from benchmarks.common import setup_environment, print_table
+from benchmarks.sessions import WORDS
+
+
+def _chunks(count: int, size: int) -> list:
+    rng = random.Random(0)
+    chunks = []
+    for _ in range(count):
+        text = ""
+        while len(text) < size:
+            text += rng.choice(WORDS) + " "
+        chunks.append(text[:size])
+    return chunks
+
+
+def _per_chunk(chunks: list) -> float:
+    from app.services.embedding_service import get_embedding_service
+    from app.services.vector_store import create_vector_store
+
+    model = get_embedding_service()._get_model()
+    store = create_vector_store(f"bench_{uuid.uuid4().hex}")
+    start = time.perf_counter()
+    for i, chunk in enumerate(chunks):
+        store.add([f"chunk_{i}"], [model.embed_query(chunk)], [chunk], [{"doc_id": "doc", "chunk": i}])
+    store.persist()
+    elapsed = time.perf_counter() - start
+    store.drop()
+    return elapsed
+
+
+def _batched(chunks: list, batch_size: int) -> float:
+    from app.config import settings
+    from app.services.rag_engine import RAGEngine
+
+    settings.embedding_batch_size = batch_size
+    engine = RAGEngine(f"bench_{uuid.uuid4().hex}")
+    start = time.perf_counter()
+    engine.add_document("doc", "bench.txt", chunks)
+    elapsed = time.perf_counter() - start
+    engine.delete()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="characters per chunk")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--backend", default="numpy", choices=["numpy", "chroma"])
+    parser.add_argument("--fake-embeddings", action="store_true",
+                        help="hashed bag-of-words instead of the model (no download)")
+    args = parser.parse_args()
+
+    setup_environment(args.fake_embeddings)
+    from app.config import settings
+    from app.services.embedding_service import get_embedding_service
+
+    settings.vector_store_backend = args.backend
+    get_embedding_service().warm_up()
+    chunks = _chunks(args.chunks, args.chunk_size)
+
+    runs = [("per-chunk", lambda: _per_chunk(chunks))]
+    for batch_size in args.batch_sizes:
+        runs.append((f"batch {batch_size}", lambda size=batch_size: _batched(chunks, size)))
+
+    rows = []
+    baseline = None
+    for name, run in runs:
+        elapsed = run()
+        rate = len(chunks) / elapsed
+        baseline = baseline or rate
+        rows.append([name, f"{elapsed:.2f}", f"{rate:.0f}", f"{rate / baseline:.1f}x"])
+    print()
+    print(f"{len(chunks)} chunks of {args.chunk_size} chars, {args.backend} backend")
+    print_table(["run", "seconds", "chunks/sec", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+OCR Benchmark
+Parallel vs serial OCR of a synthetic scanned PDF
+
+The PDF's pages are rasterized like any upload, then OCR'd by
+ImageProcessor.extract_text_ocr_batch with each ocr_workers value
+(1 is the serial baseline). Needs tesseract and poppler installed.
+
+    python -m benchmarks.ocr
+    python -m benchmarks.ocr --pages 32 --workers 1 4 8
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+from benchmarks.common import setup_environment, synthetic_pdf, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    missing = [tool for tool in ("tesseract", "pdftoppm") if shutil.which(tool) is None]
+    if missing:
+        print(f"❌ Not installed: {', '.join(missing)} (apt-get install tesseract-ocr poppler-utils)")
+        return 1
+
+    data_dir = setup_environment()
+    from app.config import settings
+    from app.services.document_processor import DocumentProcessor
+    from app.services.image_processor import ImageProcessor
+
+    pdf_path = os.path.join(data_dir, "scan", "scan.pdf")
+    os.makedirs(os.path.dirname(pdf_path))
+    synthetic_pdf(pdf_path, args.pages)
+    image_paths = [
+        img_path for _, img_path in
+        DocumentProcessor().iter_pdf_pages(pdf_path, range(1, args.pages + 1))
+    ]
+    if None in image_paths:
+        print("❌ Rasterizing the PDF failed")
+        return 1
+
+    rows = []
+    serial = None
+    for workers in args.workers:
+        settings.ocr_workers = workers
+        start = time.perf_counter()
+        texts = ImageProcessor().extract_text_ocr_batch(image_paths)
+        elapsed = time.perf_counter() - start
+        if serial is None:
+            serial = (elapsed, texts)
+        rows.append([
+            workers,
+            f"{elapsed:.2f}",
+            f"{args.pages / elapsed:.2f}",
+            f"{serial[0] / elapsed:.1f}x",
+            "yes" if texts == serial[1] else "NO"
+        ])
+    print()
+    print(f"{args.pages} pages at {settings.pdf_raster_dpi} dpi, {os.cpu_count()} CPUs")
+    print_table(["workers", "seconds", "pages/sec", "speedup", "same text"], rows)
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+PDF Memory Benchmark
+Peak memory of rasterizing a scanned PDF, by page count
+
+"streaming" runs DocumentProcessor over the PDF, which rasterizes one
+page at a time to disk; its peak should stay flat as pages grow.
+"eager" is the old convert_from_path(file_path, dpi) call, which decodes
+every page into memory at once. Each run is a fresh process; the peak of
+the pdftoppm processes is reported separately. Needs poppler installed.
+
+    python -m benchmarks.pdf_memory
+    python -m benchmarks.pdf_memory --pages 10 100 300 --modes streaming
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+
+from benchmarks.common import (
+    setup_environment, rss_mb, peak_rss_mb, run_child, synthetic_pdf, print_table
+)
+
+
+def _measure(mode: str, pdf_path: str) -> dict:
+    setup_environment()
+    from app.config import settings
+    from app.services.document_processor import DocumentProcessor
+
+    baseline = rss_mb()
+    pages = 0
+    if mode == "streaming":
+        for text, source in DocumentProcessor().iter_segments(pdf_path):
+            if "error" in source:
+                raise RuntimeError(source["error"])
+            if "image_path" in source:
+                pages += 1
+    else:
+        from pdf2image import convert_from_path
+        pages = len(convert_from_path(pdf_path, dpi=settings.pdf_raster_dpi))
+
+    return {
+        "pages": pages,
+        "rss_baseline_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_child_rss_mb": peak_rss_mb(children=True)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--modes", nargs="+", default=["streaming", "eager"],
+                        choices=["streaming", "eager"])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, pdf_path = args.child
+        print(json.dumps(_measure(mode, pdf_path)))
+        return
+
+    if shutil.which("pdftoppm") is None:
+        print("❌ Not installed: pdftoppm (apt-get install poppler-utils)")
+        return 1
+
+    rows = []
+    peaks = {}
+    for pages in args.pages:
+        work_dir = tempfile.mkdtemp(prefix="volcanorag-pdf-")
+        try:
+            pdf_path = os.path.join(work_dir, "scan.pdf")
+            synthetic_pdf(pdf_path, pages)
+            for mode in args.modes:
+                result = run_child("benchmarks.pdf_memory", mode, pdf_path)
+                peak = result["peak_rss_mb"] - result["rss_baseline_mb"]
+                peaks.setdefault(mode, []).append(peak)
+                rows.append([
+                    mode,
+                    result["pages"],
+                    f"{result['rss_baseline_mb']:.0f}",
+                    f"{result['peak_rss_mb']:.0f}",
+                    f"{peak:.0f}",
+                    f"{result['peak_child_rss_mb']:.0f}"
+                ])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(
+        ["mode", "pages", "RSS before MB", "peak RSS MB", "growth MB", "peak pdftoppm MB"],
+        rows
+    )
+    for mode, growth in peaks.items():
+        print(f"{mode}: growth {min(growth):.0f}-{max(growth):.0f} MB "
+              f"over {args.pages[0]}-{args.pages[-1]} pages")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Session Scaling Benchmark
+Upload latency and RSS with 1, 10 and 100 live sessions
+
+Each run uploads one document per session through the API (upload until
+its job is ready), in a fresh process. "shared" is the process-wide
+embedding service; "per-session" gives every session its own model, as
+each RAGEngine used to load one.
+
+    python -m benchmarks.sessions
+    python -m benchmarks.sessions --sessions 1 10 --modes shared --fake-embeddings
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+from benchmarks.common import setup_environment, rss_mb, peak_rss_mb, run_child, print_table
+
+WORDS = (
+    "basalt magma crater vent ash plume lava tephra caldera fissure dome "
+    "pyroclastic obsidian pumice eruption seismic summit slope flank rift"
+).split()
+
+
+def _document(index: int, words: int = 3000) -> bytes:
+    """Text unique to each session, so the ingestion cache never hits"""
+    rng = random.Random(index)
+    return " ".join(rng.choice(WORDS) for _ in range(words)).encode() + f" doc{index}".encode()
+
+
+def _measure(mode: str, sessions: int, fake_embeddings: bool) -> dict:
+    setup_environment(fake_embeddings)
+    from fastapi.testclient import TestClient
+    from app.config import settings
+    from app.main import app
+
+    if mode == "per-session":
+        from app.services import rag_engine
+        from app.services.embedding_service import EmbeddingService
+        rag_engine.get_embedding_service = lambda: EmbeddingService(settings.embedding_model)
+    settings.max_sessions = max(settings.max_sessions, sessions)
+
+    latencies = []
+    with TestClient(app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.1)
+        baseline = rss_mb()
+        for index in range(sessions):
+            start = time.perf_counter()
+            response = client.post(
+                "/api/v1/upload",
+                files={"file": (f"doc{index}.txt", _document(index))}
+            )
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+            while True:
+                job = client.get(f"/api/v1/jobs/{job_id}").json()
+                if job["status"] in ("ready", "failed"):
+                    break
+                time.sleep(0.01)
+            if job["status"] != "ready":
+                raise RuntimeError(f"Upload failed: {job['error']}")
+            latencies.append(time.perf_counter() - start)
+
+        return {
+            "mode": mode,
+            "sessions": sessions,
+            "latency_mean_ms": statistics.mean(latencies) * 1000,
+            "latency_p95_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000,
+            "rss_baseline_mb": baseline,
+            "rss_mb": rss_mb(),
+            "peak_rss_mb": peak_rss_mb()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--modes", nargs="+", default=["shared", "per-session"],
+                        choices=["shared", "per-session"])
+    parser.add_argument("--fake-embeddings", action="store_true",
+                        help="hashed bag-of-words instead of the model (no download)")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, sessions, fake = args.child
+        print(json.dumps(_measure(mode, int(sessions), fake == "1")))
+        return
+
+    rows = []
+    for mode in args.modes:
+        for sessions in args.sessions:
+            result = run_child(
+                "benchmarks.sessions", mode, sessions, int(args.fake_embeddings)
+            )
+            rows.append([
+                mode,
+                sessions,
+                f"{result['latency_mean_ms']:.0f}",
+                f"{result['latency_p95_ms']:.0f}",
+                f"{result['rss_baseline_mb']:.0f}",
+                f"{result['rss_mb']:.0f}",
+                f"{result['rss_mb'] - result['rss_baseline_mb']:.0f}"
+            ])
+    print_table(
+        ["mode", "sessions", "upload ms", "p95 ms", "RSS before MB", "RSS after MB", "growth MB"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Test configuration
+Dummy API key, throwaway data directories and a local stub of the Groq API
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+_data_dir = tempfile.mkdtemp(prefix="volcanorag-tests-")
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+for name, subdir in [
+    ("VECTOR_STORE_PATH", "chroma"),
+    ("SESSION_DB_PATH", "sessions.db"),
+    ("INGESTION_CACHE_DIR", "ingestion_cache"),
+    ("TTS_CACHE_DIR", "tts_cache"),
+    ("UPLOAD_DIR", "uploads"),
+]:
+    os.environ.setdefault(name, os.path.join(_data_dir, subdir))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class GroqStub:
+    """
+    Local stand-in for the Groq chat completions endpoint
+
+    Each call takes `delay` seconds (or the next value of `delays`), then
+    answers with the next status in `errors` or a completion whose text is
+    GroqStub.answer(messages), so callers can match answers to requests.
+    More than
+    `rate_limit` calls in flight get a 429, like a provider rate limit.
+    Streamed completions send `tokens`, one every `token_delay` seconds.
+    """
+
+    def __init__(self):
+        self.delay = 0.0
+        self.delays = []
+        self.errors = []
+        self.retry_after = 0.01
+        self.rate_limit = None
+        self.tokens = ["Hello", " from", " the", " stub"]
+        self.token_delay = 0.0
+        self.calls = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.streams_open = 0
+        self.disconnects = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def answer(messages: list) -> str:
+        digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+        return f"answer {digest[:12]}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+                with stub.lock:
+                    stub.calls += 1
+                    stub.requests.append(body)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    limited = stub.rate_limit is not None and stub.in_flight > stub.rate_limit
+                    status = stub.errors.pop(0) if stub.errors else 200
+                    delay = stub.delays.pop(0) if stub.delays else stub.delay
+                try:
+                    if limited:
+                        with stub.lock:
+                            stub.rate_limited += 1
+                        status = 429
+                    else:
+                        time.sleep(delay)
+                    if status != 200:
+                        self._send_json(status, {"error": {"message": f"stub {status}"}})
+                    elif body.get("stream"):
+                        self._send_stream()
+                    else:
+                        with stub.lock:
+                            stub.completed += 1
+                        self._send_json(200, {
+                            "id": "stub",
+                            "object": "chat.completion",
+                            "created": 0,
+                            "model": body["model"],
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": stub.answer(body["messages"])},
+                                "finish_reason": "stop"
+                            }],
+                            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+                        })
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("retry-after", str(stub.retry_after))
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def _send_stream(self):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("transfer-encoding", "chunked")
+                self.end_headers()
+                with stub.lock:
+                    stub.streams_open += 1
+                try:
+                    for token in stub.tokens:
+                        time.sleep(stub.token_delay)
+                        event = {
+                            "id": "stub",
+                            "object": "chat.completion.chunk",
+                            "created": 0,
+                            "model": "stub",
+                            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                        }
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                    with stub.lock:
+                        stub.completed += 1
+                except (BrokenPipeError, ConnectionResetError):
+                    with stub.lock:
+                        stub.disconnects += 1
+                finally:
+                    with stub.lock:
+                        stub.streams_open -= 1
+
+        return Handler
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def groq_stub(monkeypatch):
+    stub = GroqStub()
+    monkeypatch.setenv("GROQ_BASE_URL", stub.url)
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def make_gateway(groq_stub, monkeypatch):
+    """Build a fresh LLMGateway (pointed at the stub) with settings overrides"""
+    from app.config import settings
+    from app.services.llm_gateway import LLMGateway
+
+    gateways = []
+
+    def make(**overrides):
+        for name, value in overrides.items():
+            monkeypatch.setattr(settings, name, value)
+        gateway = LLMGateway()
+        gateways.append(gateway)
+        return gateway
+
+    yield make
+    for gateway in gateways:
+        gateway.close()
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    """Use FakeEmbeddings as the shared embedding model"""
+    from fakes import FakeEmbeddings
+    from app.services.embedding_service import get_embedding_service
+
+    service = get_embedding_service()
+    monkeypatch.setattr(service, "_model", FakeEmbeddings())
+    monkeypatch.setattr(service, "_dimension", None)
+    return service
+
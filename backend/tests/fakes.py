@@ -0,0 +1,25 @@
+"""
+Test Fakes
+Stand-ins for models that would otherwise be downloaded
+"""
+
+import hashlib
+
+import numpy as np
+
+
+class FakeEmbeddings:
+    """Bag-of-words hashed into 64 dimensions, identical in every process"""
+
+    def _embed(self, text):
+        vector = np.zeros(64, dtype=np.float32)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector + 0.125).tolist()
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
@@ -0,0 +1,67 @@
+"""
+Document Processor Tests
+Extraction failures are reported on the segment stream
+"""
+
+import pdf2image
+from PyPDF2 import PdfWriter
+
+from app.api import routes
+from app.services.document_processor import DocumentProcessor
+from app.services.job_queue import IngestionJob
+
+
+def _blank_pdf(path, pages=2):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+def _failing_raster(*args, **kwargs):
+    raise RuntimeError("poppler crashed")
+
+
+def test_raster_failures_become_error_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf2image, "convert_from_path", _failing_raster)
+    path = _blank_pdf(tmp_path / "scan.pdf")
+
+    segments = list(DocumentProcessor().iter_segments(path))
+
+    assert [source for _, source in segments] == [
+        {"error": "PDF raster error on page 1"},
+        {"error": "PDF raster error on page 2"}
+    ]
+
+
+def test_unreadable_file_is_an_error_segment(tmp_path):
+    path = tmp_path / "broken.docx"
+    path.write_bytes(b"not a zip file")
+
+    segments = list(DocumentProcessor().iter_segments(str(path)))
+
+    assert len(segments) == 1
+    assert segments[0][1]["error"].startswith("DOCX Error")
+
+
+def test_degraded_ingestion_is_not_cached(tmp_path, monkeypatch, fake_embeddings):
+    from app.services.rag_engine import RAGEngine
+
+    monkeypatch.setattr(pdf2image, "convert_from_path", _failing_raster)
+    doc_dir = tmp_path / "doc"
+    doc_dir.mkdir()
+    path = _blank_pdf(doc_dir / "scan.pdf")
+    engine = RAGEngine("degraded")
+
+    try:
+        routes._index_document(
+            IngestionJob("degraded", "scan.pdf"), engine, "degraded", "scan.pdf",
+            path, "degraded-pdf-hash"
+        )
+    finally:
+        engine.delete()
+
+    cache = routes.get_ingestion_cache()
+    assert cache.get(cache.make_key("degraded-pdf-hash")) is None
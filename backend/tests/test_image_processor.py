@@ -0,0 +1,28 @@
+"""
+Image Processor Tests
+Parallel OCR batches
+"""
+
+import time
+import random
+
+from app.config import settings
+from app.services import image_processor
+from app.services.image_processor import ImageProcessor
+
+
+def test_ocr_batch_keeps_order_and_marks_failures(monkeypatch):
+    def fake_ocr(image_path):
+        time.sleep(random.uniform(0, 0.02))
+        return None if image_path == "bad.png" else f"text of {image_path}"
+
+    monkeypatch.setattr(image_processor, "_ocr_image", fake_ocr)
+    monkeypatch.setattr(settings, "ocr_workers", 4)
+    paths = [f"{i}.png" for i in range(20)] + ["bad.png"]
+    progress = []
+
+    results = ImageProcessor().extract_text_ocr_batch(paths, on_progress=progress.append)
+
+    assert results[:-1] == [f"text of {path}" for path in paths[:-1]]
+    assert results[-1] is None
+    assert sum(progress) == len(paths)
@@ -0,0 +1,42 @@
+"""
+Ingestion Cache Tests
+Cache keys and stored entries
+"""
+
+import numpy as np
+
+from app.config import settings
+from app.services.ingestion_cache import IngestionCache
+
+
+def test_key_changes_with_pdf_settings(monkeypatch):
+    base = IngestionCache.make_key("abc")
+    for name, value in [
+        ("pdf_min_text_chars", settings.pdf_min_text_chars + 1),
+        ("pdf_min_image_size", settings.pdf_min_image_size + 1),
+        ("pdf_raster_dpi", settings.pdf_raster_dpi + 1),
+    ]:
+        with monkeypatch.context() as m:
+            m.setattr(settings, name, value)
+            assert IngestionCache.make_key("abc") != base
+    assert IngestionCache.make_key("abc") == base
+
+
+def test_put_then_get(tmp_path):
+    cache = IngestionCache(str(tmp_path), max_bytes=1024 * 1024)
+    key = cache.make_key("abc")
+    embeddings = np.arange(6, dtype=np.float32).reshape(2, 3)
+    cache.put(
+        key,
+        chunks=["one", "two"],
+        sources=[{"page": 1}, {"page": 2}],
+        embeddings=embeddings,
+        text_length=6,
+        num_images=0
+    )
+    entry = cache.get(key)
+    assert entry["chunks"] == ["one", "two"]
+    assert entry["sources"] == [{"page": 1}, {"page": 2}]
+    assert entry["text_length"] == 6
+    np.testing.assert_array_equal(entry["embeddings"], embeddings)
+    assert cache.get(cache.make_key("other")) is None
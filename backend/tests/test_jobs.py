@@ -0,0 +1,55 @@
+"""
+Job Tests
+Job records left behind by workers that died
+"""
+
+import sys
+import time
+import threading
+import subprocess
+
+from app.api import routes
+from app.services.job_queue import IngestionJob, JobQueue, is_abandoned
+from app.services.session_store import InMemorySessionStore
+
+
+def _record(**fields) -> dict:
+    record = IngestionJob("job", "a.pdf").to_dict()
+    record.update({"status": "processing", **fields})
+    return record
+
+
+def test_records_of_gone_workers_are_abandoned():
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+
+    assert not is_abandoned(_record(), stale_seconds=60)
+    assert is_abandoned(_record(owner_pid=dead.pid), stale_seconds=60)
+    # Same pid as ours, but written before a restart
+    assert is_abandoned(_record(owner_token="earlier"), stale_seconds=60)
+    assert is_abandoned(_record(updated_at=time.time() - 120), stale_seconds=60)
+    assert not is_abandoned(_record(owner_pid=dead.pid, status="ready"), stale_seconds=60)
+
+
+def test_abandoned_job_reads_as_failed(monkeypatch):
+    store = InMemorySessionStore()
+    monkeypatch.setattr(routes, "get_session_store", lambda: store)
+    store.save_job("orphan", _record(job_id="orphan", owner_token="earlier"))
+
+    assert routes.get_job_record("orphan")["status"] == "failed"
+    assert not routes._is_processing("orphan")
+
+
+def test_unfinished_jobs_publish_a_heartbeat():
+    updates = []
+    queue = JobQueue(max_workers=1, on_update=updates.append, heartbeat_seconds=0.05)
+    release = threading.Event()
+
+    queue.submit("slow", "a.pdf", lambda job: release.wait(5))
+    time.sleep(0.5)
+    release.set()
+    queue.shutdown()
+
+    processing = [u for u in updates if u["status"] == "processing"]
+    assert len(processing) >= 3
+    assert processing[-1]["updated_at"] > processing[0]["updated_at"]
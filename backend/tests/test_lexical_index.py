@@ -0,0 +1,25 @@
+"""
+Lexical Index Tests
+BM25 postings across incremental adds and removes
+"""
+
+from app.services.lexical_index import BM25Index
+
+
+def _add(index: BM25Index, doc_id: str, texts):
+    index.add_document(doc_id, [f"{doc_id}_{i}" for i in range(len(texts))], texts)
+
+
+def test_add_remove_add_keeps_documents_apart():
+    index = BM25Index()
+    _add(index, "A", ["apple orchard harvest"])
+    _add(index, "B", ["banana plantation harvest", "banana export"])
+    index.remove_document("A")
+    _add(index, "C", ["cherry orchard harvest"])
+
+    assert [c for c, _ in index.search("harvest", 10, doc_ids=["C"])] == ["C_0"]
+    assert {c for c, _ in index.search("harvest", 10, doc_ids=["B"])} == {"B_0"}
+
+    index.remove_document("C")
+    assert {c for c, _ in index.search("harvest banana", 10)} == {"B_0", "B_1"}
+    assert len(index) == 2
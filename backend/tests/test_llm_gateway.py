@@ -0,0 +1,116 @@
+"""
+LLM Gateway Tests
+Retries, deadlines, lane limits and streaming against the Groq stub
+"""
+
+import time
+import asyncio
+
+import pytest
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_retries_rate_limits_and_server_errors(groq_stub, make_gateway):
+    groq_stub.errors = [429, 500, 503]
+    gateway = make_gateway(llm_max_retries=3, llm_retry_base_delay=0.01)
+
+    answer = gateway.complete_sync(MESSAGES, model="stub")
+
+    assert answer == groq_stub.answer(MESSAGES)
+    assert groq_stub.calls == 4
+    assert gateway.stats()["chat"]["retries"] == 3
+
+
+def test_client_errors_are_not_retried(groq_stub, make_gateway):
+    from groq import BadRequestError
+
+    groq_stub.errors = [400]
+    gateway = make_gateway(llm_max_retries=3, llm_retry_base_delay=0.01)
+
+    with pytest.raises(BadRequestError):
+        gateway.complete_sync(MESSAGES, model="stub")
+    assert groq_stub.calls == 1
+    assert gateway.stats()["chat"]["failures"] == 1
+
+
+def test_each_attempt_has_its_own_deadline(groq_stub, make_gateway):
+    groq_stub.delays = [2.0]
+    gateway = make_gateway(llm_timeout=0.3, llm_max_retries=1, llm_retry_base_delay=0.01)
+    gateway._get_loop()
+
+    start = time.perf_counter()
+    answer = gateway.complete_sync(MESSAGES, model="stub")
+
+    # The stalled first attempt is abandoned at 0.3s, not awaited for 2s
+    assert answer == groq_stub.answer(MESSAGES)
+    assert time.perf_counter() - start < 1.5
+    assert groq_stub.calls == 2
+
+    groq_stub.delays = [2.0, 2.0]
+    with pytest.raises(TimeoutError):
+        gateway.complete_sync(MESSAGES, model="stub")
+
+
+def test_lane_caps_calls_in_flight(groq_stub, make_gateway):
+    groq_stub.delay = 0.1
+    gateway = make_gateway(llm_concurrency=3)
+
+    results = gateway.complete_many([MESSAGES] * 10, model="stub")
+
+    assert results == [groq_stub.answer(MESSAGES)] * 10
+    assert groq_stub.max_in_flight == 3
+
+
+def test_streams_hold_their_lane_slot_until_consumed(groq_stub, make_gateway):
+    groq_stub.token_delay = 0.05
+    gateway = make_gateway(llm_concurrency=1)
+    lane_in_flight = []
+
+    async def consume():
+        tokens = []
+        async for token in gateway.astream(MESSAGES, model="stub"):
+            lane_in_flight.append(gateway.stats()["chat"]["in_flight"])
+            tokens.append(token)
+        return "".join(tokens)
+
+    async def main():
+        return await asyncio.gather(consume(), consume())
+
+    answers = asyncio.run(main())
+
+    assert answers == ["".join(groq_stub.tokens)] * 2
+    assert groq_stub.max_in_flight == 1
+    assert set(lane_in_flight) == {1}
+    assert gateway.stats()["chat"]["in_flight"] == 0
+
+
+def test_closing_a_stream_cancels_the_upstream_request(groq_stub, make_gateway):
+    groq_stub.tokens = [f" t{i}" for i in range(100)]
+    groq_stub.token_delay = 0.02
+    gateway = make_gateway()
+
+    async def read_two():
+        stream = gateway.astream(MESSAGES, model="stub")
+        tokens = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return tokens
+
+    assert asyncio.run(read_two()) == [" t0", " t1"]
+    assert _wait_for(lambda: groq_stub.disconnects == 1)
+    assert _wait_for(lambda: gateway.stats()["chat"]["in_flight"] == 0)
+
+    # The blocking iterator for worker threads does the same
+    stream = gateway.stream(MESSAGES, model="stub")
+    assert next(stream) == " t0"
+    stream.close()
+    assert _wait_for(lambda: groq_stub.disconnects == 2)
+    assert groq_stub.completed == 0
+    assert _wait_for(lambda: gateway.stats()["chat"]["in_flight"] == 0)
@@ -0,0 +1,149 @@
+"""
+Multi-Worker Tests
+Several uvicorn workers serving the same sessions (python -m app.main)
+"""
+
+import os
+import sys
+import time
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_SITE = os.path.join(BACKEND_DIR, "tests", "worker_site")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=["auto", "chroma"])
+def server(request, tmp_path, groq_stub):
+    """The app on two workers, on the default (NumPy) and Chroma backends"""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([WORKER_SITE, BACKEND_DIR]),
+        "VOLCANORAG_FAKE_EMBEDDINGS": "1",
+        "GROQ_BASE_URL": groq_stub.url,
+        "WORKERS": "2",
+        "PORT": str(port),
+        "HOST": "127.0.0.1",
+        "CHROMA_PORT": str(_free_port()),
+        "VECTOR_STORE_BACKEND": request.param,
+        "HYBRID_SEARCH": "false",  # answers must come from the vector index
+        "VECTOR_STORE_PATH": str(tmp_path / "chroma"),
+        "SESSION_DB_PATH": str(tmp_path / "sessions.db"),
+        "INGESTION_CACHE_DIR": str(tmp_path / "ingestion_cache"),
+        "UPLOAD_DIR": str(tmp_path / "uploads"),
+        "LOG_LEVEL": "WARNING"
+    }
+    env.pop("CHROMA_HOST", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while True:
+        try:
+            if httpx.get(f"{base_url}/").status_code == 200:
+                break
+        except httpx.HTTPError:
+            pass
+        assert process.poll() is None, "server exited"
+        assert time.time() < deadline, "server did not start"
+        time.sleep(0.2)
+    yield base_url
+    process.terminate()
+    process.wait(timeout=30)
+
+
+def _request(method: str, url: str, **kwargs) -> httpx.Response:
+    # A new connection each time, so requests spread across workers
+    with httpx.Client(timeout=60) as client:
+        return client.request(method, url, **kwargs)
+
+
+def _ingest(url: str, filename: str, text: str) -> dict:
+    response = _request("POST", url, files={"file": (filename, text.encode())})
+    assert response.status_code == 200, response.text
+    job_url = url.split("/api/v1/")[0] + f"/api/v1/jobs/{response.json()['job_id']}"
+    while True:
+        job = _request("GET", job_url).json()
+        if job["status"] in ("ready", "failed"):
+            assert job["status"] == "ready", job
+            return job["result"]
+        time.sleep(0.1)
+
+
+def _source_docs(base_url: str, session_id: str, question: str, doc_ids=None) -> list:
+    """Documents behind each answer, asking several times across workers"""
+    results = []
+    for _ in range(8):
+        response = _request("POST", f"{base_url}/api/v1/query", json={
+            "session_id": session_id,
+            "question": f"{question} {len(results)}",  # defeat the answer cache
+            "doc_ids": doc_ids
+        })
+        assert response.status_code == 200, response.text
+        results.append(sorted({source["doc_id"] for source in response.json()["sources"]}))
+    return results
+
+
+def test_workers_share_sessions_and_vector_index(server):
+    lorem = "alpha apples grow in the northern orchard every autumn season. " * 30
+    other = "beta bicycles race through the southern valley every spring morning. " * 30
+
+    session = _ingest(f"{server}/api/v1/upload", "a.txt", lorem)
+    session_id = session["session_id"]
+    doc_a = session["document_id"]
+    # Every worker loads the session (and its vectors) before it changes
+    assert _source_docs(server, session_id, "apples orchard") == [[doc_a]] * 8
+
+    doc_b = _ingest(
+        f"{server}/api/v1/session/{session_id}/documents", "b.txt", other
+    )["document_id"]
+    assert _source_docs(server, session_id, "bicycles valley", [doc_b]) == [[doc_b]] * 8
+
+    response = _request("DELETE", f"{server}/api/v1/session/{session_id}/documents/{doc_a}")
+    assert response.status_code == 200
+    assert _source_docs(server, session_id, "apples orchard") == [[doc_b]] * 8
+
+    assert _request("DELETE", f"{server}/api/v1/session/{session_id}").status_code == 200
+    for _ in range(4):
+        response = _request("GET", f"{server}/api/v1/status/{session_id}")
+        assert response.status_code == 404
+
+
+def test_workers_adding_documents_at_once_keep_them_all(server):
+    topics = {
+        "a.txt": "alpha apples grow in the northern orchard every autumn season. ",
+        "b.txt": "beta bicycles race through the southern valley every spring morning. ",
+        "c.txt": "gamma gliders drift above the eastern cliffs every summer evening. ",
+        "d.txt": "delta dolphins swim along the western coast every winter night. "
+    }
+    session = _ingest(f"{server}/api/v1/upload", "a.txt", topics.pop("a.txt") * 30)
+    session_id = session["session_id"]
+    add_url = f"{server}/api/v1/session/{session_id}/documents"
+
+    # Each upload may land on a different worker, all writing the same index
+    with ThreadPoolExecutor(max_workers=len(topics)) as pool:
+        added = list(pool.map(
+            lambda item: _ingest(add_url, item[0], item[1] * 30)["document_id"],
+            topics.items()
+        ))
+
+    response = _request("GET", f"{server}/api/v1/status/{session_id}")
+    assert response.status_code == 200
+    for doc_id in [session["document_id"], *added]:
+        assert _source_docs(server, session_id, "every season", [doc_id]) == [[doc_id]] * 8
@@ -0,0 +1,128 @@
+"""
+RAG Engine Tests
+Indexing and answering with fake embeddings and the Groq stub
+"""
+
+import random
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.rag_engine import RAGEngine
+
+ORCHARD = (
+    "Alpha apples grow in the northern orchard every autumn. "
+    "The orchard keepers press cider from the apples in October. "
+) * 40
+
+
+@pytest.fixture
+def make_engine(fake_embeddings, make_gateway):
+    gateway = make_gateway()
+    engines = []
+
+    def make(session_id: str, doc_id: str, filename: str, text: str) -> RAGEngine:
+        engine = RAGEngine(session_id)
+        engine.llm = gateway
+        engine.add_document(
+            doc_id, filename, engine.iter_chunks([(text, {})]), content_hash="orchard"
+        )
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.delete()
+
+
+def test_cached_answers_carry_the_asking_sessions_sources(make_engine, groq_stub):
+    first = make_engine("session-a", "doc-a", "a.txt", ORCHARD)
+    copy = make_engine("session-b", "doc-b", "a_copy.txt", ORCHARD)
+    question = "When is cider pressed in the orchard?"
+
+    original = first.query(question)
+    cached = copy.query(question)
+
+    assert groq_stub.calls == 1  # the second session's answer came from the cache
+    assert cached["answer"] == original["answer"]
+    assert cached["sources"]
+    for source, original_source in zip(cached["sources"], original["sources"]):
+        assert source["doc_id"] == "doc-b"
+        assert source["filename"] == "a_copy.txt"
+        assert source["chunk_id"] == original_source["chunk_id"].replace("doc-a", "doc-b")
+        assert source["chunk_id"] in copy.chunks
+
+
+def test_query_stream_yields_context_tokens_then_done(make_engine, groq_stub):
+    engine = make_engine("session-s", "doc-s", "s.txt", ORCHARD)
+
+    async def collect(question):
+        return [event async for event in engine.query_stream(question)]
+
+    events = asyncio.run(collect("Where do alpha apples grow?"))
+    assert [e["type"] for e in events] == ["context"] + ["token"] * len(groq_stub.tokens) + ["done"]
+    assert "".join(e["content"] for e in events if e["type"] == "token") == "".join(groq_stub.tokens)
+    assert events[-1]["cached"] is False
+
+    again = asyncio.run(collect("Where do alpha apples grow?"))
+    assert again[-1]["cached"] is True
+    assert again[0]["sources"] == events[0]["sources"]
+    assert groq_stub.calls == 1
+
+
+@pytest.mark.parametrize("separators", [["\n\n"], ["\n\n", "\n", "\n\n\n", " \n\n"]])
+def test_iter_chunks_matches_splitting_the_whole_text(separators, monkeypatch):
+    monkeypatch.setattr(settings, "chunking_window_chars", 8000)
+    rng = random.Random(7)
+    words = "lava basalt column cooling flow magma eruption crater ash plume vent".split()
+    text = "".join(
+        " ".join(rng.choice(words) for _ in range(rng.choice([3, 40, 120, 400])))
+        + rng.choice(separators)
+        for _ in range(400)
+    )
+    # Segments cut anywhere, as extractors yield pages or paragraphs
+    segments = []
+    position = 0
+    while position < len(text):
+        end = position + rng.randint(1, 3000)
+        segments.append((text[position:end], {}))
+        position = end
+    engine = RAGEngine("chunking")
+
+    streamed = [chunk for chunk, _ in engine.iter_chunks(segments)]
+
+    assert len(streamed) > 100
+    assert streamed == engine.text_splitter.split_text(text)
+
+
+def _failing_after(chunks, count):
+    for i, chunk in enumerate(chunks):
+        if i == count:
+            raise RuntimeError("extraction failed")
+        yield chunk
+
+
+def test_failed_document_is_rolled_back(make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_batch_size", 2)
+    engine = make_engine("session-f", "doc1", "orchard.txt", ORCHARD)
+    lava = "Basalt lava flows cool into columns. " * 100
+
+    with pytest.raises(RuntimeError):
+        engine.add_document("doc2", "lava.txt", _failing_after(engine.iter_chunks([(lava, {})]), 3))
+
+    assert list(engine.documents) == ["doc1"]
+    assert {s["doc_id"] for s in engine.retrieve("basalt lava")["sources"]} == {"doc1"}
+    assert list(RAGEngine.load("session-f").documents) == ["doc1"]
+
+
+def test_failed_first_document_leaves_no_index(fake_embeddings, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_batch_size", 2)
+    engine = RAGEngine("session-new")
+
+    with pytest.raises(RuntimeError):
+        engine.add_document("doc1", "a.txt", _failing_after(engine.iter_chunks([(ORCHARD, {})]), 3))
+
+    assert engine.store is None
+    assert not engine.documents
+    assert RAGEngine.load("session-new") is None
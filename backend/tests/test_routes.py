@@ -0,0 +1,74 @@
+"""
+Route Tests
+API behaviour through the ASGI app
+"""
+
+import time
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.api import routes
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_session_reload_does_not_block_event_loop(monkeypatch):
+    def slow_load(session_id):
+        time.sleep(0.5)  # e.g. reading a large index back from disk
+        return None
+
+    monkeypatch.setattr(routes, "_load_session", slow_load)
+    monkeypatch.setattr(routes, "_session_manager", None)
+
+    async def run():
+        async with _client() as client:
+            start = time.perf_counter()
+            reload = asyncio.create_task(client.delete("/api/v1/session/evicted"))
+            await asyncio.sleep(0.05)
+            health = await client.get("/")
+            health_latency = time.perf_counter() - start
+            return (await reload).status_code, health.status_code, health_latency
+
+    reload_status, health_status, health_latency = asyncio.run(run())
+    assert reload_status == 404
+    assert health_status == 200
+    assert health_latency < 0.3
+
+
+def test_identical_stream_queries_share_one_generation(
+    fake_embeddings, make_gateway, groq_stub, monkeypatch
+):
+    from app.services.rag_engine import RAGEngine
+
+    groq_stub.token_delay = 0.05
+    engine = RAGEngine("stream-session")
+    engine.llm = make_gateway()
+    text = "Basalt columns form when thick lava flows cool and contract slowly. " * 30
+    engine.add_document("doc", "lava.txt", engine.iter_chunks([(text, {})]), content_hash="lava")
+    monkeypatch.setattr(routes, "require_session", lambda session_id: {"rag_engine": engine})
+
+    async def ask(client, question):
+        response = await client.post("/api/v1/query/stream", json={
+            "session_id": "stream-session", "question": question, "language": "en"
+        })
+        return response.text
+
+    async def run():
+        async with _client() as client:
+            return await asyncio.gather(
+                ask(client, "How do basalt columns form?"),
+                ask(client, "  How do basalt columns form?")
+            )
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        engine.delete()
+
+    assert groq_stub.calls == 1
+    assert first == second
+    assert "event: done" in first
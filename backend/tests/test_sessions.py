@@ -0,0 +1,120 @@
+"""
+Session Tests
+In-memory session budget and shared session records
+"""
+
+import threading
+
+from app.api import routes
+from app.services.session_manager import SessionManager
+from app.services.session_store import SQLiteSessionStore
+
+
+class SizedEngine:
+    def __init__(self, size: int):
+        self.size = size
+
+    def memory_bytes(self) -> int:
+        return self.size
+
+
+def test_resize_applies_budget_to_grown_sessions():
+    manager = SessionManager(
+        max_sessions=10, max_bytes=1000, idle_ttl_seconds=3600, loader=lambda _: None
+    )
+    small = {"rag_engine": SizedEngine(300)}
+    growing = {"rag_engine": SizedEngine(300)}
+    manager.put("small", small)
+    manager.put("growing", growing)
+
+    growing["rag_engine"].size = 900  # a document was added
+    manager.resize("growing")
+
+    assert manager.stats()["approx_bytes"] == 900
+    assert "small" not in manager
+    assert "growing" in manager
+
+
+def test_record_updates_are_atomic(tmp_path, monkeypatch):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(routes, "get_session_store", lambda: store)
+    routes._update_session_record("s", "/tmp/s", lambda documents: None, create=True)
+
+    def add_documents(prefix: str):
+        for i in range(25):
+            routes._update_session_record(
+                "s", "/tmp/s",
+                lambda documents: documents.__setitem__(f"{prefix}{i}", {
+                    "filename": "f", "text_length": 1, "num_chunks": 1, "num_images": 0
+                })
+            )
+
+    threads = [threading.Thread(target=add_documents, args=(p,)) for p in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    record = store.load_session("s")
+    assert len(record["documents"]) == 100
+    assert record["version"] == 101
+
+
+def test_deleted_session_is_not_recreated(tmp_path, monkeypatch):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(routes, "get_session_store", lambda: store)
+    routes._update_session_record("s", "/tmp/s", lambda documents: None, create=True)
+
+    store.delete_session("s")  # DELETE /session/s while a document is ingesting
+    record = routes._update_session_record(
+        "s", "/tmp/s", lambda documents: documents.setdefault("late", {})
+    )
+
+    assert record is None
+    assert store.load_session("s") is None
+
+
+def test_index_of_a_failed_ingestion_is_not_adopted(fake_embeddings, monkeypatch):
+    from app.services.rag_engine import RAGEngine
+    from app.services.session_store import InMemorySessionStore
+
+    store = InMemorySessionStore()
+    monkeypatch.setattr(routes, "get_session_store", lambda: store)
+    engine = RAGEngine("half-done")
+    engine.add_document("half-done", "a.txt", ["Basalt columns form as lava cools."])
+    store.save_job("half-done", {"job_id": "half-done", "status": "failed"})
+
+    try:
+        assert routes._load_session("half-done") is None
+        store.save_job("half-done", {"job_id": "half-done", "status": "ready"})
+        assert routes._load_session("half-done") is not None
+    finally:
+        engine.delete()
+
+
+def test_live_session_missing_another_workers_change_is_dropped(tmp_path, monkeypatch):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    manager = SessionManager(
+        max_sessions=10, max_bytes=1000, idle_ttl_seconds=3600, loader=lambda _: None
+    )
+    monkeypatch.setattr(routes, "get_session_store", lambda: store)
+    monkeypatch.setattr(routes, "_session_manager", manager)
+    record = routes._update_session_record("s", "/tmp/s", lambda documents: None, create=True)
+    session = {"rag_engine": SizedEngine(1), **record}
+    manager.put("s", session)
+
+    def add(doc_id: str):
+        return lambda documents: documents.setdefault(doc_id, {
+            "filename": "f", "text_length": 1, "num_chunks": 1, "num_images": 0
+        })
+
+    record = routes._update_session_record("s", "/tmp/s", add("a"))
+    routes._adopt_session_record("s", session, record)
+    assert manager.get("s") is session
+    assert session["version"] == record["version"]
+
+    routes._update_session_record("s", "/tmp/s", add("b"))  # another worker
+    record = routes._update_session_record("s", "/tmp/s", add("c"))
+    routes._adopt_session_record("s", session, record)
+    # This worker's index lacks "b"; it must be reloaded, not marked current
+    assert "s" not in manager
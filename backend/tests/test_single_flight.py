@@ -0,0 +1,89 @@
+"""
+Single Flight Tests
+Shared upstream streams and what happens when subscribers leave
+"""
+
+import asyncio
+
+from app.services.single_flight import SingleFlight
+
+
+def _counter(produced: list, finished: list):
+    async def numbers():
+        try:
+            for i in range(20):
+                await asyncio.sleep(0.01)
+                produced.append(i)
+                yield i
+            finished.append("done")
+        except asyncio.CancelledError:
+            finished.append("cancelled")
+            raise
+    return numbers
+
+
+async def _take(stream, count: int) -> list:
+    items = []
+    async for item in stream:
+        items.append(item)
+        if len(items) == count:
+            break
+    await stream.aclose()
+    return items
+
+
+def test_abandoned_stream_is_cancelled():
+    produced, finished = [], []
+    flight = SingleFlight()
+
+    async def main():
+        fn = _counter(produced, finished)
+        first = flight.stream("k", fn, cancel_abandoned=True)
+        second = flight.stream("k", fn, cancel_abandoned=True)
+        taken = await asyncio.gather(_take(first, 2), _take(second, 5))
+        await asyncio.sleep(0.1)
+        return taken
+
+    assert asyncio.run(main()) == [[0, 1], [0, 1, 2, 3, 4]]
+    assert finished == ["cancelled"]
+    assert len(produced) < 8
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_stream_runs_to_completion_by_default():
+    produced, finished = [], []
+    flight = SingleFlight()
+
+    async def main():
+        taken = await _take(flight.stream("k", _counter(produced, finished)), 2)
+        await asyncio.sleep(0.4)
+        return taken
+
+    assert asyncio.run(main()) == [0, 1]
+    assert finished == ["done"]
+    assert len(produced) == 20
+
+
+def test_abandoned_query_stream_releases_the_llm(groq_stub, make_gateway):
+    groq_stub.tokens = [f" t{i}" for i in range(100)]
+    groq_stub.token_delay = 0.02
+    gateway = make_gateway()
+    flight = SingleFlight()
+
+    async def tokens():
+        async for token in gateway.astream([{"role": "user", "content": "hi"}], model="stub"):
+            yield token
+
+    async def main():
+        taken = await _take(flight.stream("q", tokens, cancel_abandoned=True), 2)
+        # Keep this loop running, so only cancellation can stop the stream
+        for _ in range(300):
+            if groq_stub.disconnects and not gateway.stats()["chat"]["in_flight"]:
+                break
+            await asyncio.sleep(0.01)
+        return taken
+
+    assert asyncio.run(main()) == [" t0", " t1"]
+    assert groq_stub.disconnects == 1
+    assert gateway.stats()["chat"]["in_flight"] == 0
+    assert groq_stub.completed == 0
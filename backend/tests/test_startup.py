@@ -0,0 +1,27 @@
+"""
+Startup Tests
+Importing the app must not pull in the heavy ML and API libraries
+"""
+
+import os
+import sys
+import subprocess
+
+HEAVY = {
+    "chromadb", "langchain", "langchain_community", "langchain_text_splitters",
+    "sentence_transformers", "torch", "groq", "pytesseract", "edge_tts",
+    "PyPDF2", "docx", "openpyxl", "pptx", "pdf2image", "PIL"
+}
+
+
+def test_app_import_stays_light():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True, check=True
+    )
+    imported = {
+        line.rsplit("|", 1)[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines() if line.startswith("import time:")
+    }
+    assert not HEAVY & imported
@@ -0,0 +1,137 @@
+"""
+Vector Store Tests
+Backend interface and the NumPy store
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.session_store import SessionStore
+from app.services.vector_store import NumpyVectorStore, VectorStore
+
+
+def test_incomplete_backends_fail_on_construction():
+    class PartialStore(VectorStore):
+        def __len__(self):
+            return 0
+
+    class PartialSessionStore(SessionStore):
+        def save_session(self, session_id, record):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialStore()
+    with pytest.raises(TypeError):
+        PartialSessionStore()
+
+
+def test_numpy_store_is_always_readable_while_persisting(monkeypatch):
+    replace = os.replace
+
+    def slow_replace(src, dst):
+        # Widen the window between renames so a reader lands in it
+        replace(src, dst)
+        time.sleep(0.002)
+
+    monkeypatch.setattr(os, "replace", slow_replace)
+    store = NumpyVectorStore("persist-race")
+    rng = np.random.default_rng(0)
+    store.add(
+        [f"doc_{i}" for i in range(20)],
+        rng.standard_normal((20, 8)),
+        [f"text {i}" for i in range(20)],
+        [{"doc_id": "doc"} for _ in range(20)]
+    )
+    store.persist()
+
+    missing = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            reopened = NumpyVectorStore.open("persist-race")
+            if reopened is None or len(reopened) != 20:
+                missing.append(reopened)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for _ in range(200):
+            store.persist()
+    finally:
+        done.set()
+        reader.join()
+
+    assert not missing
+    assert len(NumpyVectorStore.open("persist-race")) == 20
+    versions = [e for e in os.listdir(store.path) if e.startswith("v-")]
+    assert len(versions) <= 2
+    store.drop()
+
+
+def _add_document(store: NumpyVectorStore, doc_id: str, chunks: int = 3):
+    rng = np.random.default_rng(len(store))
+    store.add(
+        [f"{doc_id}_{i}" for i in range(chunks)],
+        rng.standard_normal((chunks, 8)),
+        [f"{doc_id} text {i}" for i in range(chunks)],
+        [{"doc_id": doc_id} for _ in range(chunks)]
+    )
+
+
+def _stored_docs(name: str) -> set:
+    return {meta["doc_id"] for meta in NumpyVectorStore.open(name).get_all()["metadatas"]}
+
+
+def test_numpy_store_keeps_changes_of_every_writer():
+    store = NumpyVectorStore("writers")
+    _add_document(store, "doc1")
+    store.persist()
+    # Two workers load the same version, then change it independently
+    first = NumpyVectorStore.open("writers")
+    second = NumpyVectorStore.open("writers")
+
+    _add_document(first, "doc2")
+    first.persist()
+    _add_document(second, "doc3")
+    second.persist()
+    assert _stored_docs("writers") == {"doc1", "doc2", "doc3"}
+
+    first.delete_document("doc1")
+    first.persist()
+    _add_document(second, "doc4")
+    second.persist()
+    # second still holds doc1, but must not bring it back
+    assert _stored_docs("writers") == {"doc2", "doc3", "doc4"}
+    assert len(NumpyVectorStore.open("writers")) == 9
+    store.drop()
+
+
+def test_numpy_store_serializes_concurrent_persists(monkeypatch):
+    replace = os.replace
+
+    def slow_replace(src, dst):
+        # Widen the window between reading the live version and replacing it
+        replace(src, dst)
+        time.sleep(0.005)
+
+    monkeypatch.setattr(os, "replace", slow_replace)
+    store = NumpyVectorStore("concurrent-writers")
+    _add_document(store, "doc0")
+    store.persist()
+    writers = [NumpyVectorStore.open("concurrent-writers") for _ in range(6)]
+    for i, writer in enumerate(writers, start=1):
+        _add_document(writer, f"doc{i}")
+
+    threads = [threading.Thread(target=writer.persist) for writer in writers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _stored_docs("concurrent-writers") == {f"doc{i}" for i in range(7)}
+    store.drop()
@@ -0,0 +1,94 @@
+"""
+Vision Tests
+Concurrent, rate-limited Vision AI calls against the Groq stub
+"""
+
+import time
+
+from PIL import Image
+
+from app.services.image_processor import ImageProcessor
+
+
+def _images(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = str(tmp_path / f"page_{i}.png")
+        Image.new("RGB", (32, 32), (i, i, i)).save(path)
+        paths.append(path)
+    return paths
+
+
+def _processor(gateway):
+    processor = ImageProcessor()
+    processor.llm = gateway
+    return processor
+
+
+def test_vision_calls_run_concurrently(tmp_path, groq_stub, make_gateway):
+    groq_stub.delay = 0.2
+    paths = _images(tmp_path, 20)
+    processor = _processor(make_gateway(vision_concurrency=5))
+    processor.llm._get_loop()  # client setup is not part of the timing
+
+    start = time.perf_counter()
+    results = processor.analyze_images_vision(paths)
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    assert groq_stub.max_in_flight == 5
+    # 20 calls x 0.2s take 4s one at a time; 5 at a time about 0.8s
+    assert elapsed < 2.0
+
+
+def test_vision_retries_through_rate_limit(tmp_path, groq_stub, make_gateway):
+    groq_stub.delay = 0.05
+    groq_stub.rate_limit = 3
+    paths = _images(tmp_path, 12)
+    processor = _processor(make_gateway(
+        vision_concurrency=6, vision_max_retries=20, vision_retry_base_delay=0.01
+    ))
+    progress = []
+
+    results = processor.analyze_images_vision(paths, on_progress=progress.append)
+
+    assert groq_stub.rate_limited > 0
+    assert groq_stub.completed == len(paths)
+    assert sum(progress) == len(paths)
+    # Results keep page order: each answer is for its own image
+    assert results == [
+        groq_stub.answer(processor._vision_messages(path)) for path in paths
+    ]
+
+
+def test_vision_encodes_images_only_when_their_call_starts(
+    tmp_path, groq_stub, make_gateway, monkeypatch
+):
+    groq_stub.delay = 0.05
+    paths = _images(tmp_path, 12)
+    processor = _processor(make_gateway(vision_concurrency=3))
+    built = []
+    outstanding = []
+    build = processor._vision_messages
+
+    def tracking_build(image_path):
+        built.append(image_path)
+        outstanding.append(len(built) - groq_stub.completed)
+        return build(image_path)
+
+    monkeypatch.setattr(processor, "_vision_messages", tracking_build)
+    results = processor.analyze_images_vision(paths)
+
+    assert all(results)
+    assert sorted(built) == sorted(paths)
+    assert max(outstanding) <= 3
+
+
+def test_vision_failures_are_none(tmp_path, groq_stub, make_gateway):
+    groq_stub.errors = [400]
+    paths = _images(tmp_path, 1) + [str(tmp_path / "missing.png")]
+    processor = _processor(make_gateway(vision_concurrency=1))
+
+    results = processor.analyze_images_vision(paths)
+
+    assert results == [None, None]
@@ -0,0 +1,102 @@
+"""
+Voice Handler Tests
+Sentence segmentation and concurrent, ordered synthesis with a fake edge-tts
+"""
+
+import time
+import asyncio
+
+import edge_tts
+import pytest
+
+from app.config import settings
+from app.services.voice_handler import VoiceHandler, split_segments
+
+
+class FakeCommunicate:
+    """edge_tts.Communicate stand-in: three audio chunks per segment"""
+
+    active = 0
+    max_active = 0
+    started = []
+
+    def __init__(self, text, voice):
+        self.text = text
+
+    async def stream(self):
+        cls = FakeCommunicate
+        cls.started.append(self.text)
+        cls.active += 1
+        cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if "broken" in self.text:
+                raise RuntimeError("synthesis failed")
+            # Earlier segments take longer, so they finish out of order
+            delay = 0.02 * (10 - int(self.text.split()[1]))
+            for part in range(3):
+                await asyncio.sleep(delay / 3)
+                yield {"type": "audio", "data": f"[{self.text}:{part}]".encode()}
+            yield {"type": "WordBoundary"}
+        finally:
+            cls.active -= 1
+
+
+@pytest.fixture
+def fake_tts(monkeypatch):
+    monkeypatch.setattr(edge_tts, "Communicate", FakeCommunicate)
+    monkeypatch.setattr(FakeCommunicate, "active", 0)
+    monkeypatch.setattr(FakeCommunicate, "max_active", 0)
+    monkeypatch.setattr(FakeCommunicate, "started", [])
+    return FakeCommunicate
+
+
+async def _collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+def test_split_segments_starts_with_the_first_sentence():
+    text = "Hello there. " + " ".join(f"Sentence number {i} is here." for i in range(40))
+
+    segments = split_segments(text, 120)
+
+    assert segments[0] == "Hello there."
+    assert all(len(segment) <= 120 for segment in segments)
+    assert " ".join(segments).split() == text.split()
+
+
+def test_segments_are_synthesized_concurrently_and_played_in_order(fake_tts, monkeypatch):
+    monkeypatch.setattr(settings, "tts_concurrency", 3)
+    segments = [f"segment {i}" for i in range(8)]
+
+    start = time.perf_counter()
+    audio = asyncio.run(_collect(VoiceHandler()._synthesize_segments(segments, "voice")))
+    elapsed = time.perf_counter() - start
+
+    assert audio == b"".join(
+        f"[{segment}:{part}]".encode() for segment in segments for part in range(3)
+    )
+    assert fake_tts.started[:3] == segments[:3]
+    assert fake_tts.max_active == 3
+    # One at a time this takes 0.02 * (10 + 9 + ... + 3) = 1.04s
+    assert elapsed < 0.9
+
+
+def test_a_failed_segment_fails_the_stream(fake_tts):
+    segments = ["segment 0", "segment 1 broken", "segment 2"]
+
+    with pytest.raises(RuntimeError, match="synthesis failed"):
+        asyncio.run(_collect(VoiceHandler()._synthesize_segments(segments, "voice")))
+    assert fake_tts.active == 0
+
+
+def test_stream_speech_caches_complete_audio(fake_tts, monkeypatch):
+    monkeypatch.setattr(settings, "tts_segment_chars", 20)
+    handler = VoiceHandler()
+    text = "Word 1 one. Word 2 two. Word 3 three."
+
+    audio = asyncio.run(_collect(handler.stream_speech(text)))
+
+    cached_path = handler.cached_audio_path(text)
+    assert cached_path is not None
+    with open(cached_path, "rb") as f:
+        assert f.read() == audio
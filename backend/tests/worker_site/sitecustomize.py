@@ -0,0 +1,15 @@
+"""
+Test hook for server subprocesses
+Swaps the embedding model for tests/fakes.py's (no download)
+"""
+
+import os
+import sys
+
+if os.environ.get("VOLCANORAG_FAKE_EMBEDDINGS"):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from fakes import FakeEmbeddings
+    from app.services.embedding_service import EmbeddingService
+
+    EmbeddingService._get_model = lambda self: FakeEmbeddings()
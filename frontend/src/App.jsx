@@ -6,7 +6,7 @@ import {
 } from 'lucide-react';
 import FileUpload from './components/FileUpload';
 import ProcessingStatus from './components/ProcessingStatus';
-import { uploadDocument, queryDocument, textToSpeech } from './services/api';
+import { uploadDocument, queryDocumentStream, textToSpeech } from './services/api';
 import { startVoiceRecognition, stopVoiceRecognition } from './services/speechRecognition';
 
 // Import local images
@@ -20,6 +20,7 @@ function App() {
   const [question, setQuestion] = useState('');
   const [loading, setLoading] = useState(false);
   const [processing, setProcessing] = useState(false);
+  const [jobId, setJobId] = useState(null);
   const [darkMode, setDarkMode] = useState(true);
   const [language, setLanguage] = useState('en');
   const [conversationMode, setConversationMode] = useState(false);
@@ -138,20 +139,31 @@ function App() {
     
     try {
       const result = await uploadDocument(file);
-      setSessionId(result.session_id);
-      setFileName(result.filename);
-      setMessages([{
-        type: 'system',
-        content: `✓ "${result.filename}" ready!`,
-        timestamp: new Date()
-      }]);
+      setJobId(result.job_id);
     } catch (err) {
       setError(err.response?.data?.detail || err.message || 'Upload failed');
-    } finally {
       setProcessing(false);
     }
   };
   
+  const handleJobComplete = (result) => {
+    setJobId(null);
+    setProcessing(false);
+    setSessionId(result.session_id);
+    setFileName(result.filename);
+    setMessages([{
+      type: 'system',
+      content: `✓ "${result.filename}" ready!`,
+      timestamp: new Date()
+    }]);
+  };
+  
+  const handleJobError = (message) => {
+    setJobId(null);
+    setProcessing(false);
+    setError(message || 'Processing failed');
+  };
+  
   const askQuestion = async (text, isVoice) => {
     if (!text || !text.trim() || !sessionId || loading) return;
     
@@ -172,15 +184,20 @@ function App() {
     
     try {
       console.log('🤖 Calling API...');
-      const response = await queryDocument(sessionId, q, language);
+      let started = false;
+      const response = await queryDocumentStream(sessionId, q, language, {
+        onToken: (_, answer) => {
+          const isFirst = !started;
+          started = true;
+          setMessages(prev => isFirst
+            ? [...prev, { type: 'ai', content: answer, timestamp: new Date() }]
+            : [...prev.slice(0, -1), { ...prev[prev.length - 1], content: answer }]
+          );
+        },
+        onDone: ({ ttft_ms }) => console.log(`⏱️ Time to first token: ${ttft_ms}ms`)
+      });
       console.log('✅ Got response:', response.answer.substring(0, 50));
       
-      setMessages(prev => [...prev, {
-        type: 'ai',
-        content: response.answer,
-        timestamp: new Date()
-      }]);
-      
       setLoading(false);
       
       // FORCE voice reading in conversation mode
@@ -471,7 +488,13 @@ function App() {
               </div>
               
               <FileUpload onUpload={handleFileUpload} processing={processing} />
-              {processing && <ProcessingStatus />}
+              {processing && jobId && (
+                <ProcessingStatus
+                  jobId={jobId}
+                  onComplete={handleJobComplete}
+                  onError={handleJobError}
+                />
+              )}
               
               {error && (
                 <div className="mt-4 p-4 rounded-lg border" style={{
@@ -1,48 +1,113 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { Loader, CheckCircle } from 'lucide-react';
+import { getJobStatus } from '../services/api';
+
+const POLL_INTERVAL_MS = 1000;
+// Give up if the job makes no visible progress for this long
+const STALL_TIMEOUT_MS = 10 * 60 * 1000;
+
+const STEPS = [
+  { stage: 'extracting', label: 'Extracting text from document...' },
+  { stage: 'ocr', label: 'Processing images with OCR...' },
+  { stage: 'vision', label: 'Analyzing images with Vision AI...' },
+  { stage: 'embedding', label: 'Creating vector embeddings...' },
+  { stage: 'ready', label: 'Building vector database...' }
+];
+
+const stepIndex = (stage) => {
+  if (stage === 'indexing') return STEPS.length - 2;
+  const index = STEPS.findIndex((step) => step.stage === stage);
+  return index === -1 ? 0 : index;
+};
+
+function ProcessingStatus({ jobId, onComplete, onError }) {
+  const [job, setJob] = useState(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    let timer = null;
+    let progress = null;
+    let progressAt = Date.now();
+
+    const poll = async () => {
+      try {
+        const status = await getJobStatus(jobId);
+        if (cancelled) return;
+        setJob(status);
+
+        const current = `${status.status}/${status.stage}/${status.pages_done}`;
+        if (current !== progress) {
+          progress = current;
+          progressAt = Date.now();
+        }
+
+        if (status.status === 'ready') {
+          onComplete?.(status.result);
+          return;
+        }
+        if (status.status === 'failed') {
+          onError?.(status.error);
+          return;
+        }
+      } catch (err) {
+        if (cancelled) return;
+        if (err.response?.status === 404) {
+          onError?.('Processing job not found');
+          return;
+        }
+      }
+      if (Date.now() - progressAt > STALL_TIMEOUT_MS) {
+        onError?.('Processing timed out. Please try uploading again.');
+        return;
+      }
+      timer = setTimeout(poll, POLL_INTERVAL_MS);
+    };
+
+    poll();
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [jobId]);
+
+  const current = stepIndex(job?.stage);
+  const stepProgress = job?.pages_total ? job.pages_done / job.pages_total : 0;
+  const percent = Math.min(100, Math.round(((current + stepProgress) / STEPS.length) * 100));
 
-function ProcessingStatus() {
   return (
     <div className="mt-6 bg-gray-800/50 rounded-lg p-6 border border-orange-500/20">
       <h3 className="text-lg font-semibold mb-4 flex items-center gap-2">
         <Loader className="animate-spin text-orange-500" size={20} />
         Processing Your Document
       </h3>
-      
+
       <div className="space-y-3">
-        <div className="flex items-center gap-3">
-          <div className="w-5 h-5 rounded-full border-2 border-orange-500 border-t-transparent animate-spin" />
-          <span className="text-sm text-white font-semibold">Extracting text from document...</span>
-        </div>
-        
-        <div className="flex items-center gap-3">
-          <div className="w-5 h-5 rounded-full border-2 border-gray-600" />
-          <span className="text-sm text-gray-400">Processing images with OCR...</span>
-        </div>
-        
-        <div className="flex items-center gap-3">
-          <div className="w-5 h-5 rounded-full border-2 border-gray-600" />
-          <span className="text-sm text-gray-400">Analyzing images with Vision AI...</span>
-        </div>
-        
-        <div className="flex items-center gap-3">
-          <div className="w-5 h-5 rounded-full border-2 border-gray-600" />
-          <span className="text-sm text-gray-400">Creating vector embeddings...</span>
-        </div>
-        
-        <div className="flex items-center gap-3">
-          <div className="w-5 h-5 rounded-full border-2 border-gray-600" />
-          <span className="text-sm text-gray-400">Building vector database...</span>
-        </div>
+        {STEPS.map((step, i) => (
+          <div key={step.stage} className="flex items-center gap-3">
+            {i < current ? (
+              <CheckCircle className="text-green-500" size={20} />
+            ) : i === current ? (
+              <div className="w-5 h-5 rounded-full border-2 border-orange-500 border-t-transparent animate-spin" />
+            ) : (
+              <div className="w-5 h-5 rounded-full border-2 border-gray-600" />
+            )}
+            <span className={`text-sm ${i === current ? 'text-white font-semibold' : 'text-gray-400'}`}>
+              {step.label}
+              {i === current && job?.pages_total > 0 && ` (${job.pages_done}/${job.pages_total})`}
+            </span>
+          </div>
+        ))}
       </div>
-      
+
       <div className="mt-6">
         <div className="w-full bg-gray-700 rounded-full h-2 overflow-hidden">
-          <div className="bg-gradient-to-r from-red-600 via-orange-500 to-yellow-500 h-full animate-pulse" 
-               style={{width: '60%', transition: 'width 0.5s'}} />
+          <div className="bg-gradient-to-r from-red-600 via-orange-500 to-yellow-500 h-full animate-pulse"
+               style={{width: `${percent}%`, transition: 'width 0.5s'}} />
         </div>
         <p className="text-xs text-gray-500 mt-2 text-center">
-          This may take 30-60 seconds for large documents...
+          {job?.eta_seconds != null
+            ? `About ${Math.ceil(job.eta_seconds)}s left in this step...`
+            : 'This may take 30-60 seconds for large documents...'}
         </p>
       </div>
     </div>
@@ -15,6 +15,64 @@ export const uploadDocument = async (file) => {
   return data;
 };
 
+export const addDocument = async (sessionId, file) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  const { data } = await api.post(`/session/${sessionId}/documents`, formData, {
+    headers: { 'Content-Type': 'multipart/form-data' }
+  });
+  return data;
+};
+
+/**
+ * Upload a large file in chunks through the resumable upload API.
+ * A failed chunk is retried from the offset the server reports, so an
+ * interrupted upload carries on where it stopped. Pass sessionId to add
+ * the document to an existing session. Resolves like uploadDocument.
+ */
+export const uploadDocumentResumable = async (
+  file,
+  { sessionId = null, chunkSize = 5 * 1024 * 1024, retries = 3, onProgress } = {}
+) => {
+  const { data: upload } = await api.post('/uploads', {
+    filename: file.name,
+    size: file.size,
+    session_id: sessionId
+  });
+
+  let offset = upload.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    try {
+      const { data } = await api.patch(
+        `/uploads/${upload.upload_id}`,
+        file.slice(offset, offset + chunkSize),
+        { headers: { 'Content-Type': 'application/octet-stream', 'Upload-Offset': offset } }
+      );
+      offset = data.offset;
+      failures = 0;
+      if (onProgress) onProgress(offset, file.size);
+    } catch (error) {
+      if (++failures > retries) throw error;
+      const { data } = await api.get(`/uploads/${upload.upload_id}`);
+      offset = data.offset;
+    }
+  }
+
+  const { data } = await api.post(`/uploads/${upload.upload_id}/complete`);
+  return data;
+};
+
+export const removeDocument = async (sessionId, documentId) => {
+  const { data } = await api.delete(`/session/${sessionId}/documents/${documentId}`);
+  return data;
+};
+
+export const getJobStatus = async (jobId) => {
+  const { data } = await api.get(`/jobs/${jobId}`);
+  return data;
+};
+
 export const queryDocument = async (sessionId, question, language = 'en') => {
   const { data } = await api.post('/query', {
     session_id: sessionId,
@@ -24,6 +82,75 @@ export const queryDocument = async (sessionId, question, language = 'en') => {
   return data;
 };
 
+/**
+ * Streaming counterpart of queryDocument.
+ * Reads Server-Sent Events from /query/stream and calls
+ * onContext(sources), onToken(token, answerSoFar) and onDone(metrics)
+ * as they arrive. Resolves with { answer, sources, ttft_ms, total_ms }.
+ */
+export const queryDocumentStream = async (
+  sessionId,
+  question,
+  language = 'en',
+  { onContext, onToken, onDone, signal } = {}
+) => {
+  const response = await fetch(`${API_BASE}/query/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ session_id: sessionId, question, language }),
+    signal
+  });
+
+  if (!response.ok) {
+    let detail = `Request failed (${response.status})`;
+    try {
+      detail = (await response.json()).detail || detail;
+    } catch (_) { /* non-JSON error body */ }
+    throw new Error(detail);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  const result = { answer: '', sources: [], ttft_ms: null, total_ms: null };
+  let buffer = '';
+
+  const handleEvent = (event) => {
+    if (event.type === 'context') {
+      result.sources = event.sources;
+      onContext?.(event.sources);
+    } else if (event.type === 'token') {
+      result.answer += event.content;
+      onToken?.(event.content, result.answer);
+    } else if (event.type === 'done') {
+      result.ttft_ms = event.ttft_ms;
+      result.total_ms = event.total_ms;
+      onDone?.(event);
+    } else if (event.type === 'error') {
+      throw new Error(event.detail || 'Streaming query failed');
+    }
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const data = message
+        .split('\n')
+        .filter((line) => line.startsWith('data:'))
+        .map((line) => line.slice(5).trim())
+        .join('\n');
+      if (data) handleEvent(JSON.parse(data));
+    }
+  }
+
+  return result;
+};
+
 export const textToSpeech = async (text, language = 'en') => {
   const { data } = await api.post('/tts', { text, language }, {
     responseType: 'blob'